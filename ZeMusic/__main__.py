@@ -11,10 +11,14 @@ except Exception:  # Fallback when symbol is unavailable
 
 import config
 from ZeMusic import LOGGER, app, userbot
+from ZeMusic.core import shard
 from ZeMusic.core.call import Mody
+from ZeMusic.core.exporter import start_exporter, stop_exporter
+from ZeMusic.core.watchdog import start_watchdog, watchdog
 from ZeMusic.misc import sudo
 from ZeMusic.plugins import ALL_MODULES
 from ZeMusic.utils.database import get_banned_users, get_gbanned
+from ZeMusic.utils.http import close_session
 from config import BANNED_USERS
 
 
@@ -28,6 +32,8 @@ async def init():
     ):
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
+    start_watchdog()
+    shard.install(app)
     await sudo()
     try:
         users = await get_gbanned()
@@ -54,10 +60,19 @@ async def init():
     except:
         pass
     await Mody.decorators()
+    await shard.start(app)
+    try:
+        await start_exporter()
+    except Exception as e:
+        LOGGER("ZeMusic").warning(f"Metrics exporter not started: {e}")
     LOGGER("ZeMusic").info(
         "جاري تشغيل البوت\nتم التنصيب على سورس الملك بنجاح\nقناة السورس https://t.me/EF_19"
     )
     await idle()
+    await shard.stop(app)
+    await stop_exporter()
+    await close_session()
+    watchdog.stop()
     await app.stop()
     await userbot.stop()
     LOGGER("ZeMusic").info("Stopping Ze Music Bot...")
@@ -9,14 +9,17 @@ from ..logging import LOGGER
 class Mody(Client):
     def __init__(self):
         LOGGER(__name__).info(f"يتم تشغيل البوت..")
+        # Shard workers get their updates from the front process, and their own session file.
+        worker = config.SHARDS > 1 and config.SHARD_ID > 0
         super().__init__(
-            name="ZeMusic",
+            name=f"ZeMusic-{config.SHARD_ID}" if worker else "ZeMusic",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
             bot_token=config.BOT_TOKEN,
             in_memory=False,
             parse_mode=ParseMode.HTML,
             max_concurrent_transmissions=7,
+            no_updates=worker,
         )
 
     async def start(self):
@@ -1,12 +1,15 @@
 import asyncio
+import json
 import re
 import time
 import unicodedata
-from typing import Optional, Dict, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from typing import Optional, Dict, Any, List
 
 from redis.asyncio import Redis
 
 import config
+from ZeMusic.core.metrics import metrics
 
 _redis_instance: Optional[Redis] = None
 
@@ -58,41 +61,110 @@ def extract_youtube_id(text: str) -> Optional[str]:
     return None
 
 
+_TRACKING_PARAMS = {
+    "si", "feature", "pp", "fbclid", "gclid", "igshid", "ref", "ref_src",
+    "context", "nd", "ab_channel", "t", "start_radio", "index", "ls",
+}
+
+
+def canonical_url(url: str) -> str:
+    """``url`` without tracking parameters, fragments and host aliases.
+
+    Links that resolve to the same track or playlist map to one string,
+    e.g. youtu.be/ID, m.youtube.com/watch?v=ID&si=x and
+    music.youtube.com/watch?v=ID all become youtube.com/watch?v=ID.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in _TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    if host in ("youtu.be", "m.youtube.com", "music.youtube.com"):
+        if host == "youtu.be":
+            query.insert(0, ("v", path.strip("/")))
+            path = "/watch"
+        host = "youtube.com"
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
 def _k(prefix: str, suffix: str) -> str:
     return f"music:v{config.CACHE_SCHEMA_VERSION}:{prefix}:{suffix}"
 
 
+# Resolves q2id -> id hash (alias_hit), else the q hash, refreshing TTLs, in one call.
+_LOOKUP_QUERY_LUA = """
+local ttl = tonumber(ARGV[1])
+local vid = redis.call('GET', KEYS[1])
+if vid then
+    local idkey = ARGV[2] .. vid
+    local data = redis.call('HGETALL', idkey)
+    if #data > 0 then
+        redis.call('EXPIRE', idkey, ttl)
+        redis.call('EXPIRE', KEYS[1], ttl)
+        return {'alias_hit', data}
+    end
+end
+local data = redis.call('HGETALL', KEYS[2])
+if #data > 0 then
+    redis.call('EXPIRE', KEYS[2], ttl)
+    return {'hit', data}
+end
+return {'miss', {}}
+"""
+
+_scripts: Dict[str, Any] = {}
+
+
+def _script(name: str, source: str):
+    # Registered once per process; redis-py re-loads it on NOSCRIPT.
+    script = _scripts.get(name)
+    if script is None:
+        script = _scripts[name] = get_redis().register_script(source)
+    return script
+
+
+def _pairs(flat) -> Dict[str, Any]:
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+def _observe_lookup(op: str, started: float, result: str) -> None:
+    metrics.inc("cache_lookups_total", op=op, result=result)
+    metrics.observe(
+        "cache_lookup_ms",
+        (time.perf_counter() - started) * 1000,
+        op=op,
+        result="miss" if result == "miss" else "hit",
+    )
+
+
 async def get_cached_by_query(q: str) -> Optional[Dict[str, Any]]:
-    r = get_redis()
     qn = normalize_query(q)
     if not qn:
         return None
-    # map q -> id if available
-    v_id = await r.get(_k("q2id", qn))
-    if v_id:
-        data = await r.hgetall(_k("id", v_id))
-        if data:
-            # refresh TTL
-            await r.expire(_k("id", v_id), config.CACHE_TTL_SECONDS)
-            await r.expire(_k("q2id", qn), config.CACHE_TTL_SECONDS)
-            return data
-    # or direct q hash
-    data = await r.hgetall(_k("q", qn))
-    if data:
-        await r.expire(_k("q", qn), config.CACHE_TTL_SECONDS)
-        return data
-    return None
+    started = time.perf_counter()
+    result, flat = await _script("lookup_query", _LOOKUP_QUERY_LUA)(
+        keys=[_k("q2id", qn), _k("q", qn)],
+        args=[config.CACHE_TTL_SECONDS, _k("id", "")],
+    )
+    _observe_lookup("query", started, result)
+    return _pairs(flat) or None
 
 
 async def get_cached_by_video_id(video_id: str) -> Optional[Dict[str, Any]]:
     if not video_id:
         return None
-    r = get_redis()
-    data = await r.hgetall(_k("id", video_id))
-    if data:
-        await r.expire(_k("id", video_id), config.CACHE_TTL_SECONDS)
-        return data
-    return None
+    started = time.perf_counter()
+    pipe = get_redis().pipeline()
+    pipe.hgetall(_k("id", video_id))
+    pipe.expire(_k("id", video_id), config.CACHE_TTL_SECONDS)
+    data, _ = await pipe.execute()
+    _observe_lookup("video_id", started, "hit" if data else "miss")
+    return data or None
 
 
 async def set_cache_from_message(q: str, meta: Dict[str, Any]) -> None:
@@ -238,52 +310,295 @@ async def set_hard_video(video_id: Optional[str], ttl_seconds: int = 900) -> Non
         pass
 
 
-# ===== Global monitoring counters (totals) and per-cookie leaderboards =====
+# ===== Chats where the bot is known not to be admin (skipped by fan-out jobs) =====
+
+def _znoadmin() -> str:
+    return _k("noadmin", "chats")
 
-def _kmetrics(field: str) -> str:
-    return _k("metrics", field)
+
+async def mark_not_admin(chat_id: int) -> None:
+    try:
+        r = get_redis()
+        await r.zadd(_znoadmin(), {str(chat_id): int(time.time())})
+    except Exception:
+        pass
 
 
-def _zcookie(field: str) -> str:
-    # sorted sets for cookie-based leaderboards
-    return _k("cookies:z", field)
+async def clear_not_admin(chat_id: int) -> None:
+    try:
+        r = get_redis()
+        await r.zrem(_znoadmin(), str(chat_id))
+    except Exception:
+        pass
 
 
-async def record_global_success(latency_ms: int) -> None:
+async def get_not_admin_chats() -> set:
+    """Return chat ids marked within NOADMIN_TTL_SECONDS, pruning stale marks in the same call."""
     try:
         r = get_redis()
+        cutoff = int(time.time()) - config.NOADMIN_TTL_SECONDS
         pipe = r.pipeline()
-        pipe.incr(_kmetrics("total"), 1)
-        pipe.incr(_kmetrics("success"), 1)
-        pipe.incrby(_kmetrics("latency_ms_sum"), int(latency_ms))
-        pipe.set(_kmetrics("last_ts"), str(int(time.time())))
+        pipe.zremrangebyscore(_znoadmin(), "-inf", cutoff)
+        pipe.zrange(_znoadmin(), 0, -1)
+        _, members = await pipe.execute()
+        return {int(m) for m in members}
+    except Exception:
+        return set()
+
+
+# ===== Admin rights cache (shared between bot instances) =====
+# The set always carries a "0" sentinel; a set without it was created by a
+# stray SADD on an expired key and is treated as missing.
+
+def _kadmins(chat_id: int) -> str:
+    return _k("admins", str(chat_id))
+
+
+async def get_cached_admins(chat_id: int) -> Optional[set]:
+    try:
+        r = get_redis()
+        members = await r.smembers(_kadmins(chat_id))
+    except Exception:
+        return None
+    if "0" not in members:
+        return None
+    return {int(m) for m in members if m != "0"}
+
+
+async def set_cached_admins(chat_id: int, user_ids, ttl_seconds: int) -> None:
+    try:
+        r = get_redis()
+        pipe = r.pipeline(transaction=True)
+        pipe.delete(_kadmins(chat_id))
+        pipe.sadd(_kadmins(chat_id), "0", *[str(u) for u in user_ids])
+        pipe.expire(_kadmins(chat_id), ttl_seconds)
         await pipe.execute()
     except Exception:
         pass
 
 
-async def record_global_failure(latency_ms: int, err_code: str = "") -> None:
+async def update_cached_admin(chat_id: int, user_id: int, allowed: bool) -> None:
     try:
         r = get_redis()
-        pipe = r.pipeline()
-        pipe.incr(_kmetrics("total"), 1)
-        pipe.incr(_kmetrics("fail"), 1)
-        pipe.incrby(_kmetrics("latency_ms_sum"), int(latency_ms))
-        if err_code:
-            pipe.incr(_kmetrics(f"err:{err_code}"), 1)
-        pipe.set(_kmetrics("last_ts"), str(int(time.time())))
+        if allowed:
+            await r.sadd(_kadmins(chat_id), str(user_id))
+        else:
+            await r.srem(_kadmins(chat_id), str(user_id))
+    except Exception:
+        pass
+
+
+# ===== Free-text search results (shared by play, inline and song commands) =====
+
+def _ksearch(qn: str) -> str:
+    return _k("search", qn)
+
+
+async def get_cached_search(q: str, limit: int = 1) -> Optional[List[Dict[str, Any]]]:
+    """Top ``limit`` cached results for ``q``, or None if fewer were stored.
+
+    A stored list shorter than ``limit`` still counts as a hit when the
+    search that produced it returned everything it had.
+    """
+    qn = normalize_query(q)
+    if not qn:
+        return None
+    started = time.perf_counter()
+    results = None
+    try:
+        raw = await get_redis().get(_ksearch(qn))
+        if raw:
+            data = json.loads(raw)
+            if len(data["results"]) >= limit or data["complete"]:
+                results = data["results"][:limit]
+    except Exception:
+        results = None
+    _observe_lookup("search", started, "hit" if results else "miss")
+    return results
+
+
+async def set_cached_search(q: str, results: List[Dict[str, Any]], limit: int) -> None:
+    qn = normalize_query(q)
+    if not qn or not results:
+        return
+    payload = {"results": results, "complete": len(results) < limit}
+    try:
+        r = get_redis()
+        raw = await r.get(_ksearch(qn))
+        if raw and len(json.loads(raw)["results"]) > len(results):
+            return
+        await r.set(
+            _ksearch(qn),
+            json.dumps(payload, ensure_ascii=False),
+            ex=config.SEARCH_CACHE_TTL,
+        )
+    except Exception:
+        pass
+
+
+# ===== Catalog track -> YouTube match (Spotify and friends) =====
+
+def _kmatch(key: str) -> str:
+    return _k("match", key)
+
+
+async def get_cached_matches(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Known YouTube matches for catalog track keys (e.g. ``isrc:...``), in one MGET."""
+    keys = [k for k in keys if k]
+    if not keys:
+        return {}
+    started = time.perf_counter()
+    try:
+        values = await get_redis().mget([_kmatch(k) for k in keys])
+    except Exception:
+        values = [None] * len(keys)
+    found = {}
+    for key, raw in zip(keys, values):
+        if raw:
+            try:
+                found[key] = json.loads(raw)
+            except ValueError:
+                pass
+    for key in keys:
+        _observe_lookup("match", started, "hit" if key in found else "miss")
+    return found
+
+
+async def set_cached_matches(matches: Dict[str, Dict[str, Any]]) -> None:
+    if not matches:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for key, details in matches.items():
+            pipe.set(
+                _kmatch(key),
+                json.dumps(details, ensure_ascii=False),
+                ex=config.CACHE_TTL_SECONDS,
+            )
         await pipe.execute()
     except Exception:
         pass
 
 
-async def bump_cookie_leaderboards(cookie_basename: str, success: bool, latency_ms: int) -> None:
+# ===== Resolved /play links (canonical URL -> platform resolver result) =====
+
+def _kresolved(kind: str, url: str) -> str:
+    return _k("resolved", f"{kind}:{canonical_url(url)}")
+
+
+async def get_cached_resolution(kind: str, url: str) -> Optional[Any]:
+    started = time.perf_counter()
+    try:
+        raw = await get_redis().get(_kresolved(kind, url))
+        result = json.loads(raw) if raw else None
+    except Exception:
+        result = None
+    _observe_lookup("url", started, "miss" if result is None else "hit")
+    return result
+
+
+async def set_cached_resolution(kind: str, url: str, result: Any, ttl_seconds: int) -> None:
+    try:
+        await get_redis().set(
+            _kresolved(kind, url),
+            json.dumps(result, ensure_ascii=False),
+            ex=ttl_seconds,
+        )
+    except Exception:
+        pass
+
+
+# ===== Global ban/unban job leases (one runner per job across shards) =====
+
+def _kgbanlease(job_key: str) -> str:
+    return _k("gbanlease", job_key)
+
+
+# Extends or deletes a lease only while ARGV[1] still holds it.
+_RENEW_LEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+end
+return 0
+"""
+_RELEASE_LEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+async def acquire_gban_lease(job_key: str, owner: str, ttl_seconds: int, force: bool = False) -> bool:
+    """Take the lease of a gban job; ``force`` takes it over from a dead holder."""
+    try:
+        ok = await get_redis().set(_kgbanlease(job_key), owner, ex=ttl_seconds, nx=not force)
+        return ok is True
+    except Exception:
+        return True
+
+
+async def renew_gban_lease(job_key: str, owner: str, ttl_seconds: int) -> bool:
+    """False once another process holds the lease."""
+    try:
+        return bool(
+            await _script("renew_lease", _RENEW_LEASE_LUA)(
+                keys=[_kgbanlease(job_key)], args=[owner, ttl_seconds]
+            )
+        )
+    except Exception:
+        return True
+
+
+async def release_gban_lease(job_key: str, owner: str) -> None:
+    try:
+        await _script("release_lease", _RELEASE_LEASE_LUA)(
+            keys=[_kgbanlease(job_key)], args=[owner]
+        )
+    except Exception:
+        pass
+
+
+async def gban_lease_held(job_key: str) -> bool:
+    try:
+        return bool(await get_redis().exists(_kgbanlease(job_key)))
+    except Exception:
+        return False
+
+
+# ===== Active voice chats of every shard (chat id -> owning shard) =====
+
+def _hactive(kind: str) -> str:
+    return _k("active", kind)
+
+
+async def set_active_chat(kind: str, chat_id: int, playing: bool) -> None:
     try:
         r = get_redis()
-        if success:
-            await r.zincrby(_zcookie("succ"), 1, cookie_basename)
+        if playing:
+            await r.hset(_hactive(kind), str(chat_id), config.SHARD_ID)
         else:
-            await r.zincrby(_zcookie("fail"), 1, cookie_basename)
-        await r.zincrby(_zcookie("latency_sum"), int(latency_ms), cookie_basename)
+            await r.hdel(_hactive(kind), str(chat_id))
+    except Exception:
+        pass
+
+
+async def get_registered_active_chats(kind: str) -> Optional[List[int]]:
+    """Active chats of all shards; None when Redis cannot be read."""
+    try:
+        return [int(chat_id) for chat_id in await get_redis().hkeys(_hactive(kind))]
     except Exception:
-        pass
\ No newline at end of file
+        return None
+
+
+async def forget_shard_chats(shard_id: int) -> None:
+    """Drop the active chats a shard registered before it restarted."""
+    r = get_redis()
+    for kind in ("audio", "video"):
+        try:
+            owners = await r.hgetall(_hactive(kind))
+            stale = [chat_id for chat_id, owner in owners.items() if int(owner) == shard_id]
+            if stale:
+                await r.hdel(_hactive(kind), *stale)
+        except Exception:
+            pass
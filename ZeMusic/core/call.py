@@ -1,11 +1,9 @@
 import asyncio
-import os
 
 from datetime import datetime, timedelta
 from typing import Union
 
 from pyrogram import Client
-from pyrogram.types import InlineKeyboardMarkup
 # ntgcalls compatibility shim for enum names across versions
 try:
 	import ntgcalls as _ng
@@ -20,6 +18,12 @@ try:
 			setattr(_ss, "Paused", _ss.PAUSED)
 		if hasattr(_ss, "STOPPED") and not hasattr(_ss, "Stopped"):
 			setattr(_ss, "Stopped", _ss.STOPPED)
+	_im = getattr(_ng, "InputMode", None)
+	if _im is not None:
+		# Same rename for the input modes AudioPiped/AudioVideoPiped pass to ntgcalls
+		for _old, _new in (("File", "FILE"), ("Shell", "SHELL"), ("FFmpeg", "FFMPEG"), ("NoLatency", "NO_LATENCY")):
+			if hasattr(_im, _new) and not hasattr(_im, _old):
+				setattr(_im, _old, getattr(_im, _new))
 except Exception:
 	pass
 # Voice calls core and types imports targeting py-tgcalls==1.0.9
@@ -44,7 +48,8 @@ except Exception:
 		pass
 
 import config
-from ZeMusic import LOGGER, YouTube, app
+from ZeMusic import LOGGER, SoundCloud, Telegram, YouTube, app
+from ZeMusic.core.shard import owns_assistant
 from ZeMusic.misc import db
 from ZeMusic.utils.database import (
 	add_active_chat,
@@ -59,10 +64,10 @@ from ZeMusic.utils.database import (
 	set_loop,
 )
 from ZeMusic.utils.exceptions import AssistantErr
-from ZeMusic.utils.formatters import check_duration, seconds_to_min, speed_converter
-from ZeMusic.utils.inline.play import stream_markup
+from ZeMusic.utils.formatters import seconds_to_min, time_to_seconds
+from ZeMusic.utils.stream import nowplaying
 from ZeMusic.utils.stream.autoclear import auto_clean
-from ZeMusic.utils.thumbnails import get_thumb
+from ZeMusic.utils.stream.speed import get_variant, schedule_variant, stream_parameters
 from strings import get_string
 
 
@@ -148,27 +153,27 @@ class Call(PyTgCalls):
 
 	async def stop_stream_force(self, chat_id: int):
 		try:
-			if config.STRING1:
+			if config.STRING1 and owns_assistant(1):
 				await self.one.leave_group_call(chat_id)
 		except:
 			pass
 		try:
-			if config.STRING2:
+			if config.STRING2 and owns_assistant(2):
 				await self.two.leave_group_call(chat_id)
 		except:
 			pass
 		try:
-			if config.STRING3:
+			if config.STRING3 and owns_assistant(3):
 				await self.three.leave_group_call(chat_id)
 		except:
 			pass
 		try:
-			if config.STRING4:
+			if config.STRING4 and owns_assistant(4):
 				await self.four.leave_group_call(chat_id)
 		except:
 			pass
 		try:
-			if config.STRING5:
+			if config.STRING5 and owns_assistant(5):
 				await self.five.leave_group_call(chat_id)
 		except:
 			pass
@@ -179,56 +184,31 @@ class Call(PyTgCalls):
 
 	async def speedup_stream(self, chat_id: int, file_path, speed, playing):
 		assistant = await group_assistant(self, chat_id)
-		if str(speed) != str("1.0"):
-			base = os.path.basename(file_path)
-			chatdir = os.path.join(os.getcwd(), "playback", str(speed))
-			if not os.path.isdir(chatdir):
-				os.makedirs(chatdir)
-			out = os.path.join(chatdir, base)
-			if not os.path.isfile(out):
-				if str(speed) == str("0.5"):
-					vs = 2.0
-				if str(speed) == str("0.75"):
-					vs = 1.35
-				if str(speed) == str("1.5"):
-					vs = 0.68
-				if str(speed) == str("2.0"):
-					vs = 0.5
-				proc = await asyncio.create_subprocess_shell(
-					cmd=(
-						"ffmpeg "
-						"-i "
-						f"{file_path} "
-						"-filter:v "
-						f"setpts={vs}*PTS "
-						"-filter:a "
-						f"atempo={speed} "
-						f"{out}"
-					),
-					stdin=asyncio.subprocess.PIPE,
-					stderr=asyncio.subprocess.PIPE,
-				)
-				await proc.communicate()
-			else:
-				pass
-		else:
-			out = file_path
-		dur = await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
-		dur = int(dur)
-		played, con_seconds = speed_converter(playing[0]["played"], speed)
-		duration = seconds_to_min(dur)
+		current = float(playing[0].get("speed") or 1.0)
+		source_seconds = int(playing[0].get("old_second") or playing[0]["seconds"])
+		# Position in the original file; played/seconds are wall-clock at the current speed.
+		position = int(playing[0]["played"]) * current
+		speed = float(speed)
+		variant = get_variant(file_path, speed)
+		out = variant or file_path
+		played = int(position / speed)
+		dur = int(source_seconds / speed)
+		video = MediumQualityVideo() if playing[0]["streamtype"] == "video" else None
+		params = stream_parameters(
+			played if variant else position, speed, variant=bool(variant), video=video
+		)
 		stream = (
 			AudioVideoPiped(
 				out,
 				audio_parameters=HighQualityAudio(),
-				video_parameters=MediumQualityVideo(),
-				additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+				video_parameters=video,
+				additional_ffmpeg_parameters=params,
 			)
-			if playing[0]["streamtype"] == "video"
+			if video
 			else AudioPiped(
 				out,
 				audio_parameters=HighQualityAudio(),
-				additional_ffmpeg_parameters=f"-ss {played} -to {duration}",
+				additional_ffmpeg_parameters=params,
 			)
 		)
 		if str(db[chat_id][0]["file"]) == str(file_path):
@@ -240,11 +220,13 @@ class Call(PyTgCalls):
 			if not exis:
 				db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
 				db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-			db[chat_id][0]["played"] = con_seconds
-			db[chat_id][0]["dur"] = duration
+			db[chat_id][0]["played"] = played
+			db[chat_id][0]["dur"] = seconds_to_min(dur)
 			db[chat_id][0]["seconds"] = dur
-			db[chat_id][0]["speed_path"] = out
+			db[chat_id][0]["speed_path"] = variant
 			db[chat_id][0]["speed"] = speed
+		if not variant:
+			schedule_variant(file_path, speed)
 
 	async def force_stop_stream(self, chat_id: int):
 		assistant = await group_assistant(self, chat_id)
@@ -268,6 +250,7 @@ class Call(PyTgCalls):
 		image: Union[bool, str] = None,
 	):
 		assistant = await group_assistant(self, chat_id)
+		link = Telegram.playable(SoundCloud.playable(link))
 		if video:
 			stream = AudioVideoPiped(
 				link,
@@ -281,20 +264,29 @@ class Call(PyTgCalls):
 			stream,
 		)
 
-	async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
+	async def seek_stream(self, chat_id, file_path, to_seek, duration, mode, speed=None):
 		assistant = await group_assistant(self, chat_id)
+		file_path = Telegram.playable(file_path)
+		video = MediumQualityVideo() if mode == "video" else None
+		if speed and float(speed) != 1.0:
+			# Live speed filter: seek in the original file's timeline.
+			params = stream_parameters(
+				time_to_seconds(to_seek) * float(speed), speed, video=video
+			)
+		else:
+			params = f"-ss {to_seek} -to {duration}"
 		stream = (
 			AudioVideoPiped(
 				file_path,
 				audio_parameters=HighQualityAudio(),
-				video_parameters=MediumQualityVideo(),
-				additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+				video_parameters=video,
+				additional_ffmpeg_parameters=params,
 			)
-			if mode == "video"
+			if video
 			else AudioPiped(
 				file_path,
 				audio_parameters=HighQualityAudio(),
-				additional_ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+				additional_ffmpeg_parameters=params,
 			)
 		)
 		await assistant.change_stream(chat_id, stream)
@@ -320,6 +312,7 @@ class Call(PyTgCalls):
 		assistant = await group_assistant(self, chat_id)
 		language = await get_lang(chat_id)
 		_ = get_string(language)
+		link = Telegram.playable(link)
 		if video:
 			stream = AudioVideoPiped(
 				link,
@@ -381,10 +374,8 @@ class Call(PyTgCalls):
 				return
 		else:
 			queued = check[0]["file"]
-			language = await get_lang(chat_id)
-			_ = get_string(language)
-			title = (check[0]["title"]).title()
-			user = check[0]["by"]
+			card = nowplaying.take(chat_id, check[0])
+			_ = card["_"] if card else get_string(await get_lang(chat_id))
 			original_chat_id = check[0]["chat_id"]
 			streamtype = check[0]["streamtype"]
 			videoid = check[0]["vidid"]
@@ -421,21 +412,11 @@ class Call(PyTgCalls):
 						original_chat_id,
 						text=_["call_6"],
 					)
-				img = await get_thumb(videoid)
-				button = stream_markup(_, chat_id)
-				run = await app.send_photo(
-					chat_id=original_chat_id,
-					photo=img,
-					caption=_["stream_1"].format(
-						f"https://t.me/{app.username}?start=info_{videoid}",
-						title[:23],
-						check[0]["dur"],
-						user,
-					),
-					reply_markup=InlineKeyboardMarkup(button),
+				run, markup = await nowplaying.announce(
+					chat_id, original_chat_id, _, check[0], card
 				)
 				db[chat_id][0]["mystic"] = run
-				db[chat_id][0]["markup"] = "tg"
+				db[chat_id][0]["markup"] = markup
 			elif "vid_" in queued:
 				mystic = await app.send_message(original_chat_id, _["call_7"])
 				try:
@@ -467,22 +448,12 @@ class Call(PyTgCalls):
 						original_chat_id,
 						text=_["call_6"],
 					)
-				img = await get_thumb(videoid)
-				button = stream_markup(_, chat_id)
 				await mystic.delete()
-				run = await app.send_photo(
-					chat_id=original_chat_id,
-					photo=img,
-					caption=_["stream_1"].format(
-						f"https://t.me/{app.username}?start=info_{videoid}",
-						title[:23],
-						check[0]["dur"],
-						user,
-					),
-					reply_markup=InlineKeyboardMarkup(button),
+				run, markup = await nowplaying.announce(
+					chat_id, original_chat_id, _, check[0], card
 				)
 				db[chat_id][0]["mystic"] = run
-				db[chat_id][0]["markup"] = "stream"
+				db[chat_id][0]["markup"] = markup
 			elif "index_" in queued:
 				stream = (
 					AudioVideoPiped(
@@ -500,16 +471,16 @@ class Call(PyTgCalls):
 						original_chat_id,
 						text=_["call_6"],
 					)
-				button = stream_markup(_, chat_id)
-				run = await app.send_photo(
-					chat_id=original_chat_id,
-					photo=config.STREAM_IMG_URL,
-					caption=_["stream_2"].format(user),
-					reply_markup=InlineKeyboardMarkup(button),
+				run, markup = await nowplaying.announce(
+					chat_id, original_chat_id, _, check[0], card
 				)
 				db[chat_id][0]["mystic"] = run
-				db[chat_id][0]["markup"] = "tg"
+				db[chat_id][0]["markup"] = markup
 			else:
+				if videoid == "soundcloud":
+					queued = SoundCloud.playable(queued)
+				elif videoid == "telegram":
+					queued = Telegram.playable(queued)
 				if video:
 					stream = AudioVideoPiped(
 						queued,
@@ -528,75 +499,38 @@ class Call(PyTgCalls):
 						original_chat_id,
 						text=_["call_6"],
 					)
-				if videoid == "telegram":
-					button = stream_markup(_, chat_id)
-					run = await app.send_photo(
-						chat_id=original_chat_id,
-						photo=config.TELEGRAM_AUDIO_URL
-						if str(streamtype) == "audio"
-						else config.TELEGRAM_VIDEO_URL,
-						caption=_["stream_1"].format(
-							config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
-						),
-						reply_markup=InlineKeyboardMarkup(button),
-					)
-					db[chat_id][0]["mystic"] = run
-					db[chat_id][0]["markup"] = "tg"
-				elif videoid == "soundcloud":
-					button = stream_markup(_, chat_id)
-					run = await app.send_photo(
-						chat_id=original_chat_id,
-						photo=config.SOUNCLOUD_IMG_URL,
-						caption=_["stream_1"].format(
-							config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
-						),
-						reply_markup=InlineKeyboardMarkup(button),
-					)
-					db[chat_id][0]["mystic"] = run
-					db[chat_id][0]["markup"] = "tg"
-				else:
-					img = await get_thumb(videoid)
-					button = stream_markup(_, chat_id)
-					run = await app.send_photo(
-						chat_id=original_chat_id,
-						photo=img,
-						caption=_["stream_1"].format(
-							f"https://t.me/{app.username}?start=info_{videoid}",
-							title[:23],
-							check[0]["dur"],
-							user,
-						),
-						reply_markup=InlineKeyboardMarkup(button),
-					)
-					db[chat_id][0]["mystic"] = run
-					db[chat_id][0]["markup"] = "stream"
+				run, markup = await nowplaying.announce(
+					chat_id, original_chat_id, _, check[0], card
+				)
+				db[chat_id][0]["mystic"] = run
+				db[chat_id][0]["markup"] = markup
 
 	
 	async def ping(self):
 		pings = []
-		if config.STRING1:
+		if config.STRING1 and owns_assistant(1):
 			pings.append(await self.one.ping)
-		if config.STRING2:
+		if config.STRING2 and owns_assistant(2):
 			pings.append(await self.two.ping)
-		if config.STRING3:
+		if config.STRING3 and owns_assistant(3):
 			pings.append(await self.three.ping)
-		if config.STRING4:
+		if config.STRING4 and owns_assistant(4):
 			pings.append(await self.four.ping)
-		if config.STRING5:
+		if config.STRING5 and owns_assistant(5):
 			pings.append(await self.five.ping)
 		return str(round(sum(pings) / len(pings), 3))
 
 	async def start(self):
 		LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-		if config.STRING1:
+		if config.STRING1 and owns_assistant(1):
 			await self.one.start()
-		if config.STRING2:
+		if config.STRING2 and owns_assistant(2):
 			await self.two.start()
-		if config.STRING3:
+		if config.STRING3 and owns_assistant(3):
 			await self.three.start()
-		if config.STRING4:
+		if config.STRING4 and owns_assistant(4):
 			await self.four.start()
-		if config.STRING5:
+		if config.STRING5 and owns_assistant(5):
 			await self.five.start()
 
 	
@@ -630,6 +564,7 @@ class Call(PyTgCalls):
 			if not isinstance(update, StreamAudioEnded):
 				return
 			await self.change_stream(client, update.chat_id)
+			nowplaying.prepare_next(update.chat_id)
 
 
 Mody = Call()
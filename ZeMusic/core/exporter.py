@@ -0,0 +1,195 @@
+import asyncio
+import os
+import time
+from typing import List
+
+import psutil
+from aiohttp import web
+
+import config
+from ZeMusic.core.cache import get_redis
+from ZeMusic.core.metrics import BUCKETS, metrics
+from ZeMusic.core.mongo import mongodb
+from ZeMusic.logging import LOGGER
+from ZeMusic.misc import db
+from ZeMusic.utils.cookiepool import cookie_pool
+from ZeMusic.utils.database import active, activevideo, assistantdict
+
+PREFIX = "zemusic_"
+LAG_INTERVAL = 0.5
+PROBE_TIMEOUT = 2
+# Upper bounds of the queue length histogram buckets; the last one is open.
+QUEUE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, float("inf"))
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_runner = None
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: List[str] = []
+        self._typed = set()
+
+    def meta(self, name: str, kind: str, help_text: str = ""):
+        if name in self._typed:
+            return
+        self._typed.add(name)
+        if help_text:
+            self.lines.append(f"# HELP {PREFIX}{name} {help_text}")
+        self.lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    def sample(self, name: str, value, labels=()):
+        self.lines.append(f"{PREFIX}{name}{_fmt(labels)} {float(value)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines + ["# EOF", ""])
+
+
+def _dir_bytes(path: str) -> int:
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _ffmpeg_processes() -> int:
+    count = 0
+    try:
+        for proc in psutil.Process().children(recursive=True):
+            try:
+                if "ffmpeg" in proc.name():
+                    count += 1
+            except psutil.Error:
+                pass
+    except psutil.Error:
+        pass
+    return count
+
+
+async def _probe(name: str, call) -> bool:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(call(), PROBE_TIMEOUT)
+        ok = True
+    except Exception:
+        ok = False
+    metrics.observe(f"{name}_call_ms", (time.perf_counter() - started) * 1000)
+    metrics.set_gauge("backend_up", int(ok), backend=name)
+    return ok
+
+
+async def _loop_lag():
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lag = max(0.0, time.perf_counter() - started - LAG_INTERVAL) * 1000
+        metrics.observe("event_loop_lag_ms", lag)
+        metrics.set_gauge("event_loop_lag_ms_last", lag)
+
+
+def _runtime(w: _Writer):
+    w.meta("active_calls", "gauge", "Voice chats streaming, per assistant.")
+    calls = {}
+    for chat_id in active:
+        kind = "video" if chat_id in activevideo else "audio"
+        key = (str(assistantdict.get(chat_id, "unknown")), kind)
+        calls[key] = calls.get(key, 0) + 1
+    for (assistant, kind), n in sorted(calls.items()):
+        w.sample("active_calls", n, (("assistant", assistant), ("kind", kind)))
+
+    # Queues are summarised, not labelled by chat: one series per chat would
+    # grow without bound.
+    lengths = [len(queue) for queue in list(db.values()) if queue]
+    w.meta("queued_tracks", "gauge", "Tracks queued in all chats, including the current ones.")
+    w.sample("queued_tracks", sum(lengths))
+    w.meta("queue_length", "gaugehistogram", "Chats by queue length, including the current track.")
+    for bound in QUEUE_BUCKETS:
+        le = "+Inf" if bound == float("inf") else bound
+        w.sample("queue_length_gbucket", sum(1 for n in lengths if n <= bound), (("le", le),))
+    w.sample("queue_length_gcount", len(lengths))
+    w.sample("queue_length_gsum", sum(lengths))
+
+    health = cookie_pool.health()
+    for name, field, help_text in (
+        ("cookie_success_weight", "ok", "Decayed successes per cookie file."),
+        ("cookie_failure_weight", "fail", "Decayed failures per cookie file."),
+        ("cookie_latency_ewma_ms", "latency_ms", "Extraction latency EWMA per cookie file."),
+        ("cookie_cooling", "cooling", "1 while a cookie file is in cooldown."),
+    ):
+        w.meta(name, "gauge", help_text)
+        for row in health:
+            w.sample(name, row[field], (("cookie", row["cookie"]),))
+
+    w.meta("ffmpeg_processes", "gauge", "ffmpeg processes spawned by the bot.")
+    w.sample("ffmpeg_processes", _ffmpeg_processes())
+
+
+def _aggregated(w: _Writer):
+    for (name, labels), value in sorted(metrics.counters.items()):
+        base = name[: -len("_total")] if name.endswith("_total") else name
+        w.meta(base, "counter")
+        w.sample(f"{base}_total", value, labels)
+    for (name, labels), value in sorted(metrics.gauges.items()):
+        w.meta(name, "gauge")
+        w.sample(name, value, labels)
+    for (name, labels), hist in sorted(metrics.histograms.items()):
+        w.meta(name, "histogram")
+        cumulative = 0
+        for bound, n in zip(BUCKETS, hist.counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else bound
+            w.sample(f"{name}_bucket", cumulative, labels + (("le", le),))
+        w.sample(f"{name}_sum", hist.sum, labels)
+        w.sample(f"{name}_count", hist.count, labels)
+
+
+async def _handle(request):
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        _probe("redis", get_redis().ping),
+        _probe("mongo", lambda: mongodb.command("ping")),
+    )
+    for folder in ("downloads", "cache"):
+        size = await loop.run_in_executor(None, _dir_bytes, folder)
+        metrics.set_gauge("dir_bytes", size, dir=folder)
+    w = _Writer()
+    _runtime(w)
+    _aggregated(w)
+    return web.Response(body=w.text().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def start_exporter():
+    """Serve /metrics in this process when METRICS_PORT is set."""
+    global _runner
+    if not config.METRICS_PORT or _runner is not None:
+        return
+    server = web.Application()
+    server.router.add_get("/metrics", _handle)
+    _runner = web.AppRunner(server, access_log=None)
+    await _runner.setup()
+    # Each shard process listens on its own port.
+    port = config.METRICS_PORT + config.SHARD_ID
+    await web.TCPSite(_runner, config.METRICS_HOST, port).start()
+    asyncio.create_task(_loop_lag())
+    LOGGER(__name__).info(f"Metrics exporter on http://{config.METRICS_HOST}:{port}/metrics")
+
+
+async def stop_exporter():
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
@@ -0,0 +1,213 @@
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open.
+BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 40000, float("inf"))
+FLUSH_INTERVAL = 5
+
+Labels = Tuple[Tuple[str, str], ...]
+Series = Tuple[str, Labels]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def series_name(series: Series) -> str:
+    name, labels = series
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i else 0
+                high = BUCKETS[i] if i < len(BUCKETS) - 1 else BUCKETS[-2] * 2
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-2]
+
+
+class Metrics:
+    """In-process counters, gauges and latency histograms.
+
+    Recording is a dict update and never waits on I/O. Deltas accumulated
+    since the last flush are written to Redis in one pipeline every
+    ``FLUSH_INTERVAL`` seconds by a background task.
+    """
+
+    def __init__(self):
+        self.counters: Dict[Series, float] = {}
+        self.gauges: Dict[Series, float] = {}
+        self.histograms: Dict[Series, Histogram] = {}
+        self._counter_deltas: Dict[Series, float] = {}
+        self._hist_deltas: Dict[Series, Histogram] = {}
+        self._gauges_dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+        self._counter_deltas[key] = self._counter_deltas.get(key, 0) + value
+        self._ensure_flushing()
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self.gauges[(name, _labels(labels))] = value
+        self._gauges_dirty = True
+        self._ensure_flushing()
+
+    def observe(self, name: str, value_ms: float, **labels):
+        key = (name, _labels(labels))
+        for store in (self.histograms, self._hist_deltas):
+            hist = store.get(key)
+            if hist is None:
+                hist = store[key] = Histogram()
+            hist.observe(value_ms)
+        self._ensure_flushing()
+
+    def percentiles(self, name: str) -> List[Tuple[Labels, int, float, float, float]]:
+        """(labels, count, p50, p95, p99) for every series of ``name``."""
+        rows = []
+        for (metric, labels), hist in self.histograms.items():
+            if metric != name or not hist.count:
+                continue
+            rows.append(
+                (
+                    labels,
+                    hist.count,
+                    hist.quantile(0.5),
+                    hist.quantile(0.95),
+                    hist.quantile(0.99),
+                )
+            )
+        rows.sort(key=lambda row: -row[1])
+        return rows
+
+    def _ensure_flushing(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception:
+                pass
+
+    async def flush(self):
+        from ZeMusic.core.cache import _k, get_redis
+
+        counters, self._counter_deltas = self._counter_deltas, {}
+        hists, self._hist_deltas = self._hist_deltas, {}
+        gauges_dirty, self._gauges_dirty = self._gauges_dirty, False
+        if not counters and not hists and not gauges_dirty:
+            return
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for key, value in counters.items():
+                pipe.hincrbyfloat(_k("metrics", "counters"), series_name(key), value)
+            for key, hist in hists.items():
+                hkey = _k("metrics:hist", series_name(key))
+                for i, n in enumerate(hist.counts):
+                    if n:
+                        pipe.hincrby(hkey, str(BUCKETS[i]), n)
+                pipe.hincrbyfloat(hkey, "sum", hist.sum)
+                pipe.hincrby(hkey, "count", hist.count)
+            if gauges_dirty:
+                pipe.hset(
+                    _k("metrics", "gauges"),
+                    mapping={series_name(k): v for k, v in self.gauges.items()},
+                )
+            _legacy_totals(pipe, _k, counters, hists)
+            await pipe.execute()
+        except Exception:
+            # Put the deltas back so the next flush retries them.
+            for key, value in counters.items():
+                self._counter_deltas[key] = self._counter_deltas.get(key, 0) + value
+            for key, hist in hists.items():
+                merged = self._hist_deltas.setdefault(key, Histogram())
+                merged.counts = [a + b for a, b in zip(merged.counts, hist.counts)]
+                merged.sum += hist.sum
+                merged.count += hist.count
+            self._gauges_dirty = self._gauges_dirty or gauges_dirty
+
+
+def _legacy_totals(pipe, _k, counters: dict, hists: dict):
+    """Keep the pre-aggregator totals and cookie leaderboards up to date."""
+    touched = False
+    for (name, labels), value in counters.items():
+        if name != "extraction_total":
+            continue
+        touched = True
+        labels = dict(labels)
+        pipe.incrby(_k("metrics", "total"), int(value))
+        if labels.get("result") == "ok":
+            pipe.incrby(_k("metrics", "success"), int(value))
+        else:
+            pipe.incrby(_k("metrics", "fail"), int(value))
+            if labels.get("error"):
+                pipe.incrby(_k("metrics", f"err:{labels['error']}"), int(value))
+        cookie = labels.get("cookie")
+        if cookie:
+            field = "succ" if labels.get("result") == "ok" else "fail"
+            pipe.zincrby(_k("cookies:z", field), int(value), cookie)
+    for (name, labels), hist in hists.items():
+        if name == "extraction_latency_ms":
+            pipe.incrby(_k("metrics", "latency_ms_sum"), int(hist.sum))
+        elif name == "cookie_latency_ms":
+            cookie = dict(labels)["cookie"]
+            pipe.zincrby(_k("cookies:z", "latency_sum"), int(hist.sum), cookie)
+    if touched:
+        pipe.set(_k("metrics", "last_ts"), str(int(time.time())))
+
+
+metrics = Metrics()
+
+
+def record_extraction(
+    op: str,
+    ok: bool,
+    latency_ms: int,
+    cookie: Optional[str] = None,
+    client: Optional[str] = None,
+    err_code: Optional[str] = None,
+):
+    """Count one yt-dlp extraction and its latency, per op, cookie and client."""
+    metrics.inc(
+        "extraction_total",
+        op=op,
+        result="ok" if ok else "fail",
+        error=None if ok else (err_code or "UNKNOWN"),
+        cookie=cookie,
+    )
+    metrics.observe("extraction_latency_ms", latency_ms, op=op)
+    if cookie:
+        metrics.observe("cookie_latency_ms", latency_ms, cookie=cookie)
+    if client:
+        metrics.observe("client_latency_ms", latency_ms, client=client)
@@ -0,0 +1,413 @@
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import zlib
+from io import BytesIO
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from pyrogram import raw, utils
+from pyrogram.raw.core import Int, TLObject
+from redis.asyncio import Redis
+
+import config
+from ZeMusic.core.cache import forget_shard_chats
+from ZeMusic.core.metrics import metrics
+
+from ..logging import LOGGER
+
+# Seconds between checks that every worker process is still running.
+SUPERVISE_INTERVAL = 5
+# Updates pushed to a shard's Redis list per round trip.
+FORWARD_BATCH = 64
+# Seconds between copies of this shard's queues to Redis.
+MIRROR_INTERVAL = 2
+
+_bus: Optional[Redis] = None
+_workers: Dict[int, subprocess.Popen] = {}
+_tasks: List[asyncio.Task] = []
+# Commands a worker hands to the front with to_front(), by name.
+_front_commands: Dict[str, Callable[..., Awaitable]] = {}
+_commands_running = set()
+
+
+def enabled() -> bool:
+    return config.SHARDS > 1
+
+
+def is_front() -> bool:
+    return config.SHARD_ID == 0
+
+
+def shard_of(chat_id: int) -> int:
+    """The shard that owns ``chat_id``; stable across processes and restarts."""
+    return zlib.crc32(str(chat_id).encode()) % config.SHARDS
+
+
+def owns(chat_id: int) -> bool:
+    return not enabled() or shard_of(chat_id) == config.SHARD_ID
+
+
+def owns_assistant(number: int) -> bool:
+    """Whether assistant ``number`` (1-5) runs in this process.
+
+    Configured assistants are dealt out to the shards in turn, so every
+    shard gets one as long as SHARDS is at most the number of sessions.
+    """
+    if not enabled():
+        return True
+    configured = [
+        n
+        for n, session in enumerate(
+            (config.STRING1, config.STRING2, config.STRING3, config.STRING4, config.STRING5),
+            start=1,
+        )
+        if session
+    ]
+    return number in configured and configured.index(number) % config.SHARDS == config.SHARD_ID
+
+
+def _key(shard_id: int) -> str:
+    return f"music:v{config.CACHE_SCHEMA_VERSION}:shard:{shard_id}:updates"
+
+
+def _control_key() -> str:
+    return f"music:v{config.CACHE_SCHEMA_VERSION}:shard:control"
+
+
+def _queues_key(shard_id: int) -> str:
+    return f"music:v{config.CACHE_SCHEMA_VERSION}:shard:{shard_id}:queues"
+
+
+def _get_bus() -> Redis:
+    # Updates travel as raw TL bytes, so this connection does not decode.
+    global _bus
+    if _bus is None:
+        _bus = Redis.from_url(url=config.REDIS_URL, password=config.REDIS_PASSWORD)
+    return _bus
+
+
+def _chat_id(update) -> Optional[int]:
+    """The group or channel an update belongs to; None for private chats and inline queries."""
+    message = getattr(update, "message", None)
+    peer = getattr(message, "peer_id", None) or getattr(update, "peer", None)
+    if peer is not None:
+        if isinstance(peer, raw.types.PeerUser):
+            return None
+        return utils.get_peer_id(peer)
+    channel_id = getattr(update, "channel_id", None)
+    if isinstance(channel_id, int):
+        return utils.get_channel_id(channel_id)
+    return None
+
+
+def _encode(update, users: dict, chats: dict) -> bytes:
+    return b"".join(
+        [Int(len(users)), Int(len(chats)), update.write()]
+        + [peer.write() for peer in users.values()]
+        + [peer.write() for peer in chats.values()]
+    )
+
+
+def _decode(data: bytes):
+    b = BytesIO(data)
+    n_users, n_chats = Int.read(b), Int.read(b)
+    update = TLObject.read(b)
+    users = [TLObject.read(b) for _ in range(n_users)]
+    chats = [TLObject.read(b) for _ in range(n_chats)]
+    return update, {u.id: u for u in users}, {c.id: c for c in chats}
+
+
+class _RoutingQueue(asyncio.Queue):
+    """The front's update queue: keeps its own chats, hands the rest to their shards."""
+
+    def __init__(self, outbox: asyncio.Queue):
+        super().__init__()
+        self.outbox = outbox
+
+    def put_nowait(self, item):
+        if item is not None:
+            update, users, chats = item
+            chat_id = _chat_id(update)
+            if chat_id is not None and not owns(chat_id):
+                self.outbox.put_nowait((shard_of(chat_id), item))
+                return
+        super().put_nowait(item)
+
+
+async def _forward(outbox: asyncio.Queue):
+    bus = _get_bus()
+    while True:
+        batch = [await outbox.get()]
+        while not outbox.empty() and len(batch) < FORWARD_BATCH:
+            batch.append(outbox.get_nowait())
+        pipe = bus.pipeline(transaction=False)
+        for shard_id, (update, users, chats) in batch:
+            pipe.rpush(_key(shard_id), _encode(update, users, chats))
+        try:
+            await pipe.execute()
+            metrics.inc("shard_updates_forwarded_total", len(batch))
+        except Exception as e:
+            metrics.inc("shard_forward_errors_total", len(batch))
+            LOGGER(__name__).warning(f"Dropped {len(batch)} updates for other shards: {e}")
+
+
+async def _consume(app):
+    bus = _get_bus()
+    key = _key(config.SHARD_ID)
+    queue = app.dispatcher.updates_queue
+    while True:
+        try:
+            popped = await bus.blpop(key, timeout=5)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER(__name__).warning(f"Shard {config.SHARD_ID} cannot read updates: {e}")
+            await asyncio.sleep(1)
+            continue
+        if not popped:
+            continue
+        try:
+            update, users, chats = _decode(popped[1])
+        except Exception as e:
+            LOGGER(__name__).warning(f"Unreadable forwarded update: {e}")
+            continue
+        # Remember access hashes, as pyrogram does for updates it receives itself.
+        await app.fetch_peers(list(users.values()) + list(chats.values()))
+        queue.put_nowait((update, users, chats))
+        metrics.inc("shard_updates_received_total")
+
+
+def _apply(kind: str, value):
+    # Imported here: these modules import the bot, which imports this one.
+    from ZeMusic.misc import SUDOERS
+    from ZeMusic.utils.database import maintenance
+
+    if kind == "sudo_add":
+        SUDOERS.add(value)
+    elif kind == "sudo_remove":
+        SUDOERS.discard(value)
+    elif kind == "banned_add":
+        config.BANNED_USERS.add(value)
+    elif kind == "banned_remove":
+        config.BANNED_USERS.discard(value)
+    elif kind == "maintenance":
+        maintenance.clear()
+        maintenance.append(value)
+
+
+async def share(kind: str, value):
+    """Tell the other shards about a change to global admin state.
+
+    Sudoers, blocked users and maintenance mode live in every process's
+    memory; the handler that changed them here publishes the change and
+    every other shard applies it with ``_apply``. A no-op with one shard.
+    """
+    if not enabled():
+        return
+    message = json.dumps({"from": config.SHARD_ID, "kind": kind, "value": value})
+    try:
+        await _get_bus().publish(_control_key(), message)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Could not share {kind} with the other shards: {e}")
+
+
+def front_command(kind: str):
+    """Register what the front runs when a worker calls ``to_front(kind, ...)``."""
+
+    def register(fn):
+        _front_commands[kind] = fn
+        return fn
+
+    return register
+
+
+async def to_front(kind: str, *args):
+    """Have the front run the ``kind`` command, for commands that act on every shard."""
+    message = json.dumps({"from": config.SHARD_ID, "to": "front", "kind": kind, "args": args})
+    await _get_bus().publish(_control_key(), message)
+
+
+async def _listen():
+    while True:
+        pubsub = _get_bus().pubsub()
+        try:
+            await pubsub.subscribe(_control_key())
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                data = json.loads(message["data"])
+                if data["from"] == config.SHARD_ID:
+                    continue
+                if data.get("to") != "front":
+                    _apply(data["kind"], data["value"])
+                elif is_front() and data["kind"] in _front_commands:
+                    # Not in _tasks: a restart runs stop(), which cancels those.
+                    task = asyncio.create_task(_front_commands[data["kind"]](*data["args"]))
+                    _commands_running.add(task)
+                    task.add_done_callback(_commands_running.discard)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER(__name__).warning(f"Shard {config.SHARD_ID} lost the control channel: {e}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.reset()
+
+
+async def _mirror_queues():
+    """Copy this shard's queues to Redis, where every process can read them."""
+    from ZeMusic.misc import db
+
+    bus = _get_bus()
+    key = _queues_key(config.SHARD_ID)
+    written: Dict[int, str] = {}
+    while True:
+        await asyncio.sleep(MIRROR_INTERVAL)
+        current = {
+            chat_id: json.dumps(queue, default=str)
+            for chat_id, queue in list(db.items())
+            if queue
+        }
+        changed = {str(c): q for c, q in current.items() if written.get(c) != q}
+        gone = [str(c) for c in written if c not in current]
+        if not changed and not gone:
+            continue
+        pipe = bus.pipeline(transaction=False)
+        if changed:
+            pipe.hset(key, mapping=changed)
+        if gone:
+            pipe.hdel(key, *gone)
+        try:
+            await pipe.execute()
+            written = current
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not mirror the queues of shard {config.SHARD_ID}: {e}")
+
+
+async def queues(chat_ids: Iterable[int]) -> Dict[int, list]:
+    """The queues of ``chat_ids``, whichever shard plays them.
+
+    Other shards' queues come from their Redis mirror and can be up to
+    MIRROR_INTERVAL seconds old.
+    """
+    from ZeMusic.misc import db
+
+    found = {}
+    remote: Dict[int, List[int]] = {}
+    for chat_id in chat_ids:
+        if owns(chat_id):
+            if db.get(chat_id):
+                found[chat_id] = db[chat_id]
+        else:
+            remote.setdefault(shard_of(chat_id), []).append(chat_id)
+    for shard_id, chats in remote.items():
+        try:
+            values = await _get_bus().hmget(_queues_key(shard_id), [str(c) for c in chats])
+        except Exception:
+            continue
+        for chat_id, value in zip(chats, values):
+            if value:
+                found[chat_id] = json.loads(value)
+    return found
+
+
+async def _watch_front(front_pid: int):
+    # Workers stop with the front (e.g. after /restart killed it), so a new
+    # front never ends up with two owners for the same chats.
+    while True:
+        await asyncio.sleep(SUPERVISE_INTERVAL)
+        if os.getppid() != front_pid:
+            LOGGER(__name__).warning(f"Front process is gone, stopping shard {config.SHARD_ID}.")
+            os.kill(os.getpid(), signal.SIGTERM)
+            return
+
+
+def _spawn(shard_id: int) -> subprocess.Popen:
+    env = dict(os.environ, SHARD_ID=str(shard_id))
+    return subprocess.Popen([sys.executable, "-m", "ZeMusic"], env=env)
+
+
+async def _supervise():
+    while True:
+        await asyncio.sleep(SUPERVISE_INTERVAL)
+        for shard_id, process in list(_workers.items()):
+            if process.poll() is not None:
+                LOGGER(__name__).warning(
+                    f"Shard {shard_id} exited with {process.returncode}, restarting it."
+                )
+                _workers[shard_id] = _spawn(shard_id)
+
+
+def install(app):
+    """Route this process's updates before the bot starts; a no-op with one shard.
+
+    The front swaps pyrogram's update queue for one that forwards other
+    shards' chats. Workers receive nothing from Telegram themselves
+    (their client has no_updates set), so they start the update workers
+    pyrogram would otherwise skip.
+    """
+    if not enabled():
+        return
+    if not any(owns_assistant(number) for number in range(1, 6)):
+        LOGGER(__name__).error(
+            f"Shard {config.SHARD_ID} has no assistant: SHARDS must not exceed the number of STRING sessions."
+        )
+        exit()
+    if is_front():
+        outbox = asyncio.Queue()
+        app.dispatcher.updates_queue = _RoutingQueue(outbox)
+        _tasks.append(asyncio.create_task(_forward(outbox)))
+    else:
+        dispatcher = app.dispatcher
+        for _ in range(app.workers):
+            dispatcher.locks_list.append(asyncio.Lock())
+            dispatcher.handler_worker_tasks.append(
+                asyncio.create_task(dispatcher.handler_worker(dispatcher.locks_list[-1]))
+            )
+
+
+async def start(app):
+    """Start the worker processes (front) or the forwarded-update reader (workers)."""
+    if not enabled():
+        return
+    await forget_shard_chats(config.SHARD_ID)
+    try:
+        await _get_bus().delete(_queues_key(config.SHARD_ID))
+    except Exception:
+        pass
+    _tasks.append(asyncio.create_task(_listen()))
+    _tasks.append(asyncio.create_task(_mirror_queues()))
+    if is_front():
+        for shard_id in range(1, config.SHARDS):
+            _workers[shard_id] = _spawn(shard_id)
+        _tasks.append(asyncio.create_task(_supervise()))
+        LOGGER(__name__).info(f"Started {config.SHARDS - 1} shard workers.")
+    else:
+        _tasks.append(asyncio.create_task(_consume(app)))
+        _tasks.append(asyncio.create_task(_watch_front(os.getppid())))
+        LOGGER(__name__).info(f"Shard {config.SHARD_ID} of {config.SHARDS} is reading its updates.")
+
+
+async def stop(app):
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    for process in _workers.values():
+        process.terminate()
+    for process in _workers.values():
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    _workers.clear()
+    if enabled() and not is_front():
+        dispatcher = app.dispatcher
+        for task in dispatcher.handler_worker_tasks:
+            task.cancel()
+        await asyncio.gather(*dispatcher.handler_worker_tasks, return_exceptions=True)
+        dispatcher.handler_worker_tasks.clear()
+        dispatcher.locks_list.clear()
@@ -3,6 +3,7 @@ from pyrogram import Client
 import config
 
 from ..logging import LOGGER
+from .shard import owns_assistant
 
 assistants = []
 assistantids = []
@@ -48,7 +49,7 @@ class Userbot(Client):
 
     async def start(self):
         LOGGER(__name__).info(f"جلب معلومات السورس...")
-        if config.STRING1:
+        if config.STRING1 and owns_assistant(1):
             await self.one.start()
             try:
                 await self.one.join_chat("EF_19")
@@ -69,7 +70,7 @@ class Userbot(Client):
             assistantids.append(self.one.id)
             LOGGER(__name__).info(f"تم تشغيل المساعد {self.one.name} على سورس الملك")
 
-        if config.STRING2:
+        if config.STRING2 and owns_assistant(2):
             await self.two.start()
             try:
                 await self.two.join_chat("GY_19")
@@ -90,7 +91,7 @@ class Userbot(Client):
             assistantids.append(self.two.id)
             LOGGER(__name__).info(f"Assistant Two Started as {self.two.name}")
 
-        if config.STRING3:
+        if config.STRING3 and owns_assistant(3):
             await self.three.start()
             try:
                 await self.three.join_chat("EF_19")
@@ -111,7 +112,7 @@ class Userbot(Client):
             assistantids.append(self.three.id)
             LOGGER(__name__).info(f"Assistant Three Started as {self.three.name}")
 
-        if config.STRING4:
+        if config.STRING4 and owns_assistant(4):
             await self.four.start()
             try:
                 await self.four.join_chat("GY_19")
@@ -132,7 +133,7 @@ class Userbot(Client):
             assistantids.append(self.four.id)
             LOGGER(__name__).info(f"Assistant Four Started as {self.four.name}")
 
-        if config.STRING5:
+        if config.STRING5 and owns_assistant(5):
             await self.five.start()
             try:
                 await self.five.join_chat("EF_19")
@@ -156,15 +157,15 @@ class Userbot(Client):
     async def stop(self):
         LOGGER(__name__).info(f"Stopping Assistants...")
         try:
-            if config.STRING1:
+            if config.STRING1 and owns_assistant(1):
                 await self.one.stop()
-            if config.STRING2:
+            if config.STRING2 and owns_assistant(2):
                 await self.two.stop()
-            if config.STRING3:
+            if config.STRING3 and owns_assistant(3):
                 await self.three.stop()
-            if config.STRING4:
+            if config.STRING4 and owns_assistant(4):
                 await self.four.stop()
-            if config.STRING5:
+            if config.STRING5 and owns_assistant(5):
                 await self.five.stop()
         except:
             pass
@@ -0,0 +1,69 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+import config
+from ZeMusic.core.metrics import metrics
+from ZeMusic.logging import LOGGER
+
+BEAT_INTERVAL = 0.1
+
+
+class BlockingWatchdog:
+    """Reports code that holds the event loop.
+
+    A task on the loop records a heartbeat every ``BEAT_INTERVAL``. A daemon
+    thread checks it; once the heartbeat is older than the threshold, the
+    loop thread's current stack is logged (once per stall), so the
+    blocking call shows up by file and line.
+    """
+
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    async def _heartbeat(self):
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(BEAT_INTERVAL)
+
+    def _watch(self):
+        reported = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or reported == beat:
+                continue
+            reported = beat
+            metrics.inc("event_loop_blocked_total")
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)[-8:]) if frame else "?"
+            LOGGER(__name__).warning(
+                f"Event loop blocked for {stalled * 1000:.0f} ms at:\n{stack}"
+            )
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+
+watchdog = BlockingWatchdog(config.BLOCKING_THRESHOLD_MS)
+
+
+def start_watchdog():
+    if config.BLOCKING_THRESHOLD_MS:
+        watchdog.start()
@@ -1,9 +1,20 @@
 import re
-from typing import Union
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlparse
 
 import aiohttp
-from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+
+from ZeMusic.utils.htmlmeta import meta_tags
+from ZeMusic.utils.search import match_tracks, search_videos
+
+
+def _song_key(link: str) -> Optional[str]:
+    """Match cache key of an Apple Music song URL (its ``?i=`` id)."""
+    parsed = urlparse(link)
+    song_id = parse_qs(parsed.query).get("i", [None])[0]
+    if not song_id:
+        song_id = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+    return f"apple:{song_id}" if song_id and song_id.isdigit() else None
 
 
 class AppleAPI:
@@ -25,28 +36,19 @@ class AppleAPI:
                 if response.status != 200:
                     return False
                 html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        search = None
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                search = tag.get("content", None)
-        if search is None:
+        titles = (await meta_tags(html, "og:title"))["og:title"]
+        if not titles:
             return False
-        results = VideosSearch(search, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        search = titles[-1]
+        details = (await search_videos(search, 1))[0]
         track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
+            "title": details["title"],
+            "link": details["link"],
+            "vidid": details["vidid"],
+            "duration_min": details["duration_min"],
+            "thumb": details["thumb"],
         }
-        return track_details, vidid
+        return track_details, details["vidid"]
 
     async def playlist(self, url, playid: Union[bool, str] = None):
         if playid:
@@ -57,15 +59,12 @@ class AppleAPI:
                 if response.status != 200:
                     return False
                 html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        applelinks = soup.find_all("meta", attrs={"property": "music:song"})
-        results = []
+        applelinks = (await meta_tags(html, "music:song"))["music:song"]
+        tracks = []
         for item in applelinks:
             try:
-                xx = (((item["content"]).split("album/")[1]).split("/")[0]).replace(
-                    "-", " "
-                )
-            except:
-                xx = ((item["content"]).split("album/")[1]).split("/")[0]
-            results.append(xx)
-        return results, playlist_id
+                xx = ((item.split("album/")[1]).split("/")[0]).replace("-", " ")
+            except IndexError:
+                continue
+            tracks.append((_song_key(item), xx))
+        return await match_tracks(tracks), playlist_id
@@ -2,8 +2,9 @@ import re
 from typing import Union
 
 import aiohttp
-from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+
+from ZeMusic.utils.htmlmeta import meta_tags
+from ZeMusic.utils.search import search_videos
 
 
 class RessoAPI:
@@ -25,30 +26,19 @@ class RessoAPI:
                 if response.status != 200:
                     return False
                 html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                title = tag.get("content", None)
-            if tag.get("property", None) == "og:description":
-                des = tag.get("content", None)
-                try:
-                    des = des.split("·")[0]
-                except:
-                    pass
+        tags = await meta_tags(html, "og:title", "og:description")
+        if not tags["og:title"] or not tags["og:description"]:
+            return
+        title = tags["og:title"][-1]
+        des = tags["og:description"][-1].split("·")[0]
         if des == "":
             return
-        results = VideosSearch(title, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        details = (await search_videos(title, 1))[0]
         track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
+            "title": details["title"],
+            "link": details["link"],
+            "vidid": details["vidid"],
+            "duration_min": details["duration_min"],
+            "thumb": details["thumb"],
         }
-        return track_details, vidid
+        return track_details, details["vidid"]
@@ -1,8 +1,22 @@
-from os import path
+import asyncio
+import glob
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
 
 from yt_dlp import YoutubeDL
 
+import config
+from ZeMusic.logging import LOGGER
 from ZeMusic.utils.formatters import seconds_to_min
+from ZeMusic.utils.workers import download_executor
+
+MAX_TRACKS = 512
+# Stream URLs are signed and expire, so extractions are redone after this.
+TRACK_TTL = 600
+# Files yt-dlp is still writing; never handed out as finished tracks.
+PARTIAL_SUFFIXES = (".part", ".ytdl", ".temp")
 
 
 class SoundAPI:
@@ -13,7 +27,13 @@ class SoundAPI:
             "retries": 3,
             "nooverwrites": False,
             "continuedl": True,
+            "quiet": True,
         }
+        # page URL -> (info, extracted at)
+        self._tracks: "OrderedDict[str, tuple]" = OrderedDict()
+        # stream URL handed to a call -> track id, to swap in the local copy later
+        self._streams: "OrderedDict[str, str]" = OrderedDict()
+        self._downloads: Dict[str, asyncio.Task] = {}
 
     async def valid(self, link: str):
         if "soundcloud" in link:
@@ -21,19 +41,114 @@ class SoundAPI:
         else:
             return False
 
+    def _local(self, track_id: str) -> Optional[str]:
+        pattern = os.path.join("downloads", f"{glob.escape(track_id)}.*")
+        for path in glob.glob(pattern):
+            if not path.endswith(PARTIAL_SUFFIXES) and ".part-" not in path:
+                return path
+        return None
+
+    def _extract(self, url: str) -> dict:
+        with YoutubeDL(self.opts) as ydl:
+            return ydl.extract_info(url, download=False)
+
+    def _fetch(self, url: str) -> str:
+        with YoutubeDL(self.opts) as ydl:
+            return ydl.prepare_filename(ydl.extract_info(url))
+
+    async def track(self, url: str) -> dict:
+        """yt-dlp info for ``url``, extracted off-loop and cached by URL."""
+        hit = self._tracks.get(url)
+        if hit and time.time() - hit[1] < TRACK_TTL:
+            self._tracks.move_to_end(url)
+            return hit[0]
+        info = await asyncio.get_running_loop().run_in_executor(
+            download_executor, self._extract, url
+        )
+        self._tracks[url] = (info, time.time())
+        while len(self._tracks) > MAX_TRACKS:
+            self._tracks.popitem(last=False)
+        return info
+
+    def _schedule(self, track_id: str, url: str) -> asyncio.Task:
+        task = self._downloads.get(track_id)
+        if task is None:
+            task = asyncio.create_task(self._download_file(track_id, url))
+            self._downloads[track_id] = task
+            task.add_done_callback(lambda _: self._downloads.pop(track_id, None))
+        return task
+
+    def _remember(self, stream_url: str, track_id: str):
+        self._streams[stream_url] = track_id
+        while len(self._streams) > MAX_TRACKS:
+            self._streams.popitem(last=False)
+
+    async def _download_file(self, track_id: str, url: str) -> Optional[str]:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                download_executor, self._fetch, url
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"SoundCloud download of {track_id} failed: {e}")
+            return None
+
     async def download(self, url):
-        d = YoutubeDL(self.opts)
+        """Track details and a playable source for ``url``.
+
+        An already downloaded copy is reused by track id. Otherwise the
+        stream URL is returned so playback can start at once while the file
+        is fetched in the background; ``playable`` later swaps it in.
+        """
         try:
-            info = d.extract_info(url)
-        except:
+            info = await self.track(url)
+        except Exception:
             return False
-        xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
+        track_id = str(info["id"])
+        source = self._local(track_id)
+        if source is None:
+            stream_url = info.get("url")
+            # play.py rejects tracks over the limit; only fetch ones that can play.
+            if (info.get("duration") or 0) <= config.DURATION_LIMIT or not stream_url:
+                task = self._schedule(track_id, info.get("webpage_url") or url)
+            if stream_url:
+                source = stream_url
+                self._remember(stream_url, track_id)
+            else:
+                source = await task
+                if not source:
+                    return False
         duration_min = seconds_to_min(info["duration"])
         track_details = {
             "title": info["title"],
             "duration_sec": info["duration"],
             "duration_min": duration_min,
             "uploader": info["uploader"],
-            "filepath": xyz,
+            "filepath": source,
+            "track_id": track_id,
         }
-        return track_details, xyz
+        return track_details, source
+
+    def reuse(self, url: str, result):
+        """Adopt a ``download`` result for ``url`` resolved by another chat or shard.
+
+        Only the extraction is shared: the stream URL is recorded and the
+        file fetched here too, so ``playable`` can swap in the local copy.
+        """
+        details, source = result
+        track_id = details["track_id"]
+        local = self._local(track_id)
+        if local:
+            details["filepath"] = local
+            return details, local
+        if source.startswith("http"):
+            if (details.get("duration_sec") or 0) <= config.DURATION_LIMIT:
+                self._schedule(track_id, url)
+            self._remember(source, track_id)
+        return details, source
+
+    def playable(self, source: str) -> str:
+        """The local copy of a streamed track once its download has finished."""
+        track_id = self._streams.get(source)
+        if track_id:
+            return self._local(track_id) or source
+        return source
@@ -1,10 +1,32 @@
+import asyncio
 import re
+from functools import partial
+from typing import List, Optional
 
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
-from youtubesearchpython.__future__ import VideosSearch
 
 import config
+from ZeMusic.utils.search import match_tracks
+
+
+def _query(track: dict) -> str:
+    info = track["name"]
+    for artist in track["artists"]:
+        fetched = f' {artist["name"]}'
+        if "Various Artists" not in fetched:
+            info += fetched
+    return info
+
+
+def _match_key(track: dict) -> Optional[str]:
+    """Cache key of a Spotify track: its ISRC when known, else its id."""
+    isrc = (track.get("external_ids") or {}).get("isrc")
+    if isrc:
+        return f"isrc:{isrc.upper()}"
+    if track.get("id"):
+        return f"spotify:{track['id']}"
+    return None
 
 
 class SpotifyAPI:
@@ -28,71 +50,64 @@ class SpotifyAPI:
         else:
             return False
 
+    async def _call(self, method, *args, **kwargs):
+        """Run a blocking spotipy call in the default executor."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(method, *args, **kwargs)
+        )
+
+    async def _items(self, fetch, url: str, page_size: int) -> List[dict]:
+        """Items of a paged listing, up to PLAYLIST_FETCH_LIMIT.
+
+        The first page gives the total; the remaining pages are requested
+        concurrently by offset.
+        """
+        first = await self._call(fetch, url, limit=page_size, offset=0)
+        wanted = min(first["total"], config.PLAYLIST_FETCH_LIMIT)
+        pages = await asyncio.gather(
+            *(
+                self._call(fetch, url, limit=page_size, offset=offset)
+                for offset in range(page_size, wanted, page_size)
+            )
+        )
+        items = list(first["items"])
+        for page in pages:
+            items.extend(page["items"])
+        return items[:wanted]
+
+    async def _resolve(self, tracks: List[dict]) -> List[dict]:
+        return await match_tracks([(_match_key(t), _query(t)) for t in tracks])
+
     async def track(self, link: str):
-        track = self.spotify.track(link)
-        info = track["name"]
-        for artist in track["artists"]:
-            fetched = f' {artist["name"]}'
-            if "Various Artists" not in fetched:
-                info += fetched
-        results = VideosSearch(info, limit=1)
-        for result in (await results.next())["result"]:
-            ytlink = result["link"]
-            title = result["title"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
-        }
-        return track_details, vidid
+        track = await self._call(self.spotify.track, link)
+        track_details = (await self._resolve([track]))[0]
+        return track_details, track_details["vidid"]
 
     async def playlist(self, url):
-        playlist = self.spotify.playlist(url)
-        playlist_id = playlist["id"]
-        results = []
-        for item in playlist["tracks"]["items"]:
-            music_track = item["track"]
-            info = music_track["name"]
-            for artist in music_track["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-        return results, playlist_id
+        match = re.search(r"playlist[/:]([A-Za-z0-9]+)", url)
+        playlist_id = match.group(1) if match else url
+        items = await self._items(self.spotify.playlist_items, url, 100)
+        tracks = [
+            item["track"]
+            for item in items
+            if item.get("track") and item["track"].get("type", "track") == "track"
+        ]
+        return await self._resolve(tracks), playlist_id
 
     async def album(self, url):
-        album = self.spotify.album(url)
-        album_id = album["id"]
-        results = []
-        for item in album["tracks"]["items"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
+        album, tracks = await asyncio.gather(
+            self._call(self.spotify.album, url),
+            self._items(self.spotify.album_tracks, url, 50),
+        )
+        # Album listings omit ISRCs; key them by track id instead.
         return (
-            results,
-            album_id,
+            await self._resolve(tracks),
+            album["id"],
         )
 
     async def artist(self, url):
-        artistinfo = self.spotify.artist(url)
-        artist_id = artistinfo["id"]
-        results = []
-        artisttoptracks = self.spotify.artist_top_tracks(url)
-        for item in artisttoptracks["tracks"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
-        return results, artist_id
+        artistinfo, artisttoptracks = await asyncio.gather(
+            self._call(self.spotify.artist, url),
+            self._call(self.spotify.artist_top_tracks, url),
+        )
+        return await self._resolve(artisttoptracks["tracks"]), artistinfo["id"]
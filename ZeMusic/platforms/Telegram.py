@@ -1,19 +1,179 @@
 import asyncio
 import os
 import time
-from typing import Union
+from typing import Dict, Optional, Union
 
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Voice
 
 import config
 from ZeMusic import app
+from ZeMusic.core.metrics import metrics
+from ZeMusic.misc import db
+from ZeMusic.utils.editor import editor
+from ZeMusic.utils.mediastore import PART_SUFFIX, lookup, schedule_evict
+from ZeMusic.utils.probe import media_duration
+from ZeMusic.utils.stream.progressive import GrowingFile, streamable
 from ZeMusic.utils.formatters import (
-    check_duration,
     convert_bytes,
     get_readable_time,
     seconds_to_min,
 )
 
+# Pyrogram streams files in chunks of this size; ranged reads count in chunks.
+CHUNK = 1024 * 1024
+# Seconds between progress renders of one download.
+PROGRESS_INTERVAL = 2
+
+CANCEL_MARKUP = InlineKeyboardMarkup(
+    [[InlineKeyboardButton(text="ᴄᴀɴᴄᴇʟ", callback_data="stop_downloading")]]
+)
+
+
+class _Ingest:
+    """One download of a Telegram file, shared by every chat waiting for it."""
+
+    def __init__(self, media, fname: str):
+        self.fname = fname
+        self.total = media.file_size or 0
+        self.started = time.time()
+        # mystic message id -> (mystic message, language strings)
+        self.watchers = {}
+        self.task: Optional[asyncio.Task] = None
+        self._reported = 0.0
+        self.progressive = bool(
+            config.TG_PROGRESSIVE_MB
+            and self.total > config.TG_PROGRESSIVE_MB * 1024 * 1024
+            and hasattr(os, "mkfifo")
+        )
+        # Set once playback can start: enough of the front is written, or done.
+        self.ready = asyncio.Event()
+        self.growing: Optional[GrowingFile] = None
+        self.streamable: Optional[bool] = None
+        # Someone plays the file while it downloads; cancels no longer stop it.
+        self.keep = False
+
+    def report(self, current: int, total: int):
+        now = time.time()
+        if not total or current >= total or now - self._reported < PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        speed = current / max(now - self.started, 0.001)
+        eta = get_readable_time(int((total - current) / speed)) if speed else None
+        fields = (
+            convert_bytes(total),
+            convert_bytes(current),
+            str(round(current * 100 / total, 2))[:5],
+            convert_bytes(speed),
+            eta or "0 sᴇᴄᴏɴᴅs",
+        )
+        # The scheduler keeps only the latest state and paces the edits.
+        for mystic, _ in self.watchers.values():
+            editor.edit_text(
+                mystic,
+                _["tg_1"].format(app.mention, *fields),
+                reply_markup=CANCEL_MARKUP,
+            )
+
+    async def _progress(self, current, total):
+        self.report(current, total)
+
+    async def fetch(self, message):
+        part = self.fname + PART_SUFFIX
+        try:
+            parallel = config.TG_DOWNLOAD_CONNECTIONS > 1 and (
+                self.total >= config.TG_PARALLEL_MIN_MB * 1024 * 1024
+            )
+            if parallel or self.progressive:
+                await self._fetch_ranges(message, part)
+            elif not await app.download_media(
+                message, file_name=part, progress=self._progress
+            ):
+                raise IOError(f"Download of {self.fname} returned nothing")
+            os.replace(part, self.fname)
+        except BaseException:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+            raise
+        finally:
+            if self.growing is not None:
+                self.growing.finish()
+            self.ready.set()
+        schedule_evict()
+
+    async def wait(self, progressive: bool):
+        """Until the file is complete, or playable from its front if ``progressive``."""
+        if progressive and self.progressive:
+            ready = asyncio.ensure_future(self.ready.wait())
+            try:
+                await asyncio.wait({self.task, ready}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                ready.cancel()
+            if not self.task.done():
+                self.keep = True
+                return
+        await asyncio.shield(self.task)
+
+    def _wrote(self, start: int, chunk: bytes):
+        self.growing.wrote(start, len(chunk))
+        if not self.progressive or self.ready.is_set():
+            return
+        if self.streamable is None and start == 0:
+            self.streamable = streamable(chunk)
+        if self.streamable and (
+            self.growing.available >= config.TG_PROGRESSIVE_MB * 1024 * 1024
+        ):
+            self.ready.set()
+
+    async def _fetch_ranges(self, message, part: str):
+        """Read the file as TG_DOWNLOAD_CONNECTIONS concurrent chunk ranges."""
+        loop = asyncio.get_running_loop()
+        chunks = -(-self.total // CHUNK)
+        connections = max(config.TG_DOWNLOAD_CONNECTIONS, 1)
+        per_range = -(-chunks // min(connections, chunks))
+        starts = range(0, chunks, per_range)
+        received = 0
+
+        async def read_range(first: int):
+            nonlocal received
+            start = position = first * CHUNK
+            async for chunk in app.stream_media(message, limit=per_range, offset=first):
+                await loop.run_in_executor(None, os.pwrite, fd, chunk, position)
+                position += len(chunk)
+                received += len(chunk)
+                self._wrote(start, chunk)
+                self.report(received, self.total)
+
+        fd = os.open(part, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        self.growing = GrowingFile(
+            part,
+            [
+                (first * CHUNK, min((first + per_range) * CHUNK, self.total))
+                for first in starts
+            ],
+        )
+        try:
+            await loop.run_in_executor(None, os.ftruncate, fd, self.total)
+            ranges = [asyncio.ensure_future(read_range(first)) for first in starts]
+            try:
+                await asyncio.gather(*ranges)
+            except BaseException:
+                for task in ranges:
+                    task.cancel()
+                await asyncio.gather(*ranges, return_exceptions=True)
+                raise
+        finally:
+            os.close(fd)
+        if received != self.total:
+            raise IOError(f"Got {received} of {self.total} bytes for {self.fname}")
+
+
+# file_unique_id -> download in progress
+_jobs: Dict[str, _Ingest] = {}
+# target path -> download in progress, for playback while it runs
+_by_path: Dict[str, _Ingest] = {}
+
 
 class TeleAPI:
     def __init__(self):
@@ -30,6 +190,13 @@ class TeleAPI:
                 await message.reply_text(x, disable_web_page_preview=True)
         return True
 
+    def playable(self, path: str) -> str:
+        """A live stream of ``path`` while its progressive download runs."""
+        job = _by_path.get(path)
+        if job is None or job.task.done() or not job.keep:
+            return path
+        return job.growing.open_stream()
+
     async def get_link(self, message):
         return message.link
 
@@ -49,17 +216,38 @@ class TeleAPI:
             dur = "Unknown"
         return dur
 
+    async def _fill_duration(self, job: _Ingest, file_path: str):
+        """Probe ``file_path`` once its download completes and fix its queue entries."""
+        try:
+            await asyncio.shield(job.task)
+            seconds = await media_duration(file_path)
+        except BaseException:
+            return
+        if not seconds:
+            return
+        for queue in list(db.values()):
+            for entry in queue:
+                if entry.get("file") == file_path and not entry.get("seconds"):
+                    entry["dur"] = seconds_to_min(seconds)
+                    entry["seconds"] = int(seconds) - 3
+
     async def get_duration(self, filex, file_path):
         try:
             dur = seconds_to_min(filex.duration)
         except:
+            job = _by_path.get(file_path)
+            if job is not None and not job.task.done():
+                # Still downloading (documents carry no duration): queue it as
+                # unknown and fill it in once the whole file is there.
+                asyncio.create_task(self._fill_duration(job, file_path))
+                return "Unknown"
             try:
-                dur = await asyncio.get_event_loop().run_in_executor(
-                    None, check_duration, file_path
-                )
-                dur = seconds_to_min(dur)
+                dur = await media_duration(file_path)
             except:
+                dur = None
+            if dur is None:
                 return "Unknown"
+            dur = seconds_to_min(dur)
         return dur
 
     async def get_filepath(
@@ -91,86 +279,55 @@ class TeleAPI:
             file_name = os.path.join(os.path.realpath("downloads"), file_name)
         return file_name
 
-    async def download(self, _, message, mystic, fname):
-        lower = [0, 8, 17, 38, 64, 77, 96]
-        higher = [5, 10, 20, 40, 66, 80, 99]
-        checker = [5, 10, 20, 40, 66, 80, 99]
-        speed_counter = {}
-        if os.path.exists(fname):
+    async def download(self, _, message, mystic, fname, progressive=False):
+        """Fetch the replied media into ``fname``; False when cancelled or failed.
+
+        Chats asking for the same file at once share one download and all
+        see its progress. The cancel button only stops the asking chat from
+        waiting; the download itself stops when nobody waits any more.
+
+        With ``progressive``, large files return as soon as their first
+        TG_PROGRESSIVE_MB are in; ``playable`` then streams the rest as it
+        arrives while the complete file still lands at ``fname``.
+        """
+        if lookup(fname):
+            metrics.inc("tg_ingest_total", result="cached")
             return True
+        reply = message.reply_to_message
+        media = reply.audio or reply.voice or reply.video or reply.document
+        key = media.file_unique_id
+        job = _jobs.get(key)
+        if job is None:
+            job = _jobs[key] = _by_path[fname] = _Ingest(media, fname)
+            job.task = asyncio.create_task(job.fetch(reply))
 
-        async def down_load():
-            async def progress(current, total):
-                if current == total:
-                    return
-                current_time = time.time()
-                start_time = speed_counter.get(message.id)
-                check_time = current_time - start_time
-                upl = InlineKeyboardMarkup(
-                    [
-                        [
-                            InlineKeyboardButton(
-                                text="ᴄᴀɴᴄᴇʟ",
-                                callback_data="stop_downloading",
-                            ),
-                        ]
-                    ]
-                )
-                percentage = current * 100 / total
-                percentage = str(round(percentage, 2))
-                speed = current / check_time
-                eta = int((total - current) / speed)
-                eta = get_readable_time(eta)
-                if not eta:
-                    eta = "0 sᴇᴄᴏɴᴅs"
-                total_size = convert_bytes(total)
-                completed_size = convert_bytes(current)
-                speed = convert_bytes(speed)
-                percentage = int((percentage.split("."))[0])
-                for counter in range(7):
-                    low = int(lower[counter])
-                    high = int(higher[counter])
-                    check = int(checker[counter])
-                    if low < percentage <= high:
-                        if high == check:
-                            try:
-                                await mystic.edit_text(
-                                    text=_["tg_1"].format(
-                                        app.mention,
-                                        total_size,
-                                        completed_size,
-                                        percentage[:5],
-                                        speed,
-                                        eta,
-                                    ),
-                                    reply_markup=upl,
-                                )
-                                checker[counter] = 100
-                            except:
-                                pass
-
-            speed_counter[message.id] = time.time()
-            try:
-                await app.download_media(
-                    message.reply_to_message,
-                    file_name=fname,
-                    progress=progress,
-                )
-                try:
-                    elapsed = get_readable_time(
-                        int(int(time.time()) - int(speed_counter[message.id]))
-                    )
-                except:
-                    elapsed = "0 sᴇᴄᴏɴᴅs"
-                await mystic.edit_text(_["tg_2"].format(elapsed))
-            except:
-                await mystic.edit_text(_["tg_3"])
+            def forget(_t):
+                _jobs.pop(key, None)
+                _by_path.pop(fname, None)
 
-        task = asyncio.create_task(down_load())
-        config.lyrical[mystic.id] = task
-        await task
-        verify = config.lyrical.get(mystic.id)
-        if not verify:
+            job.task.add_done_callback(forget)
+            metrics.inc("tg_ingest_total", result="downloaded")
+        else:
+            metrics.inc("tg_ingest_total", result="joined")
+        job.watchers[mystic.id] = (mystic, _)
+        waiter = asyncio.ensure_future(job.wait(progressive))
+        config.lyrical[mystic.id] = waiter
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            job.watchers.pop(mystic.id, None)
+            if not job.watchers and not job.keep and not job.task.done():
+                job.task.cancel()
+            return False
+        except Exception:
+            job.watchers.pop(mystic.id, None)
+            editor.discard(mystic)
+            await mystic.edit_text(_["tg_3"])
             return False
-        config.lyrical.pop(mystic.id)
+        finally:
+            config.lyrical.pop(mystic.id, None)
+        job.watchers.pop(mystic.id, None)
+        elapsed = get_readable_time(int(time.time() - job.started)) or "0 sᴇᴄᴏɴᴅs"
+        editor.discard(mystic)
+        await mystic.edit_text(_["tg_2"].format(elapsed))
         return True
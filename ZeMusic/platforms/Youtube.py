@@ -5,7 +5,7 @@ import re
 import time
 import sys
 import shutil
-from typing import Union, List, Optional, Tuple
+from typing import Union, List, Optional
 
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
@@ -16,8 +16,8 @@ import config
 from ZeMusic.utils.database import is_on_off
 from ZeMusic.utils.formatters import time_to_seconds, seconds_to_min
 from ZeMusic.utils.decorators import asyncify
+from ZeMusic.utils.cookiepool import cookie_cooldown, cookie_pool, latency_ms_since
 from ZeMusic.core.cache import (
-    get_redis,
     extract_youtube_id,
     get_cached_gurl,
     set_cached_gurl,
@@ -25,219 +25,12 @@ from ZeMusic.core.cache import (
     release_video_lock,
     is_hard_video,
     set_hard_video,
-    record_global_success,
-    record_global_failure,
-    bump_cookie_leaderboards,
 )
+from ZeMusic.core.metrics import record_extraction
+from ZeMusic.utils.search import search_videos
 
-
-# ===== In-memory cache for cookie file discovery (reduce repeated disk I/O) =====
-_COOKIE_FILES_CACHE: Tuple[List[str], int] = ([], 0)
-_COOKIE_FILES_CACHE_TTL = 300  # 5 minutes
-
-
-def _cookie_dirs() -> List[str]:
-    """Return possible directories that may contain cookie files.
-    Priority order: explicit env dir, default 'cookies', and 'strings'.
-    """
-    dirs: List[str] = []
-    env_dir = os.getenv("YT_COOKIES_DIR")
-    if env_dir:
-        dirs.append(env_dir)
-    dirs.append(f"{os.getcwd()}/cookies")
-    dirs.append(f"{os.getcwd()}/strings")
-    seen = set()
-    unique_dirs: List[str] = []
-    for d in dirs:
-        if d and d not in seen:
-            seen.add(d)
-            unique_dirs.append(d)
-    return unique_dirs
-
-
-def _cookie_files() -> List[str]:
-    """Collect all candidate cookie files from known dirs and env overrides.
-
-    - Accept files that contain the standard Netscape header.
-    - Also accept files that appear to be Netscape TSV cookies (heuristic),
-      regardless of extension or name (to support arbitrary filenames like
-      'cookies_1.py', 'cookies(2).txt', etc.).
-    - Do NOT include obviously invalid files; return an empty list if none valid.
-    - If YT_COOKIES_FILE env is set and valid, prioritize it first.
-    """
-    global _COOKIE_FILES_CACHE
-    now = int(time.time())
-    # Serve from in-memory cache if fresh
-    if _COOKIE_FILES_CACHE[1] and (now - _COOKIE_FILES_CACHE[1] < _COOKIE_FILES_CACHE_TTL):
-        return list(_COOKIE_FILES_CACHE[0])
-
-    candidates: List[str] = []
-    
-    # Priority 1: Environment variable
-    env_file = os.getenv("YT_COOKIES_FILE")
-    if env_file and os.path.isfile(env_file):
-        candidates.append(env_file)
-    
-    # Priority 2: Known good cookies from strings directory
-    priority_cookies = [
-        f"{os.getcwd()}/strings/cookies.txt",
-        f"{os.getcwd()}/cookies/cookies.txt",
-        f"{os.getcwd()}/cookies/cookies_1.txt",
-        f"{os.getcwd()}/cookies/cookies(2).txt",
-        f"{os.getcwd()}/cookies/cookies(3).txt"
-    ]
-    
-    for cookie_path in priority_cookies:
-        if os.path.isfile(cookie_path):
-            candidates.append(cookie_path)
-
-    # Priority 3: Scan directories for other cookie files
-    for base in _cookie_dirs():
-        try:
-            for name in os.listdir(base):
-                path = os.path.join(base, name)
-                if os.path.isfile(path) and path not in candidates:
-                    candidates.append(path)
-        except FileNotFoundError:
-            continue
-
-    def is_netscape_cookie_file(path: str) -> bool:
-        try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-                sample = fh.read(4096)
-                # Check for Netscape format AND YouTube cookies
-                has_netscape_format = "Netscape HTTP Cookie File" in sample
-                has_youtube_cookies = ".youtube.com" in sample or "youtube.com" in sample
-                
-                if has_netscape_format and has_youtube_cookies:
-                    return True
-                    
-                # Fallback: check for TSV format with YouTube cookies
-                if has_youtube_cookies:
-                    for line in sample.splitlines():
-                        line = line.strip()
-                        if not line or line.startswith("#"):
-                            continue
-                        if len(line.split("\t")) >= 6 and "youtube.com" in line:
-                            return True
-        except Exception:
-            return False
-        return False
-
-    valid: List[str] = [p for p in candidates if is_netscape_cookie_file(p)]
-
-    # De-duplicate while preserving order
-    seen: set = set()
-    filtered: List[str] = []
-    for p in valid:
-        if p not in seen:
-            seen.add(p)
-            filtered.append(p)
-    _COOKIE_FILES_CACHE = (filtered, now)
-    return filtered
-
-
-def _cookie_basename(path: str) -> str:
-    return str(path).split("/")[-1]
-
-
-def _cookie_key(name: str) -> str:
-    return f"ytcookies:file:{name}"
-
-
-def _cookie_cooldown_key(name: str) -> str:
-    return f"ytcookies:cooldown:{name}"
-
-
-def _cookie_good_key(name: str) -> str:
-    return f"ytcookies:good:{name}"
-
-
-async def get_cookie_candidates() -> List[str]:
-    """Return cookie file paths ordered by health/usage (best first).
-    Prioritize recently-successful ("good") cookies. Use pipeline for Redis ops.
-    Fallback to shuffled list if Redis unavailable.
-    """
-    files = _cookie_files()
-    if not files:
-        return []
-    r = None
-    try:
-        r = get_redis()
-    except Exception:
-        r = None
-    if r is None:
-        random.shuffle(files)
-        return files
-
-    pipe = r.pipeline()
-    for path in files:
-        name = _cookie_basename(path)
-        pipe.ttl(_cookie_cooldown_key(name))
-        pipe.hgetall(_cookie_key(name))
-        pipe.exists(_cookie_good_key(name))
-    try:
-        results = await pipe.execute()
-    except Exception:
-        random.shuffle(files)
-        return files
-
-    scored: List[Tuple[int, str]] = []
-    for idx, path in enumerate(files):
-        try:
-            cooling = results[(idx * 3) + 0]
-            h = results[(idx * 3) + 1] or {}
-            is_good = 1 if results[(idx * 3) + 2] else 0
-            usage = int(h.get("usage", 0))
-            fail = int(h.get("fail", 0))
-            jitter = random.randint(0, 5)
-            score = (fail * 1_000_000) + (usage * 10) + jitter
-            if cooling and cooling > 0:
-                score += 10_000_000
-            if is_good:
-                score -= 5_000_000
-            scored.append((score, path))
-        except Exception:
-            scored.append((random.randint(0, 1000), path))
-    scored.sort(key=lambda x: x[0])
-    return [path for _, path in scored]
-
-
-async def report_cookie_success(cookie_path: str) -> None:
-    try:
-        r = get_redis()
-        name = _cookie_basename(cookie_path)
-        await r.hincrby(_cookie_key(name), "usage", 1)
-        await r.hset(_cookie_key(name), "ts", str(int(time.time())))
-        await r.set(_cookie_good_key(name), "1", ex=600)
-    except Exception:
-        pass
-
-
-async def report_cookie_failure(cookie_path: str, cooldown_seconds: int = 1800) -> None:
-    try:
-        r = get_redis()
-        name = _cookie_basename(cookie_path)
-        await r.hincrby(_cookie_key(name), "fail", 1)
-        await r.hset(_cookie_key(name), "ts", str(int(time.time())))
-        await r.set(_cookie_cooldown_key(name), "1", ex=cooldown_seconds)
-    except Exception:
-        pass
-
-
-def cookies():
-    files = _cookie_files()
-    if not files:
-        return None
-    try:
-        choice = random.choice(files)
-        for base in _cookie_dirs():
-            if choice.startswith(base.rstrip("/")):
-                return os.path.relpath(choice, os.getcwd())
-        return choice
-    except Exception:
-        return None
-
+# An 11-character YouTube video id, as yt-dlp --get-id prints them.
+VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")
 
 # UA and headers
 ANDROID_UA = (
@@ -276,6 +69,40 @@ def _extractor_args_cli() -> str:
     return "youtube:player_client=android_creator,android,ios,tvhtml5,web_safari,web:skip=authcheck,dash,hls;youtubetab:skip=authcheck"
 
 
+def _player_client(extractor_args: str) -> str:
+    m = re.search(r"player_client=([^;:]+)", extractor_args)
+    if not m:
+        return "default"
+    clients = m.group(1)
+    return "auto" if "," in clients else clients
+
+
+def _report(
+    op: str,
+    cookie_path: Optional[str],
+    ok: bool,
+    latency_ms: int,
+    stderr: str = "",
+    client: Optional[str] = None,
+) -> Optional[str]:
+    """Feed one extraction outcome to the cookie pool and the metrics; returns the error code."""
+    err_code = None
+    if ok:
+        cookie_pool.report(cookie_path, True, latency_ms)
+    else:
+        cool, err_code = cookie_cooldown(stderr)
+        cookie_pool.report(cookie_path, False, latency_ms, cool, err_code)
+    record_extraction(
+        op,
+        ok,
+        latency_ms,
+        cookie=os.path.basename(cookie_path) if cookie_path else "none",
+        client=client,
+        err_code=err_code,
+    )
+    return err_code
+
+
 def _yt_dlp_base_cmd() -> List[str]:
     exe = shutil.which("yt-dlp")
     if exe:
@@ -394,11 +221,7 @@ class YouTubeAPI:
                 lock_acquired = await acquire_video_lock(v_id, ttl_seconds=120)
             except Exception:
                 lock_acquired = True
-        try:
-            candidates = await get_cookie_candidates()
-        except Exception:
-            c = cookies()
-            candidates = [c] if c else []
+        candidates = cookie_pool.candidates() or [None]
         last_err = None
         UA_POOL = [ANDROID_UA, IOS_SAFARI_UA, MAC_SAFARI_UA]
         extractor_variants = [
@@ -446,8 +269,7 @@ class YouTubeAPI:
                         "--retry-sleep", "1:5",
                         f"{link}",
                     ]
-                    if cookie_path and os.path.exists(cookie_path):
-                        cmd[-1:-1] = ["--cookies", cookie_path]
+                    cmd[-1:-1] = cookie_pool.yt_dlp_args(cookie_path)
                     start_ts = time.time()
                     proc = await asyncio.create_subprocess_exec(
                         *cmd,
@@ -455,29 +277,11 @@ class YouTubeAPI:
                         stderr=asyncio.subprocess.PIPE,
                     )
                     stdout, stderr = await proc.communicate()
-                    latency_ms = int((time.time() - start_ts) * 1000)
+                    latency_ms = latency_ms_since(start_ts)
+                    client = _player_client(extractor_args)
                     if stdout:
                         out_url = stdout.decode().split("\n")[0]
-                        try:
-                            await report_cookie_success(cookie_path)
-                        except Exception:
-                            pass
-                        # cookie success metrics
-                        try:
-                            r = get_redis()
-                            name = _cookie_basename(cookie_path)
-                            await r.hset(_cookie_key(name), mapping={
-                                "last_latency_ms": str(latency_ms),
-                                "last_ok_ts": str(int(time.time())),
-                            })
-                        except Exception:
-                            pass
-                        # global metrics
-                        try:
-                            await record_global_success(latency_ms)
-                            await bump_cookie_leaderboards(name, True, latency_ms)
-                        except Exception:
-                            pass
+                        _report("video", cookie_path, True, latency_ms, client=client)
                         if v_id and out_url:
                             try:
                                 await set_cached_gurl(v_id, out_url, ttl_seconds=120)
@@ -491,40 +295,14 @@ class YouTubeAPI:
                         return 1, out_url
                     else:
                         last_err = (stderr.decode() if stderr else "")
-                        cool = 1800
-                        err_code = "UNKNOWN"
-                        if last_err:
-                            lower = last_err.lower()
-                            if "sign in to confirm" in lower:
-                                cool = 7200
-                                err_code = "BOT_DETECTED"
-                                try:
-                                    await set_hard_video(v_id, ttl_seconds=900)
-                                except Exception:
-                                    pass
-                            elif "429" in lower or "too many requests" in lower:
-                                err_code = "RATE_LIMIT"
-                        try:
-                            await report_cookie_failure(cookie_path, cooldown_seconds=cool)
-                        except Exception:
-                            pass
-                        # cookie failure metrics
-                        try:
-                            r = get_redis()
-                            name = _cookie_basename(cookie_path)
-                            await r.hset(_cookie_key(name), mapping={
-                                "last_latency_ms": str(latency_ms),
-                                "last_err_code": err_code,
-                                "last_err_ts": str(int(time.time())),
-                            })
-                        except Exception:
-                            pass
-                        # global metrics
-                        try:
-                            await record_global_failure(latency_ms, err_code)
-                            await bump_cookie_leaderboards(name, False, latency_ms)
-                        except Exception:
-                            pass
+                        err_code = _report(
+                            "video", cookie_path, False, latency_ms, last_err, client
+                        )
+                        if err_code == "BOT_DETECTED":
+                            try:
+                                await set_hard_video(v_id, ttl_seconds=900)
+                            except Exception:
+                                pass
                 # end fmt loop
             # end strategy loop
 
@@ -541,13 +319,8 @@ class YouTubeAPI:
         if "&" in link:
             link = link.split("&")[0]
 
-        try:
-            candidates = await get_cookie_candidates()
-        except Exception:
-            c = cookies()
-            candidates = [c] if c else []
+        candidates = cookie_pool.candidates() or [None]
 
-        last_output = ""
         for cookie_path in candidates:
             cmd = [
                 *_yt_dlp_base_cmd(),
@@ -569,35 +342,24 @@ class YouTubeAPI:
                 "--retry-sleep", "1:5",
                 f"{link}",
             ]
-            if cookie_path and os.path.exists(cookie_path):
-                cmd[-1:-1] = ["--cookies", cookie_path]
+            cmd[-1:-1] = cookie_pool.yt_dlp_args(cookie_path)
+            start_ts = time.time()
             proc = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
             stdout, stderr = await proc.communicate()
-            out = stdout.decode()
-            if out.strip():
-                try:
-                    await report_cookie_success(cookie_path)
-                except Exception:
-                    pass
-                try:
-                    return [key for key in out.split("\n") if key]
-                except Exception:
-                    return []
-            else:
-                last_output = stderr.decode()
-                try:
-                    await report_cookie_failure(cookie_path)
-                except Exception:
-                    pass
-                continue
-        try:
-            return [key for key in last_output.split("\n") if key]
-        except Exception:
-            return []
+            ids = [key.strip() for key in stdout.decode().split("\n")]
+            ids = [key for key in ids if VIDEO_ID.fullmatch(key)]
+            if ids:
+                _report("playlist", cookie_path, True, latency_ms_since(start_ts))
+                return ids
+            _report(
+                "playlist", cookie_path, False, latency_ms_since(start_ts), stderr.decode()
+            )
+        # Never the error output: a non-empty result is cached as the playlist.
+        return []
 
     async def track(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
@@ -606,24 +368,15 @@ class YouTubeAPI:
             link = link.split("&")[0]
         if link.startswith("http://") or link.startswith("https://"):
             return await self._track(link)
-        try:
-            results = VideosSearch(link, limit=1)
-            for result in (await results.next())["result"]:
-                title = result["title"]
-                duration_min = result["duration"]
-                vidid = result["id"]
-                yturl = result["link"]
-                thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            track_details = {
-                "title": title,
-                "link": yturl,
-                "vidid": vidid,
-                "duration_min": duration_min,
-                "thumb": thumbnail,
-            }
-            return track_details, vidid
-        except Exception:
-            return await self._track(link)
+        details = (await search_videos(link, 1))[0]
+        track_details = {
+            "title": details["title"],
+            "link": details["link"],
+            "vidid": details["vidid"],
+            "duration_min": details["duration_min"],
+            "thumb": details["thumb"],
+        }
+        return track_details, details["vidid"]
 
     @asyncify
     def _track(self, q):
@@ -635,11 +388,17 @@ class YouTubeAPI:
             "http_headers": _http_headers(),
             "extractor_args": _extractor_args_py(),
         }
-        c = cookies()
+        c = cookie_pool.pick()
         if c and os.path.exists(c):
             options["cookiefile"] = c
+        start_ts = time.time()
         with YoutubeDL(options) as ydl:
-            info_dict = ydl.extract_info(f"ytsearch: {q}", download=False)
+            try:
+                info_dict = ydl.extract_info(f"ytsearch: {q}", download=False)
+            except Exception as e:
+                _report("track", c, False, latency_ms_since(start_ts), str(e))
+                raise
+            _report("track", c, True, latency_ms_since(start_ts))
             details = info_dict.get("entries")[0]
             info = {
                 "title": details["title"],
@@ -664,7 +423,7 @@ class YouTubeAPI:
             "http_headers": _http_headers(),
             "extractor_args": _extractor_args_py(),
         }
-        c = cookies()
+        c = cookie_pool.pick()
         if c and os.path.exists(c):
             ytdl_opts["cookiefile"] = c
 
@@ -708,13 +467,8 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        a = VideosSearch(link, limit=10)
-        result = (await a.next()).get("result")
-        title = result[query_type]["title"]
-        duration_min = result[query_type]["duration"]
-        vidid = result[query_type]["id"]
-        thumbnail = result[query_type]["thumbnails"][0]["url"].split("?")[0]
-        return title, duration_min, thumbnail, vidid
+        result = (await search_videos(link, 10))[query_type]
+        return result["title"], result["duration_min"], result["thumb"], result["vidid"]
 
     async def download(
         self,
@@ -731,7 +485,7 @@ class YouTubeAPI:
             link = self.base + link
         loop = asyncio.get_running_loop()
 
-        def audio_dl(cookie_path_override: str = None):
+        def audio_dl(cookie_path: str = None):
             # Try multiple fallback formats
             formats = [
                 "bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best",
@@ -752,16 +506,9 @@ class YouTubeAPI:
                         "extractor_args": _extractor_args_py(),
                     }
                     
-                    # Try different cookie files
-                    cookie_files = _cookie_files()
-                    if cookie_path_override:
-                        cookie_files.insert(0, cookie_path_override)
-                    
-                    for c_local in cookie_files:
-                        if c_local and os.path.exists(c_local):
-                            ydl_optssx["cookiefile"] = c_local
-                            break
-                    
+                    if cookie_path and os.path.exists(cookie_path):
+                        ydl_optssx["cookiefile"] = cookie_path
+
                     x = YoutubeDL(ydl_optssx)
                     info = x.extract_info(link, False)
                     xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
@@ -778,7 +525,7 @@ class YouTubeAPI:
             
             return None
 
-        def video_dl():
+        def video_dl(cookie_path: str = None):
             # Try multiple video formats as fallback
             formats = [
                 "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
@@ -799,12 +546,8 @@ class YouTubeAPI:
                         "extractor_args": _extractor_args_py(),
                     }
                     
-                    # Use the best available cookie file
-                    cookie_files = _cookie_files()
-                    for c_local in cookie_files:
-                        if c_local and os.path.exists(c_local):
-                            ydl_optssx["cookiefile"] = c_local
-                            break
+                    if cookie_path and os.path.exists(cookie_path):
+                        ydl_optssx["cookiefile"] = cookie_path
 
                     x = YoutubeDL(ydl_optssx)
                     info = x.extract_info(link, False)
@@ -822,7 +565,7 @@ class YouTubeAPI:
             
             return None
 
-        def song_video_dl():
+        def song_video_dl(cookie_path: str = None):
             formats = f"{format_id}+140"
             fpath = f"downloads/{title}"
             ydl_optssx = {
@@ -837,14 +580,13 @@ class YouTubeAPI:
                 "http_headers": _http_headers(),
                 "extractor_args": _extractor_args_py(),
             }
-            c_local = cookies()
-            if c_local and os.path.exists(c_local):
-                ydl_optssx["cookiefile"] = c_local
+            if cookie_path and os.path.exists(cookie_path):
+                ydl_optssx["cookiefile"] = cookie_path
 
             x = YoutubeDL(ydl_optssx)
             x.download([link])
 
-        def song_audio_dl():
+        def song_audio_dl(cookie_path: str = None):
             fpath = f"downloads/{title}.%(ext)s"
             ydl_optssx = {
                 "format": format_id,
@@ -864,19 +606,18 @@ class YouTubeAPI:
                 "http_headers": _http_headers(),
                 "extractor_args": _extractor_args_py(),
             }
-            c_local = cookies()
-            if c_local and os.path.exists(c_local):
-                ydl_optssx["cookiefile"] = c_local
+            if cookie_path and os.path.exists(cookie_path):
+                ydl_optssx["cookiefile"] = cookie_path
 
             x = YoutubeDL(ydl_optssx)
             x.download([link])
 
         if songvideo:
-            await loop.run_in_executor(None, song_video_dl)
+            await loop.run_in_executor(None, song_video_dl, cookie_pool.pick())
             fpath = f"downloads/{title}.mp4"
             return fpath
         elif songaudio:
-            await loop.run_in_executor(None, song_audio_dl)
+            await loop.run_in_executor(None, song_audio_dl, cookie_pool.pick())
             fpath = f"downloads/{title}.mp3"
             return fpath
         elif video:
@@ -887,13 +628,11 @@ class YouTubeAPI:
                 ytdownloader_on = False
             if ytdownloader_on:
                 direct = True
-                downloaded_file = await loop.run_in_executor(None, video_dl)
+                downloaded_file = await loop.run_in_executor(
+                    None, video_dl, cookie_pool.pick()
+                )
             else:
-                try:
-                    candidates = await get_cookie_candidates()
-                except Exception:
-                    c = cookies()
-                    candidates = [c] if c else []
+                candidates = cookie_pool.candidates() or [None]
                 downloaded_file = None
                 last_err = None
                 v_id = None
@@ -938,8 +677,8 @@ class YouTubeAPI:
                                 "--retry-sleep", "1:5",
                                 link,
                             ]
-                            if cookie_path and os.path.exists(cookie_path):
-                                command[-1:-1] = ["--cookies", cookie_path]
+                            command[-1:-1] = cookie_pool.yt_dlp_args(cookie_path)
+                            start_ts = time.time()
                             proc = await asyncio.create_subprocess_exec(
                                 *command,
                                 stdout=asyncio.subprocess.PIPE,
@@ -947,22 +686,21 @@ class YouTubeAPI:
                             )
                             stdout, stderr = await proc.communicate()
                             if stdout:
-                                try:
-                                    await report_cookie_success(cookie_path)
-                                except Exception:
-                                    pass
+                                _report(
+                                    "video_url", cookie_path, True, latency_ms_since(start_ts)
+                                )
                                 downloaded_file = stdout.decode().split("\n")[0]
                                 direct = None
                                 break
                             else:
                                 last_err = stderr.decode()
-                                cool = 1800
-                                if last_err and ("sign in to confirm" in last_err.lower()):
-                                    cool = 7200
-                                try:
-                                    await report_cookie_failure(cookie_path, cooldown_seconds=cool)
-                                except Exception:
-                                    pass
+                                _report(
+                                    "video_url",
+                                    cookie_path,
+                                    False,
+                                    latency_ms_since(start_ts),
+                                    last_err,
+                                )
                                 continue
                         if downloaded_file:
                             break
@@ -982,26 +720,15 @@ class YouTubeAPI:
             direct = True
             downloaded_file = None
             last_err = None
-            try:
-                candidates = await get_cookie_candidates()
-            except Exception:
-                c = cookies()
-                candidates = [c] if c else []
-
-            for cookie_path in candidates:
+            for cookie_path in cookie_pool.candidates():
+                start_ts = time.time()
                 try:
                     downloaded_file = await loop.run_in_executor(None, audio_dl, cookie_path)
-                    try:
-                        await report_cookie_success(cookie_path)
-                    except Exception:
-                        pass
+                    _report("audio", cookie_path, True, latency_ms_since(start_ts))
                     break
                 except Exception as e:
                     last_err = e
-                    try:
-                        await report_cookie_failure(cookie_path)
-                    except Exception:
-                        pass
+                    _report("audio", cookie_path, False, latency_ms_since(start_ts), str(e))
                     continue
 
             if not downloaded_file:
@@ -1,7 +1,11 @@
+import asyncio
 import random
 import time
-import requests
+
+import aiohttp
+
 from ZeMusic import app
+from ZeMusic.utils.http import HttpError, get_json
 
 from pyrogram.enums import ChatAction, ParseMode
 from pyrogram import filters
@@ -18,12 +22,22 @@ async def chat_gpt(bot, message):
             )
         else:
             a = message.text.split(' ', 1)[1]
-            response = requests.get(f'https://chatgpt.apinepdev.workers.dev/?question={a}')
+            try:
+                # Same question within a few minutes reuses the answer.
+                response = await get_json(
+                    "https://chatgpt.apinepdev.workers.dev/",
+                    params={"question": a},
+                    cache_ttl=300,
+                    timeout=30,
+                )
+            except (asyncio.TimeoutError, HttpError, aiohttp.ClientError, ValueError):
+                # Slow, unreachable, or answering with something other than JSON.
+                return await message.reply_text("الخدمة بطيئة حالياً، حاول بعد قليل.")
 
             try:
                 # Check if "results" key is present in the JSON response
-                if "answer" in response.json():
-                    x = response.json()["answer"]
+                if "answer" in response:
+                    x = response["answer"]
                     end_time = time.time()
                     telegram_ping = str(round((end_time - start_time) * 1000, 3)) + " ms"
                     await message.reply_text(
@@ -1,9 +1,13 @@
 import os, asyncio
+import time
+from collections import OrderedDict
 from typing import Optional
+import aiofiles
+import aiohttp
 from pyrogram import Client, filters
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message, CallbackQuery
-from telegraph import upload_file
 from ZeMusic import app
+from ZeMusic.utils.http import HttpError, post_json
 from strings.filters import command
 
 #---------------FUNCTION---------------#
@@ -18,6 +22,21 @@ def get_file_id(msg: Message) -> Optional[Message]:
             setattr(obj, "message_type", message_type)
             return obj
 
+# file_unique_id -> (uploaded at, telegra.ph path); the same media is not re-uploaded.
+_uploaded = OrderedDict()
+UPLOAD_TTL = 60 * 60
+
+
+async def upload_file(path: str) -> str:
+    async with aiofiles.open(path, "rb") as f:
+        content = await f.read()
+    form = aiohttp.FormData()
+    form.add_field("file", content, filename=os.path.basename(path))
+    response = await post_json("https://telegra.ph/upload", data=form, timeout=60)
+    if isinstance(response, dict) and response.get("error"):
+        raise HttpError(response["error"])
+    return response[0]["src"]
+
 #---------------FUNCTION---------------#
 
 @app.on_message(filters.regex(r"^(تلغراف|ميديا|تلكراف|تلجراف|‹ تلغراف ›)$") & filters.private)
@@ -28,22 +47,29 @@ async def telegraph_upload(bot, update):
     file_info = get_file_id(replied)
     if not file_info:
         return await update.reply_text("⌯ ¦ ياغبي غير مدعوم.\n⌯ ¦ حط صوره و اكتب عليها.")
-    text = await update.reply_text(text="<code>انتظر يتم التحميل ...</code>", disable_web_page_preview=True)   
-    media = await update.reply_to_message.download()   
-    await text.edit_text(text="<code>اكتمل التحميل. الآن يتم رفعه إلى التلغراف ...</code>", disable_web_page_preview=True)                                            
-    try:
-        response = upload_file(media)
-    except Exception as error:
-        print(error)
-        await text.edit_text(text=f"Error :- {error}", disable_web_page_preview=True)       
-        return    
-    try:
-        os.remove(media)
-    except Exception as error:
-        print(error)
-        return    
+    text = await update.reply_text(text="<code>انتظر يتم التحميل ...</code>", disable_web_page_preview=True)
+    hit = _uploaded.get(file_info.file_unique_id)
+    if hit and time.time() - hit[0] < UPLOAD_TTL:
+        src = hit[1]
+    else:
+        media = await update.reply_to_message.download()
+        await text.edit_text(text="<code>اكتمل التحميل. الآن يتم رفعه إلى التلغراف ...</code>", disable_web_page_preview=True)
+        try:
+            src = await upload_file(media)
+        except Exception as error:
+            print(error)
+            await text.edit_text(text=f"Error :- {error}", disable_web_page_preview=True)
+            return
+        finally:
+            try:
+                os.remove(media)
+            except Exception as error:
+                print(error)
+        _uploaded[file_info.file_unique_id] = (time.time(), src)
+        while len(_uploaded) > 256:
+            _uploaded.popitem(last=False)
     await text.edit_text(
-        text=f"<b>⎉╎الــرابـط : </b><a href='https://telegra.ph{response[0]}'>اضغــط هنـــا</a>\n<b>⎉╎مشاركة : </b><a href='https://telegram.me/share/url?url=https://graph.org{response[0]}'>اضغــط هنـــا</a>",
+        text=f"<b>⎉╎الــرابـط : </b><a href='https://telegra.ph{src}'>اضغــط هنـــا</a>\n<b>⎉╎مشاركة : </b><a href='https://telegram.me/share/url?url=https://graph.org{src}'>اضغــط هنـــا</a>",
         disable_web_page_preview=False,
         reply_markup=InlineKeyboardMarkup( [[
             InlineKeyboardButton(text="✘ اغلاق ✘", callback_data="close")
@@ -3,6 +3,7 @@ from pyrogram.types import Message
 
 from ZeMusic import app
 from ZeMusic.utils import extract_user, int_to_alpha
+from ZeMusic.utils.admincache import set_admin
 from ZeMusic.utils.database import (
     delete_authuser,
     get_authuser,
@@ -11,7 +12,7 @@ from ZeMusic.utils.database import (
 )
 from ZeMusic.utils.decorators import AdminActual, language
 from ZeMusic.utils.inline import close_markup
-from config import BANNED_USERS, adminlist
+from config import BANNED_USERS
 
 
 @app.on_message(filters.command(("رفع ادمن"),"") & filters.group & ~BANNED_USERS)
@@ -42,10 +43,7 @@ async def auth(client, message: Message, _):
                 "admin_id": from_user_id,
                 "admin_name": from_user_name,
             }
-            get = adminlist.get(message.chat.id)
-            if get:
-                if user.id not in get:
-                    get.append(user.id)
+            await set_admin(message.chat.id, user.id, True)
             await save_authuser(message.chat.id, token, assis)
             return await message.reply_text(_["auth_2"].format(user.mention))
         else:
@@ -71,10 +69,7 @@ async def auth(client, message: Message, _):
             "admin_id": from_user_id,
             "admin_name": from_user_name,
         }
-        get = adminlist.get(message.chat.id)
-        if get:
-            if user_id not in get:
-                get.append(user_id)
+        await set_admin(message.chat.id, user_id, True)
         await save_authuser(message.chat.id, token, assis)
         return await message.reply_text(_["auth_2"].format(user.mention))
     else:
@@ -96,10 +91,7 @@ async def unauthusers(client, message: Message, _):
         user = await app.get_users(user)
         token = await int_to_alpha(user.id)
         deleted = await delete_authuser(message.chat.id, token)
-        get = adminlist.get(message.chat.id)
-        if get:
-            if user.id in get:
-                get.remove(user.id)
+        await set_admin(message.chat.id, user.id, False)
         if deleted:
             return await message.reply_text(_["auth_4"].format(user.mention))
         else:
@@ -109,10 +101,7 @@ async def unauthusers(client, message: Message, _):
     user_id = message.reply_to_message.from_user.id
     token = await int_to_alpha(user_id)
     deleted = await delete_authuser(message.chat.id, token)
-    get = adminlist.get(message.chat.id)
-    if get:
-        if user_id in get:
-            get.remove(user_id)
+    await set_admin(message.chat.id, user_id, False)
     if deleted:
         return await message.reply_text(_["auth_4"].format(user.mention))
     else:
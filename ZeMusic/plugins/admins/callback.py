@@ -10,6 +10,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from ZeMusic import YouTube, app
 from ZeMusic.core.call import Mody
 from ZeMusic.misc import SUDOERS, db
+from ZeMusic.utils.admincache import get_admins
 from ZeMusic.utils.database import (
     get_active_chats,
     get_lang,
@@ -32,7 +33,6 @@ from config import (
     STREAM_IMG_URL,
     TELEGRAM_AUDIO_URL,
     TELEGRAM_VIDEO_URL,
-    adminlist,
     confirmer,
     votemode,
 )
@@ -126,7 +126,7 @@ async def del_back_playlist(client, CallbackQuery, _):
         is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
         if not is_non_admin:
             if CallbackQuery.from_user.id not in SUDOERS:
-                admins = adminlist.get(CallbackQuery.message.chat.id)
+                admins = await get_admins(CallbackQuery.message.chat.id)
                 if not admins:
                     return await CallbackQuery.answer(_["admin_13"], show_alert=True)
                 else:
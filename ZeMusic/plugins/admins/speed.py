@@ -5,10 +5,11 @@ from ZeMusic import app
 from ZeMusic.core.call import Mody
 from ZeMusic.misc import SUDOERS, db
 from ZeMusic.utils import AdminRightsCheck
+from ZeMusic.utils.admincache import get_admins
 from ZeMusic.utils.database import is_active_chat, is_nonadmin_chat
 from ZeMusic.utils.decorators.language import languageCB
 from ZeMusic.utils.inline import close_markup, speed_markup
-from config import BANNED_USERS, adminlist
+from config import BANNED_USERS
 
 checker = []
 
@@ -48,7 +49,7 @@ async def del_back_playlist(client, CallbackQuery, _):
     is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
     if not is_non_admin:
         if CallbackQuery.from_user.id not in SUDOERS:
-            admins = adminlist.get(CallbackQuery.message.chat.id)
+            admins = await get_admins(CallbackQuery.message.chat.id)
             if not admins:
                 return await CallbackQuery.answer(_["admin_13"], show_alert=True)
             else:
@@ -1,36 +1,64 @@
+import asyncio
+
 from pyrogram.types import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     InlineQueryResultPhoto,
 )
-from youtubesearchpython.__future__ import VideosSearch
 
 from ZeMusic import app
 from ZeMusic.utils.inlinequery import answer
+from ZeMusic.utils.search import search_videos
 from config import BANNED_USERS
 
+# Telegram sends an update per keystroke; only search once the user pauses.
+DEBOUNCE = 0.7
+PAGE_SIZE = 10
+MAX_RESULTS = 50
+# Seconds Telegram may serve the same query/offset from its own cache.
+CACHE_TIME = 300
+
+# user id -> id of that user's latest inline query
+_latest = {}
+
 
 @app.on_inline_query(~BANNED_USERS)
 async def inline_query_handler(client, query):
     text = query.query.strip().lower()
     answers = []
-    if text.strip() == "":
+    if text == "":
         try:
             await client.answer_inline_query(query.id, results=answer, cache_time=10)
         except:
             return
     else:
-        a = VideosSearch(text, limit=20)
-        result = (await a.next()).get("result")
-        for x in range(15):
-            title = (result[x]["title"]).title()
-            duration = result[x]["duration"]
-            views = result[x]["viewCount"]["short"]
-            thumbnail = result[x]["thumbnails"][0]["url"].split("?")[0]
-            channellink = result[x]["channel"]["link"]
-            channel = result[x]["channel"]["name"]
-            link = result[x]["link"]
-            published = result[x]["publishedTime"]
+        try:
+            offset = max(0, int(query.offset or 0))
+        except ValueError:
+            offset = 0
+        if offset >= MAX_RESULTS:
+            return
+        user_id = query.from_user.id
+        _latest[user_id] = query.id
+        if not offset:
+            await asyncio.sleep(DEBOUNCE)
+            if _latest.get(user_id) != query.id:
+                return
+        try:
+            # One scrape covers this page and the next; YouTube pages hold ~20.
+            results = await search_videos(text, offset + 2 * PAGE_SIZE)
+        finally:
+            if _latest.get(user_id) == query.id:
+                _latest.pop(user_id, None)
+        for result in results[offset : offset + PAGE_SIZE]:
+            title = (result["title"]).title()
+            duration = result["duration_min"]
+            views = result["views"]
+            thumbnail = result["thumb"]
+            channellink = result["channel_link"]
+            channel = result["channel"]
+            link = result["link"]
+            published = result["published"]
             description = f"{views} | {duration} ᴍɪɴᴜᴛᴇs | {channel}  | {published}"
             buttons = InlineKeyboardMarkup(
                 [
@@ -62,7 +90,13 @@ async def inline_query_handler(client, query):
                     reply_markup=buttons,
                 )
             )
+        more = len(results) > offset + PAGE_SIZE and offset + PAGE_SIZE < MAX_RESULTS
         try:
-            return await client.answer_inline_query(query.id, results=answers)
+            return await client.answer_inline_query(
+                query.id,
+                results=answers,
+                cache_time=CACHE_TIME,
+                next_offset=str(offset + PAGE_SIZE) if more else "",
+            )
         except:
             return
@@ -0,0 +1,48 @@
+from pyrogram import filters
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.types import ChatMemberUpdated
+
+from ZeMusic import app
+from ZeMusic.core.cache import clear_not_admin
+from ZeMusic.utils.admincache import set_admin
+from ZeMusic.utils.database import get_authuser_names
+from ZeMusic.utils.formatters import int_to_alpha
+
+
+def _can_manage(member) -> bool:
+    if not member:
+        return False
+    if member.status == ChatMemberStatus.OWNER:
+        return True
+    if member.status != ChatMemberStatus.ADMINISTRATOR:
+        return False
+    return bool(member.privileges and member.privileges.can_manage_video_chats)
+
+
+@app.on_chat_member_updated(filters.group, group=5)
+async def admin_rights_changed(client, update: ChatMemberUpdated):
+    """
+    تحديث ذاكرة المشرفين تدريجياً عند تغيير صلاحيات أي عضو،
+    بدلاً من إعادة جلب قائمة المشرفين بالكامل.
+    """
+    member = update.new_chat_member or update.old_chat_member
+    if not member or not member.user:
+        return
+    chat_id = update.chat.id
+    user_id = member.user.id
+    if user_id == app.id:
+        if update.new_chat_member and update.new_chat_member.status in (
+            ChatMemberStatus.ADMINISTRATOR,
+            ChatMemberStatus.OWNER,
+        ):
+            await clear_not_admin(chat_id)
+        return
+    allowed = _can_manage(update.new_chat_member)
+    if allowed == _can_manage(update.old_chat_member):
+        return
+    if not allowed:
+        # المستخدمون المخوّلون يبقون في القائمة حتى بعد إزالة إشرافهم
+        token = await int_to_alpha(user_id)
+        if token in await get_authuser_names(chat_id):
+            return
+    await set_admin(chat_id, user_id, allowed)
@@ -1,21 +1,17 @@
 import asyncio
 
 from pyrogram import filters
-from pyrogram.enums import ChatMembersFilter
 from pyrogram.errors import FloodWait
 
 from ZeMusic import app
 from ZeMusic.misc import SUDOERS
 from ZeMusic.utils.database import (
-    get_active_chats,
-    get_authuser_names,
     get_client,
     get_served_chats,
     get_served_users,
 )
 from ZeMusic.utils.decorators.language import language
-from ZeMusic.utils.formatters import alpha_to_int
-from config import adminlist, OWNER_ID
+from config import OWNER_ID
 
 IS_BROADCASTING = False
 
@@ -273,37 +269,3 @@ async def broadcast_message(client, message, _):
 
     IS_BROADCASTING = False
 
-
-async def auto_clean():
-    """
-    دالة تعمل تلقائياً كل 10 ثوانٍ،
-    تقوم بتحديث قائمة المشرفين في الدردشات التي يديرها البوت
-    وفقاً لصلاحيات إدارة الدردشة الصوتية أو عبر قاعدة البيانات (authuser).
-    """
-    while not await asyncio.sleep(10):
-        try:
-            active_chats = await get_active_chats()
-            for chat_id in active_chats:
-                if chat_id not in adminlist:
-                    adminlist[chat_id] = []
-
-                    # جلب جميع الإداريين/المديرين
-                    async for user in app.get_chat_members(
-                        chat_id,
-                        filter=ChatMembersFilter.ADMINISTRATORS
-                    ):
-                        if user.privileges.can_manage_video_chats:
-                            adminlist[chat_id].append(user.user.id)
-
-                    # جلب المستخدمين المخوّلين من قاعدة البيانات
-                    authusers = await get_authuser_names(chat_id)
-                    for authuser in authusers:
-                        user_id = await alpha_to_int(authuser)
-                        adminlist[chat_id].append(user_id)
-
-        except:
-            continue
-
-
-# إطلاق مهمة تحديث قائمة المشرفين في الخلفية
-asyncio.create_task(auto_clean())
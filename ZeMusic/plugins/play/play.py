@@ -16,6 +16,7 @@ from ZeMusic.utils import seconds_to_min, time_to_seconds
 from ZeMusic.utils.channelplay import get_channeplayCB
 from ZeMusic.utils.decorators.language import languageCB
 from ZeMusic.utils.decorators.play import PlayWrapper
+from ZeMusic.utils.editor import editor
 from ZeMusic.utils.formatters import formats
 from ZeMusic.utils.inline import (
     botplaylist_markup,
@@ -25,6 +26,7 @@ from ZeMusic.utils.inline import (
     track_markup,
 )
 from ZeMusic.utils.logger import play_logs
+from ZeMusic.utils.resolve import resolve
 from ZeMusic.utils.stream.stream import stream
 from config import BANNED_USERS, lyrical
 
@@ -100,7 +102,7 @@ async def play_commnd(
                 _["play_6"].format(config.DURATION_LIMIT_MIN, app.mention)
             )
         file_path = await Telegram.get_filepath(audio=audio_telegram)
-        if await Telegram.download(_, message, mystic, file_path):
+        if await Telegram.download(_, message, mystic, file_path, progressive=True):
             message_link = await Telegram.get_link(message)
             file_name = await Telegram.get_filename(audio_telegram, audio=True)
             dur = await Telegram.get_duration(audio_telegram, file_path)
@@ -144,7 +146,7 @@ async def play_commnd(
         if video_telegram.file_size > config.TG_VIDEO_FILESIZE_LIMIT:
             return await mystic.edit_text(_["play_8"])
         file_path = await Telegram.get_filepath(video=video_telegram)
-        if await Telegram.download(_, message, mystic, file_path):
+        if await Telegram.download(_, message, mystic, file_path, progressive=True):
             message_link = await Telegram.get_link(message)
             file_name = await Telegram.get_filename(video_telegram)
             dur = await Telegram.get_duration(video_telegram, file_path)
@@ -180,18 +182,24 @@ async def play_commnd(
                 # Get quick info first
                 quick_info = await get_youtube_info_fast(url, mystic)
                 if quick_info:
-                    await mystic.edit_text(f"✅ تم العثور على: {quick_info['title'][:50]}...\n⬇️ جاري التحميل...")
+                    editor.edit_text(mystic, f"✅ تم العثور على: {quick_info['title'][:50]}...\n⬇️ جاري التحميل...")
+                # إرسال آخر حالة الآن حتى لا تطغى على الرسائل التالية
+                await editor.settle(mystic)
             
             if "playlist" in url:
                 try:
-                    details = await YouTube.playlist(
+                    details = await resolve(
+                        "youtube",
+                        "playlist",
                         url,
-                        config.PLAYLIST_FETCH_LIMIT,
+                        lambda: YouTube.playlist(url, config.PLAYLIST_FETCH_LIMIT),
                     )
                 except Exception as e:
                     if ENHANCED_YOUTUBE_AVAILABLE:
                         await suggest_youtube_alternatives(url, mystic)
                     return await mystic.edit_text(_["play_3"])
+                if not details:
+                    return await mystic.edit_text(_["play_3"])
                 streamtype = "playlist"
                 plist_type = "yt"
                 if "&" in url:
@@ -202,7 +210,9 @@ async def play_commnd(
                 cap = _["play_9"]
             else:
                 try:
-                    details, track_id = await YouTube.track(url)
+                    details, track_id = await resolve(
+                        "youtube", "track", url, lambda: YouTube.track(url)
+                    )
                 except Exception as e:
                     # Enhanced error handling for YouTube
                     if ENHANCED_YOUTUBE_AVAILABLE and "Sign in to confirm" in str(e):
@@ -223,7 +233,9 @@ async def play_commnd(
                 )
             if "track" in url:
                 try:
-                    details, track_id = await Spotify.track(url)
+                    details, track_id = await resolve(
+                        "spotify", "track", url, lambda: Spotify.track(url)
+                    )
                 except:
                     return await mystic.edit_text(_["play_3"])
                 streamtype = "youtube"
@@ -231,7 +243,9 @@ async def play_commnd(
                 cap = _["play_10"].format(details["title"], details["duration_min"])
             elif "playlist" in url:
                 try:
-                    details, plist_id = await Spotify.playlist(url)
+                    details, plist_id = await resolve(
+                        "spotify", "playlist", url, lambda: Spotify.playlist(url)
+                    )
                 except Exception:
                     return await mystic.edit_text(_["play_3"])
                 streamtype = "playlist"
@@ -240,7 +254,9 @@ async def play_commnd(
                 cap = _["play_11"].format(app.mention, message.from_user.mention)
             elif "album" in url:
                 try:
-                    details, plist_id = await Spotify.album(url)
+                    details, plist_id = await resolve(
+                        "spotify", "album", url, lambda: Spotify.album(url)
+                    )
                 except:
                     return await mystic.edit_text(_["play_3"])
                 streamtype = "playlist"
@@ -249,7 +265,9 @@ async def play_commnd(
                 cap = _["play_11"].format(app.mention, message.from_user.mention)
             elif "artist" in url:
                 try:
-                    details, plist_id = await Spotify.artist(url)
+                    details, plist_id = await resolve(
+                        "spotify", "artist", url, lambda: Spotify.artist(url)
+                    )
                 except:
                     return await mystic.edit_text(_["play_3"])
                 streamtype = "playlist"
@@ -261,7 +279,9 @@ async def play_commnd(
         elif await Apple.valid(url):
             if "album" in url:
                 try:
-                    details, track_id = await Apple.track(url)
+                    details, track_id = await resolve(
+                        "apple", "track", url, lambda: Apple.track(url)
+                    )
                 except:
                     return await mystic.edit_text(_["play_3"])
                 streamtype = "youtube"
@@ -270,7 +290,9 @@ async def play_commnd(
             elif "playlist" in url:
                 spotify = True
                 try:
-                    details, plist_id = await Apple.playlist(url)
+                    details, plist_id = await resolve(
+                        "apple", "playlist", url, lambda: Apple.playlist(url)
+                    )
                 except:
                     return await mystic.edit_text(_["play_3"])
                 streamtype = "playlist"
@@ -281,7 +303,9 @@ async def play_commnd(
                 return await mystic.edit_text(_["play_3"])
         elif await Resso.valid(url):
             try:
-                details, track_id = await Resso.track(url)
+                details, track_id = await resolve(
+                    "resso", "track", url, lambda: Resso.track(url)
+                )
             except:
                 return await mystic.edit_text(_["play_3"])
             streamtype = "youtube"
@@ -289,7 +313,13 @@ async def play_commnd(
             cap = _["play_10"].format(details["title"], details["duration_min"])
         elif await SoundCloud.valid(url):
             try:
-                details, track_path = await SoundCloud.download(url)
+                details, track_path = await resolve(
+                    "soundcloud",
+                    "track",
+                    url,
+                    lambda: SoundCloud.download(url),
+                    reuse=lambda result: SoundCloud.reuse(url, result),
+                )
             except:
                 return await mystic.edit_text(_["play_3"])
             duration_sec = details["duration_sec"]
@@ -2,6 +2,7 @@ from pyrogram import filters
 from pyrogram.types import Message
 
 from ZeMusic import app
+from ZeMusic.core import shard
 from ZeMusic.misc import SUDOERS
 from ZeMusic.utils.database import add_gban_user, remove_gban_user
 from ZeMusic.utils.decorators.language import language
@@ -20,6 +21,7 @@ async def useradd(client, message: Message, _):
         return await message.reply_text(_["block_1"].format(user.mention))
     await add_gban_user(user.id)
     BANNED_USERS.add(user.id)
+    await shard.share("banned_add", user.id)
     await message.reply_text(_["block_2"].format(user.mention))
 
 
@@ -34,6 +36,7 @@ async def userdel(client, message: Message, _):
         return await message.reply_text(_["block_3"].format(user.mention))
     await remove_gban_user(user.id)
     BANNED_USERS.remove(user.id)
+    await shard.share("banned_remove", user.id)
     await message.reply_text(_["block_4"].format(user.mention))
 
 
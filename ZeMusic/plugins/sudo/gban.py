@@ -1,23 +1,25 @@
 import asyncio
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import Message
 
 from ZeMusic import app
+from ZeMusic.core import shard
 from ZeMusic.misc import SUDOERS
 from ZeMusic.utils import get_readable_time
 from ZeMusic.utils.database import (
     add_banned_user,
     get_banned_count,
     get_banned_users,
+    get_lang,
     get_served_chats,
     is_banned_user,
     remove_banned_user,
 )
 from ZeMusic.utils.decorators.language import language
 from ZeMusic.utils.extraction import extract_user
-from config import BANNED_USERS
+from ZeMusic.utils.gbanjobs import claim, resume_jobs, start_job
+from config import BANNED_USERS, GBAN_WORKERS
 
 
 @app.on_message(filters.command(["احظره عام"]) & SUDOERS)
@@ -36,36 +38,31 @@ async def global_ban(client, message: Message, _):
     is_gbanned = await is_banned_user(user.id)
     if is_gbanned:
         return await message.reply_text(_["gban_4"].format(user.mention))
+    if not await claim("ban", user.id):
+        return await message.reply_text(_["gban_14"].format(user.mention))
     if user.id not in BANNED_USERS:
         BANNED_USERS.add(user.id)
+    await shard.share("banned_add", user.id)
+    await add_banned_user(user.id)
     served_chats = []
     chats = await get_served_chats()
     for chat in chats:
         served_chats.append(int(chat["chat_id"]))
-    time_expected = get_readable_time(len(served_chats))
+    time_expected = get_readable_time(len(served_chats) // max(1, GBAN_WORKERS))
     mystic = await message.reply_text(_["gban_5"].format(user.mention, time_expected))
-    number_of_chats = 0
-    for chat_id in served_chats:
-        try:
-            await app.ban_chat_member(chat_id, user.id)
-            number_of_chats += 1
-        except FloodWait as fw:
-            await asyncio.sleep(int(fw.value))
-        except:
-            continue
-    await add_banned_user(user.id)
-    await message.reply_text(
-        _["gban_6"].format(
-            app.mention,
-            message.chat.title,
-            message.chat.id,
-            user.mention,
-            user.id,
-            message.from_user.mention,
-            number_of_chats,
-        )
+    await start_job(
+        "ban",
+        user.id,
+        served_chats,
+        {
+            "chat_id": message.chat.id,
+            "chat_title": message.chat.title,
+            "mystic_id": mystic.id,
+            "user_mention": user.mention,
+            "by_mention": message.from_user.mention,
+            "lang": await get_lang(message.chat.id),
+        },
     )
-    await mystic.delete()
 
 
 @app.on_message(filters.command(["الغاء حظر عام","الغاء الحظر عام","الغاء عام"]) & SUDOERS)
@@ -78,26 +75,31 @@ async def global_un(client, message: Message, _):
     is_gbanned = await is_banned_user(user.id)
     if not is_gbanned:
         return await message.reply_text(_["gban_7"].format(user.mention))
+    if not await claim("unban", user.id):
+        return await message.reply_text(_["gban_14"].format(user.mention))
     if user.id in BANNED_USERS:
         BANNED_USERS.remove(user.id)
+    await shard.share("banned_remove", user.id)
+    await remove_banned_user(user.id)
     served_chats = []
     chats = await get_served_chats()
     for chat in chats:
         served_chats.append(int(chat["chat_id"]))
-    time_expected = get_readable_time(len(served_chats))
+    time_expected = get_readable_time(len(served_chats) // max(1, GBAN_WORKERS))
     mystic = await message.reply_text(_["gban_8"].format(user.mention, time_expected))
-    number_of_chats = 0
-    for chat_id in served_chats:
-        try:
-            await app.unban_chat_member(chat_id, user.id)
-            number_of_chats += 1
-        except FloodWait as fw:
-            await asyncio.sleep(int(fw.value))
-        except:
-            continue
-    await remove_banned_user(user.id)
-    await message.reply_text(_["gban_9"].format(user.mention, number_of_chats))
-    await mystic.delete()
+    await start_job(
+        "unban",
+        user.id,
+        served_chats,
+        {
+            "chat_id": message.chat.id,
+            "chat_title": message.chat.title,
+            "mystic_id": mystic.id,
+            "user_mention": user.mention,
+            "by_mention": message.from_user.mention,
+            "lang": await get_lang(message.chat.id),
+        },
+    )
 
 
 @app.on_message(filters.command(["gbannedusers", "المحظورين عام","عام محظورين"]) & SUDOERS)
@@ -123,3 +125,8 @@ async def gbanned_list(client, message: Message, _):
         return await mystic.edit_text(_["gban_10"])
     else:
         return await mystic.edit_text(msg)
+
+
+# استئناف عمليات الحظر العام التي توقفت بسبب إعادة التشغيل (في عملية واحدة فقط)
+if shard.is_front():
+    asyncio.create_task(resume_jobs())
@@ -2,6 +2,7 @@ from pyrogram import filters
 from pyrogram.types import Message
 
 from ZeMusic import app
+from ZeMusic.core import shard
 from ZeMusic.misc import SUDOERS
 from ZeMusic.utils.database import (
     get_lang,
@@ -28,10 +29,12 @@ async def maintenance(client, message: Message):
             await message.reply_text(_["maint_4"])
         else:
             await maintenance_on()
+            await shard.share("maintenance", 1)
             await message.reply_text(_["maint_2"].format(app.mention))
     elif state == "disable" or state == "تعطيل" :
         if await is_maintenance() is False:
             await maintenance_off()
+            await shard.share("maintenance", 2)
             await message.reply_text(_["maint_3"].format(app.mention))
         else:
             await message.reply_text(_["maint_5"])
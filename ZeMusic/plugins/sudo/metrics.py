@@ -0,0 +1,43 @@
+from pyrogram import filters
+
+from ZeMusic import app
+from ZeMusic.core.metrics import metrics
+from ZeMusic.misc import SUDOERS
+from ZeMusic.utils.decorators.language import language
+from ZeMusic.utils.search import search_router
+
+SECTIONS = (
+    ("extraction_latency_ms", "op"),
+    ("client_latency_ms", "client"),
+    ("cookie_latency_ms", "cookie"),
+    ("cache_lookup_ms", "op"),
+    ("search_latency_ms", "provider"),
+)
+
+
+@app.on_message(filters.command(["metrics", "الاداء"]) & SUDOERS)
+@language
+async def show_metrics(client, message, _):
+    lines = []
+    for name, label in SECTIONS:
+        rows = metrics.percentiles(name)
+        if not rows:
+            continue
+        lines.append(f"\n<b>{name}</b>")
+        for labels, count, p50, p95, p99 in rows[:10]:
+            tag = ", ".join(v for k, v in labels) or label
+            lines.append(
+                f"• <code>{tag}</code> ({count}) : {p50:.0f} / {p95:.0f} / {p99:.0f}"
+            )
+    providers = [row for row in search_router.stats() if row["ok"] or row["fail"]]
+    if providers:
+        lines.append("\n<b>search_providers</b>")
+        for row in providers:
+            state = " (benched)" if row["benched"] else ""
+            lines.append(
+                f"• <code>{row['provider']}</code>{state} : {row['latency_ms']:.0f} ms, "
+                f"{row['wins']} wins, {row['ok']} ok / {row['fail']} fail"
+            )
+    if not lines:
+        return await message.reply_text(_["metrics_2"])
+    await message.reply_text(_["metrics_1"] + "\n".join(lines))
@@ -3,6 +3,7 @@ import os
 import shutil
 import socket
 from datetime import datetime
+from functools import partial
 
 import urllib3
 from git import Repo
@@ -11,14 +12,18 @@ from pyrogram import filters
 
 import config
 from ZeMusic import app
+from ZeMusic.core import shard
 from ZeMusic.misc import HAPP, SUDOERS, XCB
 from ZeMusic.utils.database import (
     get_active_chats,
+    get_all_active_chats,
+    get_lang,
     remove_active_chat,
     remove_active_video_chat,
 )
 from ZeMusic.utils.decorators.language import language
 from ZeMusic.utils.pastebin import ModyBin
+from strings import get_string
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -39,10 +44,23 @@ async def log_(client, message, _):
 @app.on_message(filters.command(["update", "تحديث"]) & SUDOERS)
 @language
 async def update_(client, message, _):
+    if not shard.is_front():
+        # Only the front updates and restarts: it stops its workers first.
+        return await shard.to_front("update", message.chat.id)
+    await _update(message.reply_text, _)
+
+
+@shard.front_command("update")
+async def _forwarded_update(chat_id):
+    _ = get_string(await get_lang(chat_id))
+    await _update(partial(app.send_message, chat_id), _)
+
+
+async def _update(reply, _):
     if await is_heroku():
         if HAPP is None:
-            return await message.reply_text(_["server_2"])
-    response = await message.reply_text(_["server_3"])
+            return await reply(_["server_2"])
+    response = await reply(_["server_3"])
     try:
         repo = Repo()
     except GitCommandError:
@@ -77,7 +95,7 @@ async def update_(client, message, _):
     os.system("git stash &> /dev/null && git pull")
 
     try:
-        served_chats = await get_active_chats()
+        served_chats = await get_all_active_chats()
         for x in served_chats:
             try:
                 await app.send_message(
@@ -106,13 +124,25 @@ async def update_(client, message, _):
             )
     else:
         os.system("pip3 install -r requirements.txt")
+        await shard.stop(app)
         os.system(f"kill -9 {os.getpid()} && bash start")
         exit()
 
 
 @app.on_message(filters.command(["restart", "اعاده تشغيل", "إعاده تشغيل" ,"اعادة تشغيل", "إعادة تشغيل"]) & SUDOERS)
 async def restart_(_, message):
-    response = await message.reply_text("جاري اعادة تشغيل...")
+    if not shard.is_front():
+        return await shard.to_front("restart", message.chat.id)
+    await _restart(message.reply_text)
+
+
+@shard.front_command("restart")
+async def _forwarded_restart(chat_id):
+    await _restart(partial(app.send_message, chat_id))
+
+
+async def _restart(reply):
+    response = await reply("جاري اعادة تشغيل...")
     ac_chats = await get_active_chats()
     #for x in ac_chats:
         #try:
@@ -125,6 +155,8 @@ async def restart_(_, message):
         #except:
             #pass
 
+    # Workers stop before the files they may be playing are removed.
+    await shard.stop(app)
     try:
         shutil.rmtree("downloads")
         shutil.rmtree("raw_files")
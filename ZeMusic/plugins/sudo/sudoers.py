@@ -2,6 +2,7 @@ from pyrogram import filters
 from pyrogram.types import Message
 
 from ZeMusic import app
+from ZeMusic.core import shard
 from ZeMusic.misc import SUDOERS
 from ZeMusic.utils.database import add_sudo, remove_sudo
 from ZeMusic.utils.decorators.language import language
@@ -25,6 +26,7 @@ async def useradd(client, message: Message, _):
         added = await add_sudo(user.id)
         if added:
             SUDOERS.add(user.id)
+            await shard.share("sudo_add", user.id)
             await message.reply_text(_["sudo_2"].format(user.mention))
         else:
             await message.reply_text("فشل.")
@@ -36,6 +38,7 @@ async def useradd(client, message: Message, _):
     added = await add_sudo(message.reply_to_message.from_user.id)
     if added:
         SUDOERS.add(message.reply_to_message.from_user.id)
+        await shard.share("sudo_add", message.reply_to_message.from_user.id)
         await message.reply_text(
             _["sudo_2"].format(message.reply_to_message.from_user.mention)
         )
@@ -61,6 +64,7 @@ async def userdel(client, message: Message, _):
         removed = await remove_sudo(user.id) 
         if removed:
             SUDOERS.remove(user.id)
+            await shard.share("sudo_remove", user.id)
             await message.reply_text(_["sudo_4"].format(user.mention))
             return
         await message.reply_text(f"حدث خطاء.")
@@ -73,6 +77,7 @@ async def userdel(client, message: Message, _):
     removed = await remove_sudo(user.id)
     if removed:
         SUDOERS.remove(user.id)
+        await shard.share("sudo_remove", user.id)
         await message.reply(_["sudo_4"].format(user.mention))
     else:
         await message.reply(_["sudo_8"])
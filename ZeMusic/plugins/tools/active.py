@@ -4,19 +4,27 @@ from pyrogram.types import Message
 from unidecode import unidecode
 
 from ZeMusic import app
+from ZeMusic.core import shard
 from ZeMusic.misc import SUDOERS
 from ZeMusic.utils.database import (
-    get_active_chats,
-    get_active_video_chats,
+    get_all_active_chats,
+    get_all_active_video_chats,
     remove_active_chat,
     remove_active_video_chat,
 )
 
 
+def _tracks(queues: dict, chat_id: int) -> str:
+    queue = queues.get(chat_id)
+    return f" — {len(queue)} مقطع" if queue else ""
+
+
 @app.on_message(filters.command(["activevc", "activevoice", "الاتصالات","المكالمات"]) & SUDOERS)
 async def activevc(_, message: Message):
     mystic = await message.reply_text("⟡ جاري البحث عن مكالمات ...")
-    served_chats = await get_active_chats()
+    served_chats = await get_all_active_chats()
+    # Queues of chats in other shards come from their Redis mirror.
+    queues = await shard.queues(served_chats)
     text = ""
     j = 0
     for x in served_chats:
@@ -28,10 +36,10 @@ async def activevc(_, message: Message):
         try:
             if (await app.get_chat(x)).username:
                 user = (await app.get_chat(x)).username
-                text += f"<b>{j + 1}.</b> <a href=https://t.me/{user}>{unidecode(title).upper()}</a> [<code>{x}</code>]\n"
+                text += f"<b>{j + 1}.</b> <a href=https://t.me/{user}>{unidecode(title).upper()}</a> [<code>{x}</code>]{_tracks(queues, x)}\n"
             else:
                 text += (
-                    f"<b>{j + 1}.</b> {unidecode(title).upper()} [<code>{x}</code>]\n"
+                    f"<b>{j + 1}.</b> {unidecode(title).upper()} [<code>{x}</code>]{_tracks(queues, x)}\n"
                 )
             j += 1
         except:
@@ -48,7 +56,8 @@ async def activevc(_, message: Message):
 @app.on_message(filters.command(["activev", "activevideo", "الفيديوهات"]) & SUDOERS)
 async def activevi_(_, message: Message):
     mystic = await message.reply_text("⟡ جاري البحث عن فيديوهات متوفرة ...")
-    served_chats = await get_active_video_chats()
+    served_chats = await get_all_active_video_chats()
+    queues = await shard.queues(served_chats)
     text = ""
     j = 0
     for x in served_chats:
@@ -60,10 +69,10 @@ async def activevi_(_, message: Message):
         try:
             if (await app.get_chat(x)).username:
                 user = (await app.get_chat(x)).username
-                text += f"<b>{j + 1}.</b> <a href=https://t.me/{user}>{unidecode(title).upper()}</a> [<code>{x}</code>]\n"
+                text += f"<b>{j + 1}.</b> <a href=https://t.me/{user}>{unidecode(title).upper()}</a> [<code>{x}</code>]{_tracks(queues, x)}\n"
             else:
                 text += (
-                    f"<b>{j + 1}.</b> {unidecode(title).upper()} [<code>{x}</code>]\n"
+                    f"<b>{j + 1}.</b> {unidecode(title).upper()} [<code>{x}</code>]{_tracks(queues, x)}\n"
                 )
             j += 1
         except:
@@ -2,16 +2,17 @@ import asyncio
 import os
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import CallbackQuery, InputMediaPhoto, Message
 
 import config
 from ZeMusic import app
 from ZeMusic.misc import db
 from ZeMusic.utils import ModyBin, get_channeplayCB, seconds_to_min
-from ZeMusic.utils.database import get_cmode, is_active_chat, is_music_playing
+from ZeMusic.utils.database import get_cmode, is_active_chat
 from ZeMusic.utils.decorators.language import language, languageCB
-from ZeMusic.utils.inline import queue_back_markup, queue_markup
+from ZeMusic.utils.editor import editor
+from ZeMusic.utils.inline import playlist_pages_markup, queue_back_markup, queue_markup
+from ZeMusic.utils.playlistcard import lookup, page_text, pages
 from config import BANNED_USERS
 
 basic = {}
@@ -24,6 +25,25 @@ def get_image(videoid):
         return config.YOUTUBE_IMG_URL
 
 
+def watch_timer(_, mystic, chat_id, videoid, DUR, cplay):
+    async def timer_markup():
+        got = db.get(chat_id)
+        if not got or got[0]["vidid"] != videoid or not basic.get(videoid):
+            return None
+        if not await is_active_chat(chat_id):
+            return None
+        return queue_markup(
+            _,
+            DUR,
+            cplay,
+            videoid,
+            seconds_to_min(got[0]["played"]),
+            got[0]["dur"],
+        )
+
+    editor.watch(mystic, timer_markup, 5)
+
+
 def get_duration(playing):
     file_path = playing[0]["file"]
     if "index_" in file_path or "live_" in file_path:
@@ -99,32 +119,7 @@ async def get_queue(client, message: Message, _):
     basic[videoid] = True
     mystic = await message.reply_photo(IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    "c" if cplay else "g",
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        watch_timer(_, mystic, chat_id, videoid, DUR, "c" if cplay else "g")
 
 
 @app.on_callback_query(filters.regex("GetTimer") & ~BANNED_USERS)
@@ -154,6 +149,7 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
         return await CallbackQuery.answer(_["queue_5"], show_alert=True)
     await CallbackQuery.answer()
     basic[videoid] = False
+    editor.discard(CallbackQuery.message)
     buttons = queue_back_markup(_, what)
     med = InputMediaPhoto(
         media="https://telegra.ph//file/6f7d35131f69951c74ee5.jpg",
@@ -241,29 +237,24 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
     med = InputMediaPhoto(media=IMAGE, caption=cap)
     mystic = await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    cplay,
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        watch_timer(_, mystic, chat_id, videoid, DUR, cplay)
+
+
+@app.on_callback_query(filters.regex("^plist ") & ~BANNED_USERS)
+@languageCB
+async def playlist_page(client, CallbackQuery: CallbackQuery, _):
+    token, page = CallbackQuery.data.split(None, 1)[1].split("|")
+    entries = lookup(token)
+    if entries is None:
+        return await CallbackQuery.answer(_["play_24"], show_alert=True)
+    page = int(page)
+    caption = _["play_23"].format(len(entries), page_text(entries, page))
+    upl = playlist_pages_markup(_, token, page, pages(entries))
+    await CallbackQuery.answer()
+    try:
+        if CallbackQuery.message.photo:
+            await CallbackQuery.edit_message_caption(caption, reply_markup=upl)
+        else:
+            await CallbackQuery.edit_message_text(caption, reply_markup=upl)
+    except:
+        pass
@@ -2,16 +2,17 @@ import asyncio
 import time
 
 from pyrogram import filters
-from pyrogram.enums import ChatMembersFilter
 from pyrogram.types import CallbackQuery, Message
 
 from ZeMusic import app
 from ZeMusic.core.call import Mody
 from ZeMusic.misc import db
-from ZeMusic.utils.database import get_assistant, get_authuser_names, get_cmode
+from ZeMusic.utils.admincache import refresh_admins
+from ZeMusic.utils.database import get_cmode
 from ZeMusic.utils.decorators import ActualAdminCB, AdminActual, language
-from ZeMusic.utils.formatters import alpha_to_int, get_readable_time
-from config import BANNED_USERS, adminlist, lyrical
+from ZeMusic.utils.editor import editor
+from ZeMusic.utils.formatters import get_readable_time
+from config import BANNED_USERS, lyrical
 
 rel = {}
 
@@ -29,16 +30,7 @@ async def reload_admin_cache(client, message: Message, _):
             if saved > time.time():
                 left = get_readable_time((int(saved) - int(time.time())))
                 return await message.reply_text(_["reload_1"].format(left))
-        adminlist[message.chat.id] = []
-        async for user in app.get_chat_members(
-            message.chat.id, filter=ChatMembersFilter.ADMINISTRATORS
-        ):
-            if user.privileges.can_manage_video_chats:
-                adminlist[message.chat.id].append(user.user.id)
-        authusers = await get_authuser_names(message.chat.id)
-        for user in authusers:
-            user_id = await alpha_to_int(user)
-            adminlist[message.chat.id].append(user_id)
+        await refresh_admins(message.chat.id)
         now = int(time.time()) + 180
         rel[message.chat.id] = now
         await message.reply_text(_["reload_2"])
@@ -97,6 +89,7 @@ async def stop_download(client, CallbackQuery: CallbackQuery, _):
             except:
                 pass
             await CallbackQuery.answer(_["tg_6"], show_alert=True)
+            editor.discard(CallbackQuery.message)
             return await CallbackQuery.edit_message_text(
                 _["tg_7"].format(CallbackQuery.from_user.mention)
             )
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Dict, Set
+
+from pyrogram.enums import ChatMembersFilter
+
+import config
+from ZeMusic import app
+from ZeMusic.core.cache import (
+    get_cached_admins,
+    set_cached_admins,
+    update_cached_admin,
+)
+from ZeMusic.utils.database import get_authuser_names
+from ZeMusic.utils.formatters import alpha_to_int
+from config import adminlist
+
+# How long the in-process copy is trusted before re-reading the shared Redis set.
+LOCAL_TTL = 60
+
+_synced: Dict[int, float] = {}
+_inflight: Dict[int, asyncio.Task] = {}
+
+
+def _store(chat_id: int, admins: Set[int]):
+    adminlist[chat_id] = admins
+    _synced[chat_id] = time.time()
+
+
+async def _fetch(chat_id: int) -> Set[int]:
+    admins = set()
+    async for member in app.get_chat_members(
+        chat_id, filter=ChatMembersFilter.ADMINISTRATORS
+    ):
+        if member.privileges and member.privileges.can_manage_video_chats:
+            admins.add(member.user.id)
+    for authuser in await get_authuser_names(chat_id):
+        admins.add(await alpha_to_int(authuser))
+    await set_cached_admins(chat_id, admins, config.ADMIN_CACHE_TTL)
+    _store(chat_id, admins)
+    return admins
+
+
+async def refresh_admins(chat_id: int) -> Set[int]:
+    """Re-fetch the admin list from Telegram; concurrent callers share one fetch."""
+    task = _inflight.get(chat_id)
+    if task is None:
+        task = asyncio.create_task(_fetch(chat_id))
+        _inflight[chat_id] = task
+        task.add_done_callback(lambda _: _inflight.pop(chat_id, None))
+    return await asyncio.shield(task)
+
+
+async def get_admins(chat_id: int) -> Set[int]:
+    admins = adminlist.get(chat_id)
+    if admins is not None and time.time() - _synced.get(chat_id, 0) < LOCAL_TTL:
+        return admins
+    cached = await get_cached_admins(chat_id)
+    if cached is not None:
+        _store(chat_id, cached)
+        return cached
+    try:
+        return await refresh_admins(chat_id)
+    except Exception:
+        return admins or set()
+
+
+async def is_admin(chat_id: int, user_id: int) -> bool:
+    return user_id in await get_admins(chat_id)
+
+
+async def set_admin(chat_id: int, user_id: int, allowed: bool):
+    admins = adminlist.get(chat_id)
+    if admins is not None:
+        if allowed:
+            admins.add(user_id)
+        else:
+            admins.discard(user_id)
+    await update_cached_admin(chat_id, user_id, allowed)
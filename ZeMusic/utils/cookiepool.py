@@ -0,0 +1,300 @@
+import asyncio
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ZeMusic.core.cache import get_redis
+from ZeMusic.logging import LOGGER
+
+# How often the cookie directories are re-stat'ed for added/changed files.
+RESCAN_INTERVAL = 10
+# How often in-memory scores are pushed to (and cooldowns pulled from) Redis.
+SYNC_INTERVAL = 15
+# Successes/failures lose half their weight after this many seconds.
+HALF_LIFE = 3600
+# Latency (ms) at which a cookie's sampled success rate is halved.
+LATENCY_REF_MS = 8000
+# Cap on counters seeded from Redis so old history cannot drown new evidence.
+SEED_CAP = 20
+DEFAULT_COOLDOWN = 1800
+
+
+def _cookie_dirs() -> List[str]:
+    dirs = []
+    env_dir = os.getenv("YT_COOKIES_DIR")
+    if env_dir:
+        dirs.append(env_dir)
+    dirs.append(f"{os.getcwd()}/cookies")
+    dirs.append(f"{os.getcwd()}/strings")
+    return list(dict.fromkeys(dirs))
+
+
+def _is_cookie_file(path: str) -> bool:
+    """Netscape cookie jar (header or TSV rows) that carries YouTube cookies."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+            sample = fh.read(4096)
+    except Exception:
+        return False
+    if "youtube.com" not in sample:
+        return False
+    if "Netscape HTTP Cookie File" in sample:
+        return True
+    for line in sample.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if len(line.split("\t")) >= 6 and "youtube.com" in line:
+            return True
+    return False
+
+
+class CookieState:
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.ok = 0.0
+        self.fail = 0.0
+        self.latency_ms = 0.0
+        self.cooldown_until = 0.0
+        self.updated = time.time()
+        # Deltas not yet pushed to Redis.
+        self.new_ok = 0
+        self.new_fail = 0
+        self.new_cooldown = 0
+        self.last_err_code = None
+
+    def _decay(self, now: float):
+        factor = 0.5 ** ((now - self.updated) / HALF_LIFE)
+        self.ok *= factor
+        self.fail *= factor
+        self.updated = now
+
+    def sample(self, now: float) -> float:
+        """Thompson sample of the success rate, discounted by latency."""
+        self._decay(now)
+        rate = random.betavariate(self.ok + 1, self.fail + 1)
+        return rate / (1 + self.latency_ms / LATENCY_REF_MS)
+
+
+class CookiePool:
+    """Scored set of YouTube cookie files.
+
+    Scores live in memory and are used on every pick; Redis is only touched
+    by a periodic background sync that shares counters and cooldowns with
+    other processes. Files are re-read only when their size or mtime changes.
+    """
+
+    def __init__(self):
+        self._states: Dict[str, CookieState] = {}
+        self._seen: Dict[str, Tuple[int, int, bool]] = {}
+        self._scanned = 0.0
+        self._seeded = False
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def _scan(self):
+        now = time.time()
+        if now - self._scanned < RESCAN_INTERVAL:
+            return
+        self._scanned = now
+        paths = []
+        env_file = os.getenv("YT_COOKIES_FILE")
+        if env_file and os.path.isfile(env_file):
+            paths.append(os.path.realpath(env_file))
+        for base in _cookie_dirs():
+            try:
+                names = os.listdir(base)
+            except OSError:
+                continue
+            paths.extend(os.path.realpath(os.path.join(base, n)) for n in names)
+        valid = []
+        for path in dict.fromkeys(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if not os.path.isfile(path):
+                continue
+            seen = self._seen.get(path)
+            if seen and seen[:2] == (st.st_mtime_ns, st.st_size):
+                ok = seen[2]
+            else:
+                ok = _is_cookie_file(path)
+                self._seen[path] = (st.st_mtime_ns, st.st_size, ok)
+                if seen:
+                    LOGGER(__name__).info(f"Cookie file changed: {path}")
+            if ok:
+                valid.append(path)
+        for path in valid:
+            if path not in self._states:
+                self._states[path] = CookieState(path)
+        for path in list(self._states):
+            if path not in valid:
+                del self._states[path]
+        for path in list(self._seen):
+            if path not in paths:
+                del self._seen[path]
+
+    def files(self) -> List[str]:
+        self._scan()
+        return list(self._states)
+
+    def candidates(self) -> List[str]:
+        """All usable cookie files, best first; cooling ones go last."""
+        self._scan()
+        self._ensure_sync()
+        now = time.time()
+        ready, cooling = [], []
+        for state in self._states.values():
+            score = state.sample(now)
+            if state.cooldown_until > now:
+                cooling.append((state.cooldown_until, state.path))
+            else:
+                ready.append((-score, state.path))
+        ready.sort()
+        cooling.sort()
+        return [p for _, p in ready] + [p for _, p in cooling]
+
+    def pick(self) -> Optional[str]:
+        ranked = self.candidates()
+        return ranked[0] if ranked else None
+
+    def report(
+        self,
+        path: Optional[str],
+        ok: bool,
+        latency_ms: Optional[int] = None,
+        cooldown: int = DEFAULT_COOLDOWN,
+        err_code: Optional[str] = None,
+    ):
+        """Record the outcome of one extraction made with ``path``.
+
+        Safe to call from executor threads; nothing here awaits.
+        """
+        state = self._states.get(os.path.realpath(path)) if path else None
+        if state is None:
+            return
+        now = time.time()
+        state._decay(now)
+        if latency_ms is not None:
+            if state.latency_ms:
+                state.latency_ms = 0.8 * state.latency_ms + 0.2 * latency_ms
+            else:
+                state.latency_ms = float(latency_ms)
+        if ok:
+            state.ok += 1
+            state.new_ok += 1
+            state.cooldown_until = 0
+        else:
+            state.fail += 1
+            state.new_fail += 1
+            state.cooldown_until = now + cooldown
+            state.new_cooldown = cooldown
+            state.last_err_code = err_code
+        self._ensure_sync()
+
+    def _ensure_sync(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception:
+                pass
+            await asyncio.sleep(SYNC_INTERVAL)
+
+    async def sync(self):
+        """Push local deltas and pull shared counters/cooldowns in one pipeline."""
+        states = list(self._states.values())
+        if not states:
+            return
+        r = get_redis()
+        pipe = r.pipeline()
+        now = int(time.time())
+        pushed = []
+        for state in states:
+            key = f"ytcookies:file:{state.name}"
+            if state.new_ok or state.new_fail:
+                pipe.hincrby(key, "usage", state.new_ok)
+                pipe.hincrby(key, "fail", state.new_fail)
+                fields = {"ts": str(now), "last_latency_ms": str(int(state.latency_ms))}
+                if state.last_err_code:
+                    fields["last_err_code"] = state.last_err_code
+                pipe.hset(key, mapping=fields)
+            if state.new_cooldown:
+                pipe.set(
+                    f"ytcookies:cooldown:{state.name}", "1", ex=state.new_cooldown
+                )
+            pushed.append((state, state.new_ok, state.new_fail, state.new_cooldown))
+        for state in states:
+            pipe.hgetall(f"ytcookies:file:{state.name}")
+            pipe.ttl(f"ytcookies:cooldown:{state.name}")
+        results = await pipe.execute()
+        for state, new_ok, new_fail, new_cooldown in pushed:
+            state.new_ok -= new_ok
+            state.new_fail -= new_fail
+            if state.new_cooldown == new_cooldown:
+                state.new_cooldown = 0
+        tail = results[len(results) - 2 * len(states) :]
+        seed = not self._seeded
+        for i, state in enumerate(states):
+            shared, ttl = tail[2 * i] or {}, tail[2 * i + 1]
+            if ttl and ttl > 0:
+                state.cooldown_until = max(state.cooldown_until, now + ttl)
+            if seed:
+                try:
+                    state.ok += min(int(shared.get("usage", 0)), SEED_CAP)
+                    state.fail += min(int(shared.get("fail", 0)), SEED_CAP)
+                    state.latency_ms = state.latency_ms or float(
+                        shared.get("last_latency_ms", 0)
+                    )
+                except (TypeError, ValueError):
+                    pass
+        self._seeded = True
+
+    def health(self) -> List[dict]:
+        self._scan()
+        now = time.time()
+        rows = []
+        for state in self._states.values():
+            state._decay(now)
+            rows.append(
+                {
+                    "cookie": state.name,
+                    "ok": state.ok,
+                    "fail": state.fail,
+                    "latency_ms": state.latency_ms,
+                    "cooling": state.cooldown_until > now,
+                }
+            )
+        return rows
+
+    def yt_dlp_args(self, path: Optional[str]) -> List[str]:
+        if path and os.path.exists(path):
+            return ["--cookies", path]
+        return []
+
+
+cookie_pool = CookiePool()
+
+
+def latency_ms_since(start: float) -> int:
+    return int((time.time() - start) * 1000)
+
+
+def cookie_cooldown(stderr: str) -> Tuple[int, str]:
+    """Cooldown seconds and error code for a failed yt-dlp run."""
+    lower = (stderr or "").lower()
+    if "sign in to confirm" in lower:
+        return 7200, "BOT_DETECTED"
+    if "429" in lower or "too many requests" in lower:
+        return DEFAULT_COOLDOWN, "RATE_LIMIT"
+    return DEFAULT_COOLDOWN, "UNKNOWN"
+
@@ -1,7 +1,9 @@
 import random
 from typing import Dict, List, Union
 
+import config
 from ZeMusic import userbot
+from ZeMusic.core.cache import get_registered_active_chats, set_active_chat
 from ZeMusic.core.mongo import mongodb
 
 authdb = mongodb.adminauth
@@ -14,6 +16,7 @@ chatsdb = mongodb.chats
 channeldb = mongodb.cplaymode
 countdb = mongodb.upcount
 gbansdb = mongodb.gban
+gbanjobsdb = mongodb.gbanjobs
 langdb = mongodb.language
 onoffdb = mongodb.onoffper
 playmodedb = mongodb.playmode
@@ -378,10 +381,20 @@ async def music_off(chat_id: int):
     pause[chat_id] = False
 
 
+# Each process keeps the chats it plays in; with several shards they are also
+# registered in Redis so the get_all_* lists cover all of them.
 async def get_active_chats() -> list:
     return active
 
 
+async def get_all_active_chats() -> list:
+    if config.SHARDS > 1:
+        chats = await get_registered_active_chats("audio")
+        if chats is not None:
+            return chats
+    return active
+
+
 async def is_active_chat(chat_id: int) -> bool:
     if chat_id not in active:
         return False
@@ -392,17 +405,29 @@ async def is_active_chat(chat_id: int) -> bool:
 async def add_active_chat(chat_id: int):
     if chat_id not in active:
         active.append(chat_id)
+        if config.SHARDS > 1:
+            await set_active_chat("audio", chat_id, True)
 
 
 async def remove_active_chat(chat_id: int):
     if chat_id in active:
         active.remove(chat_id)
+        if config.SHARDS > 1:
+            await set_active_chat("audio", chat_id, False)
 
 
 async def get_active_video_chats() -> list:
     return activevideo
 
 
+async def get_all_active_video_chats() -> list:
+    if config.SHARDS > 1:
+        chats = await get_registered_active_chats("video")
+        if chats is not None:
+            return chats
+    return activevideo
+
+
 async def is_active_video_chat(chat_id: int) -> bool:
     if chat_id not in activevideo:
         return False
@@ -413,11 +438,15 @@ async def is_active_video_chat(chat_id: int) -> bool:
 async def add_active_video_chat(chat_id: int):
     if chat_id not in activevideo:
         activevideo.append(chat_id)
+        if config.SHARDS > 1:
+            await set_active_chat("video", chat_id, True)
 
 
 async def remove_active_video_chat(chat_id: int):
     if chat_id in activevideo:
         activevideo.remove(chat_id)
+        if config.SHARDS > 1:
+            await set_active_chat("video", chat_id, False)
 
 
 async def check_nonadmin_chat(chat_id: int) -> bool:
@@ -651,6 +680,23 @@ async def remove_gban_user(user_id: int):
     return await gbansdb.delete_one({"user_id": user_id})
 
 
+async def get_gban_jobs() -> list:
+    jobs_list = []
+    async for job in gbanjobsdb.find({"job_id": {"$exists": True}}):
+        jobs_list.append(job)
+    return jobs_list
+
+
+async def save_gban_job(job_id: str, state: dict):
+    return await gbanjobsdb.update_one(
+        {"job_id": job_id}, {"$set": state}, upsert=True
+    )
+
+
+async def remove_gban_job(job_id: str):
+    return await gbanjobsdb.delete_one({"job_id": job_id})
+
+
 async def get_sudoers() -> list:
     sudoers = await sudoersdb.find_one({"sudo": "sudo"})
     if not sudoers:
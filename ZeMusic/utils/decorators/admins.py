@@ -13,9 +13,10 @@ from ZeMusic.utils.database import (
     is_nonadmin_chat,
     is_skipmode,
 )
-from config import SUPPORT_CHAT, adminlist, confirmer
+from config import SUPPORT_CHAT, confirmer
 from strings import get_string
 
+from ..admincache import get_admins, is_admin
 from ..formatters import int_to_alpha
 
 
@@ -65,7 +66,7 @@ def AdminRightsCheck(mystic):
         is_non_admin = await is_nonadmin_chat(message.chat.id)
         if not is_non_admin:
             if message.from_user.id not in SUDOERS:
-                admins = adminlist.get(message.chat.id)
+                admins = await get_admins(message.chat.id)
                 if not admins:
                     return await message.reply_text(_["admin_13"])
                 else:
@@ -177,16 +178,9 @@ def ActualAdminCB(mystic):
             return await mystic(client, CallbackQuery, _)
         is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
         if not is_non_admin:
-            try:
-                a = (
-                    await app.get_chat_member(
-                        CallbackQuery.message.chat.id,
-                        CallbackQuery.from_user.id,
-                    )
-                ).privileges
-            except:
-                return await CallbackQuery.answer(_["general_4"], show_alert=True)
-            if not a.can_manage_video_chats:
+            if not await is_admin(
+                CallbackQuery.message.chat.id, CallbackQuery.from_user.id
+            ):
                 if CallbackQuery.from_user.id not in SUDOERS:
                     token = await int_to_alpha(CallbackQuery.from_user.id)
                     _check = await get_authuser_names(CallbackQuery.from_user.id)
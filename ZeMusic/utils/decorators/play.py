@@ -20,8 +20,9 @@ from ZeMusic.utils.database import (
     is_active_chat,
     is_maintenance,
 )
+from ZeMusic.utils.admincache import get_admins
 from ZeMusic.utils.inline import botplaylist_markup
-from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
+from config import PLAYLIST_IMG_URL, SUPPORT_CHAT
 from strings import get_string
 
 links = {}
@@ -81,7 +82,7 @@ def PlayWrapper(command):
         playty = await get_playtype(message.chat.id)
         if playty != "Everyone":
             if message.from_user.id not in SUDOERS:
-                admins = adminlist.get(message.chat.id)
+                admins = await get_admins(message.chat.id)
                 if not admins:
                     return await message.reply_text(_["admin_13"])
                 else:
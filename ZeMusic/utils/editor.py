@@ -0,0 +1,189 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pyrogram.errors import FloodWait, MessageNotModified
+
+import config
+from ZeMusic import LOGGER, app
+from ZeMusic.core.metrics import metrics
+
+Key = Tuple[int, int]
+
+TICK = 0.5
+# How many "last sent" states are remembered for idle-edit detection.
+MAX_REMEMBERED = 2048
+
+
+def _key(message) -> Key:
+    return message.chat.id, message.id
+
+
+def _signature(edit: dict) -> str:
+    return f"{edit.get('text')}\x00{edit.get('reply_markup')}"
+
+
+class EditScheduler:
+    """Coalescing scheduler for live message edits (progress bars, timers).
+
+    Callers submit the *desired* state of a message and return immediately.
+    Only the latest state per (chat_id, message_id) is kept; it is flushed
+    when both the per-chat interval and the bot-wide rate budget allow, and
+    dropped if it equals what the message already shows.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Key, dict] = {}
+        self._last: "OrderedDict[Key, str]" = OrderedDict()
+        self._chat_next: Dict[int, float] = {}
+        self._watches: Dict[Key, list] = {}
+        self._tokens = config.EDIT_GLOBAL_RATE
+        self._refilled = time.time()
+        self._flood_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def _report(self):
+        metrics.set_gauge("edit_queue_depth", self.depth)
+        metrics.set_gauge("edit_watches", len(self._watches))
+
+    def submit(self, chat_id: int, message_id: int, **edit):
+        """Set the desired ``text`` and/or ``reply_markup`` of a message."""
+        key = (chat_id, message_id)
+        metrics.inc("edits_total", result="submitted")
+        pending = self._pending.get(key)
+        if pending is not None:
+            metrics.inc("edits_total", result="coalesced")
+            if "text" not in edit and "text" in pending:
+                edit = {**pending, **edit}
+        self._pending[key] = edit
+        self._ensure_running()
+
+    def edit_text(self, message, text: str, **kwargs):
+        self.submit(message.chat.id, message.id, text=text, **kwargs)
+
+    def edit_reply_markup(self, message, reply_markup):
+        self.submit(message.chat.id, message.id, reply_markup=reply_markup)
+
+    def discard(self, message=None, chat_id: int = None, message_id: int = None):
+        """Forget pending edits and the watch for a message about to be
+        edited directly or deleted, so a late flush cannot overwrite it."""
+        key = _key(message) if message else (chat_id, message_id)
+        if self._pending.pop(key, None) is not None:
+            metrics.inc("edits_total", result="coalesced")
+        self._watches.pop(key, None)
+        self._last.pop(key, None)
+
+    async def settle(self, message):
+        """Send the pending edit of ``message`` now, so that direct edits
+        made afterwards are not overtaken by it."""
+        key = _key(message)
+        edit = self._pending.pop(key, None)
+        if edit is not None:
+            await self._send(key, edit)
+
+    def watch(
+        self,
+        message,
+        producer: Callable[[], Awaitable[Optional[object]]],
+        interval: float = 5,
+    ):
+        """Refresh the reply markup of ``message`` every ``interval`` seconds.
+
+        ``producer`` returns the markup to show, or ``None`` to stop watching.
+        Unchanged markups (e.g. while paused) cost no API call.
+        """
+        self._watches[_key(message)] = [producer, interval, time.time() + interval]
+        self._ensure_running()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending or self._watches:
+            await asyncio.sleep(TICK)
+            try:
+                await self._poll_watches()
+                self._flush()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Edit scheduler tick failed: {e}")
+            self._report()
+        self._report()
+
+    async def _poll_watches(self):
+        now = time.time()
+        for key, entry in list(self._watches.items()):
+            producer, interval, due = entry
+            if due > now:
+                continue
+            entry[2] = now + interval
+            try:
+                markup = await producer()
+            except Exception:
+                markup = None
+            if markup is None:
+                self._watches.pop(key, None)
+                continue
+            self.submit(*key, reply_markup=markup)
+
+    def _flush(self):
+        now = time.time()
+        if now < self._flood_until:
+            return
+        rate = config.EDIT_GLOBAL_RATE
+        self._tokens = min(rate, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        for key, edit in list(self._pending.items()):
+            if self._tokens < 1:
+                break
+            chat_id = key[0]
+            if self._chat_next.get(chat_id, 0) > now:
+                continue
+            del self._pending[key]
+            if self._last.get(key) == _signature(edit):
+                metrics.inc("edits_total", result="skipped")
+                continue
+            self._tokens -= 1
+            self._chat_next[chat_id] = now + config.EDIT_CHAT_INTERVAL
+            asyncio.create_task(self._send(key, edit))
+        if not self._pending:
+            for chat_id, ready in list(self._chat_next.items()):
+                if ready <= now:
+                    del self._chat_next[chat_id]
+
+    def _remember(self, key: Key, edit: dict):
+        self._last[key] = _signature(edit)
+        self._last.move_to_end(key)
+        while len(self._last) > MAX_REMEMBERED:
+            self._last.popitem(last=False)
+
+    async def _send(self, key: Key, edit: dict):
+        chat_id, message_id = key
+        try:
+            if "text" in edit:
+                await app.edit_message_text(chat_id, message_id, **edit)
+            else:
+                await app.edit_message_reply_markup(
+                    chat_id, message_id, edit["reply_markup"]
+                )
+            metrics.inc("edits_total", result="sent")
+            self._remember(key, edit)
+        except MessageNotModified:
+            metrics.inc("edits_total", result="skipped")
+            self._remember(key, edit)
+        except FloodWait as fw:
+            self._flood_until = max(self._flood_until, time.time() + int(fw.value))
+            # Retry later unless a newer state has been submitted meanwhile.
+            self._pending.setdefault(key, edit)
+            self._ensure_running()
+        except Exception:
+            metrics.inc("edits_total", result="failed")
+            self._watches.pop(key, None)
+
+
+editor = EditScheduler()
@@ -5,6 +5,8 @@ import asyncio
 from typing import Optional, Dict, Any, Union
 from pyrogram.types import Message
 
+from .editor import editor
+
 try:
     from .youtube_api_helper import get_youtube_info, is_youtube_url, youtube_api_helper
     API_AVAILABLE = True
@@ -31,7 +33,7 @@ class EnhancedYouTubeHandler:
         
         try:
             if message:
-                await message.edit_text("🔍 جاري الحصول على معلومات الفيديو...")
+                editor.edit_text(message, "🔍 جاري الحصول على معلومات الفيديو...")
             
             # Get info from API (very fast)
             info = await get_youtube_info(url)
@@ -45,7 +47,8 @@ class EnhancedYouTubeHandler:
                     duration_min = info['duration'] // 60
                     duration_sec = info['duration'] % 60
                     
-                    await message.edit_text(
+                    editor.edit_text(
+                        message,
                         f"✅ **{title}**\n"
                         f"⏱️ المدة: {duration_min:02d}:{duration_sec:02d}\n"
                         f"👀 المشاهدات: {info['view_count']:,}\n"
@@ -55,13 +58,13 @@ class EnhancedYouTubeHandler:
                 return info
             else:
                 if message:
-                    await message.edit_text("⚠️ لم يتم العثور على معلومات الفيديو")
+                    editor.edit_text(message, "⚠️ لم يتم العثور على معلومات الفيديو")
                 return None
         
         except Exception as e:
             print(f"Enhanced YouTube info error: {e}")
             if message:
-                await message.edit_text("🔄 جاري المحاولة بطريقة أخرى...")
+                editor.edit_text(message, "🔄 جاري المحاولة بطريقة أخرى...")
             return None
     
     async def download_with_api_info(
@@ -86,7 +89,7 @@ class EnhancedYouTubeHandler:
         if video_info:
             # We have video info, now try to download
             if message:
-                await message.edit_text(f"⬇️ جاري تحميل: {video_info['title'][:40]}...")
+                editor.edit_text(message, f"⬇️ جاري تحميل: {video_info['title'][:40]}...")
             
             # If we have an original download function, call it
             if original_download_func:
@@ -97,6 +100,7 @@ class EnhancedYouTubeHandler:
                     error_str = str(e)
                     if "Sign in to confirm" in error_str:
                         if message:
+                            editor.discard(message)
                             await message.edit_text(
                                 f"🚫 **مشكلة في تحميل الفيديو**\n\n"
                                 f"📋 العنوان: {video_info['title'][:50]}...\n"
@@ -116,7 +120,7 @@ class EnhancedYouTubeHandler:
         else:
             # No API info, proceed with original method
             if message:
-                await message.edit_text("🔄 جاري المحاولة بالطريقة التقليدية...")
+                editor.edit_text(message, "🔄 جاري المحاولة بالطريقة التقليدية...")
             
             if original_download_func:
                 return await original_download_func(url, **kwargs)
@@ -158,6 +162,7 @@ class EnhancedYouTubeHandler:
 ⏱️ **المدة:** {info['duration']//60}:{info['duration']%60:02d}
 📺 **القناة:** {info['channel']}
 """
+                editor.discard(message)
                 await message.edit_text(suggestion_text)
                 return title
         
@@ -0,0 +1,277 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from pyrogram.errors import ChannelPrivate, ChatAdminRequired, FloodWait
+
+import config
+from ZeMusic import LOGGER, app
+from ZeMusic.core.cache import (
+    acquire_gban_lease,
+    gban_lease_held,
+    get_not_admin_chats,
+    mark_not_admin,
+    release_gban_lease,
+    renew_gban_lease,
+)
+from ZeMusic.utils.database import (
+    get_gban_jobs,
+    remove_gban_job,
+    save_gban_job,
+)
+from ZeMusic.utils.editor import editor
+from strings import get_string
+
+# Running jobs keyed by "<action>:<user_id>".
+jobs: Dict[str, "GbanJob"] = {}
+
+# Bot-wide FloodWait gate shared by every worker of every job.
+_flood_until = 0.0
+
+CHECKPOINT_INTERVAL = 5
+# Seconds a job's Redis lease outlives its last checkpoint; a job whose
+# process died can be taken over after this.
+LEASE_TTL = 30
+# Identifies this process as a lease holder.
+OWNER = f"{config.SHARD_ID}:{os.getpid()}"
+OPPOSITE = {"ban": "unban", "unban": "ban"}
+
+
+def job_key(action: str, user_id: int) -> str:
+    return f"{action}:{user_id}"
+
+
+async def _flood_gate():
+    while True:
+        delay = _flood_until - time.time()
+        if delay <= 0:
+            return
+        await asyncio.sleep(delay)
+
+
+def _hold_flood(seconds: int):
+    global _flood_until
+    _flood_until = max(_flood_until, time.time() + int(seconds) + 1)
+
+
+class GbanJob:
+    """A global ban/unban fan-out over the served chats.
+
+    Chats are processed by a bounded pool of workers. ``cursor`` is the
+    low-water mark of finished chats; it is checkpointed to Mongo so a
+    restarted bot resumes from there (ban/unban are idempotent, so replaying
+    the few chats past the mark is harmless). The checkpointed counts cover
+    only the chats before ``cursor``, so replayed chats are not counted twice.
+    A Redis lease keeps every other shard from running the same job.
+    """
+
+    def __init__(self, state: dict):
+        self.action = state["action"]
+        self.user_id = int(state["user_id"])
+        self.key = job_key(self.action, self.user_id)
+        self.chats = [int(c) for c in state["chats"]]
+        self.cursor = int(state.get("cursor", 0))
+        self.done = int(state.get("done", 0))
+        self.skipped = int(state.get("skipped", 0))
+        self.failed = int(state.get("failed", 0))
+        self.origin = state["origin"]
+        # index -> outcome, for chats finished past ``cursor``
+        self._finished: Dict[int, str] = {}
+        self._ahead = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+        self._superseded = False
+
+    @property
+    def total(self) -> int:
+        return len(self.chats)
+
+    @property
+    def progress(self) -> int:
+        return self.done + self.skipped + self.failed
+
+    def state(self) -> dict:
+        return {
+            "job_id": self.key,
+            "action": self.action,
+            "user_id": self.user_id,
+            "chats": self.chats,
+            "cursor": self.cursor,
+            "done": self.done - self._ahead["done"],
+            "skipped": self.skipped - self._ahead["skipped"],
+            "failed": self.failed - self._ahead["failed"],
+            "origin": self.origin,
+        }
+
+    def _complete(self, index: int, outcome: str):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        self._finished[index] = outcome
+        self._ahead[outcome] += 1
+        while self.cursor in self._finished:
+            self._ahead[self._finished.pop(self.cursor)] -= 1
+            self.cursor += 1
+
+    async def _apply(self, chat_id: int):
+        if self.action == "ban":
+            await app.ban_chat_member(chat_id, self.user_id)
+        else:
+            await app.unban_chat_member(chat_id, self.user_id)
+
+    async def _worker(self, queue: asyncio.Queue, skip: set):
+        while not self._stopped:
+            try:
+                index = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            chat_id = self.chats[index]
+            if chat_id in skip:
+                self._complete(index, "skipped")
+                continue
+            while True:
+                await _flood_gate()
+                try:
+                    await self._apply(chat_id)
+                    outcome = "done"
+                except FloodWait as fw:
+                    _hold_flood(fw.value)
+                    continue
+                except (ChatAdminRequired, ChannelPrivate):
+                    await mark_not_admin(chat_id)
+                    outcome = "skipped"
+                except Exception:
+                    outcome = "failed"
+                break
+            self._complete(index, outcome)
+
+    def _report(self, _):
+        origin = self.origin
+        editor.submit(
+            origin["chat_id"],
+            origin["mystic_id"],
+            text=_["gban_13"].format(
+                min(self.progress, self.total),
+                self.total,
+                self.done,
+                self.skipped,
+                self.failed,
+            ),
+        )
+
+    async def _checkpoint(self, _):
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL)
+            if not await renew_gban_lease(self.key, OWNER, LEASE_TTL):
+                LOGGER(__name__).warning(f"Lost the lease of g{self.action} of {self.user_id}")
+                self._stopped = True
+                return
+            try:
+                await save_gban_job(self.key, self.state())
+            except Exception:
+                pass
+            self._report(_)
+
+    async def cancel(self):
+        """Stop after the chats in flight and drop the job, checkpoint included."""
+        self._superseded = self._stopped = True
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def run(self):
+        _ = get_string(self.origin.get("lang", "en"))
+        origin = self.origin
+        skip = await get_not_admin_chats()
+        queue = asyncio.Queue()
+        for index in range(self.cursor, self.total):
+            queue.put_nowait(index)
+        checkpoint = asyncio.create_task(self._checkpoint(_))
+        try:
+            workers = max(1, min(config.GBAN_WORKERS, queue.qsize()))
+            await asyncio.gather(
+                *(self._worker(queue, skip) for i in range(workers))
+            )
+        finally:
+            checkpoint.cancel()
+        jobs.pop(self.key, None)
+        editor.discard(chat_id=origin["chat_id"], message_id=origin["mystic_id"])
+        if self._stopped and not self._superseded:
+            # Another shard took the job over; it finishes and reports it.
+            return
+        await remove_gban_job(self.key)
+        await release_gban_lease(self.key, OWNER)
+        if self._superseded:
+            try:
+                await app.delete_messages(origin["chat_id"], origin["mystic_id"])
+            except Exception:
+                pass
+            return
+        try:
+            if self.action == "ban":
+                text = _["gban_6"].format(
+                    app.mention,
+                    origin["chat_title"],
+                    origin["chat_id"],
+                    origin["user_mention"],
+                    self.user_id,
+                    origin["by_mention"],
+                    self.done,
+                )
+            else:
+                text = _["gban_9"].format(origin["user_mention"], self.done)
+            await app.send_message(origin["chat_id"], text)
+            await app.delete_messages(origin["chat_id"], origin["mystic_id"])
+        except Exception:
+            pass
+
+    def start(self) -> asyncio.Task:
+        jobs[self.key] = self
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+
+async def claim(action: str, user_id: int) -> bool:
+    """Reserve the ``action`` job for ``user_id`` in this process.
+
+    A running opposite job is cancelled here, so the newer command wins.
+    False while the job already runs, or while either job runs in another
+    shard. A claimed job must then be started with ``start_job``.
+    """
+    key = job_key(action, user_id)
+    if key in jobs:
+        return False
+    opposite = job_key(OPPOSITE[action], user_id)
+    if opposite in jobs:
+        await jobs[opposite].cancel()
+    if await gban_lease_held(opposite):
+        return False
+    return await acquire_gban_lease(key, OWNER, LEASE_TTL)
+
+
+async def start_job(action: str, user_id: int, chats: list, origin: dict) -> GbanJob:
+    job = GbanJob(
+        {"action": action, "user_id": user_id, "chats": chats, "origin": origin}
+    )
+    await save_gban_job(job.key, job.state())
+    job.start()
+    return job
+
+
+async def resume_jobs():
+    try:
+        pending = await get_gban_jobs()
+    except Exception:
+        return
+    for state in pending:
+        try:
+            job = GbanJob(state)
+        except Exception:
+            continue
+        if job.key in jobs:
+            continue
+        # Resumed at startup, when the processes that held leases are gone.
+        await acquire_gban_lease(job.key, OWNER, LEASE_TTL, force=True)
+        LOGGER(__name__).info(
+            f"Resuming g{job.action} of {job.user_id} at {job.cursor}/{job.total}"
+        )
+        job.start()
@@ -0,0 +1,37 @@
+import asyncio
+from html.parser import HTMLParser
+from typing import Dict, List
+
+
+class _MetaParser(HTMLParser):
+    def __init__(self, wanted):
+        super().__init__(convert_charrefs=True)
+        self.wanted = wanted
+        self.found: Dict[str, List[str]] = {name: [] for name in wanted}
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "meta":
+            return
+        attrs = dict(attrs)
+        name = attrs.get("property") or attrs.get("name")
+        if name in self.wanted and attrs.get("content") is not None:
+            self.found[name].append(attrs["content"])
+
+
+def _parse(html: str, wanted) -> Dict[str, List[str]]:
+    # Meta tags live in <head>; the body is most of a page and is skipped.
+    end = html.find("</head>")
+    parser = _MetaParser(wanted)
+    parser.feed(html if end == -1 else html[:end])
+    return parser.found
+
+
+async def meta_tags(html: str, *names: str) -> Dict[str, List[str]]:
+    """Contents of the ``<meta property|name=...>`` tags in ``names``.
+
+    Only the document head is tokenized, in an executor, so large pages
+    do not hold the event loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        None, _parse, html, frozenset(names)
+    )
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import config
+from ZeMusic.core.metrics import metrics
+
+MAX_CACHED = 512
+
+_session: Optional[aiohttp.ClientSession] = None
+_hosts: Dict[str, asyncio.Semaphore] = {}
+# (method, url, params) -> (expires at, value)
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+class HttpError(Exception):
+    pass
+
+
+def session() -> aiohttp.ClientSession:
+    """The process-wide client session, created on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=config.HTTP_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _host_gate(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    gate = _hosts.get(host)
+    if gate is None:
+        gate = _hosts[host] = asyncio.Semaphore(config.HTTP_HOST_CONCURRENCY)
+    return gate
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    params: Optional[dict] = None,
+    data: Any = None,
+    cache_ttl: int = 0,
+    timeout: Optional[float] = None,
+    as_json: bool = True,
+) -> Any:
+    """Send one request on the shared session and return its decoded body.
+
+    At most HTTP_HOST_CONCURRENCY requests run per host, so a slow service
+    queues its own callers instead of piling up sockets. With ``cache_ttl``
+    the decoded body is reused for that many seconds for identical requests.
+    Raises ``HttpError`` on non-2xx answers and ``asyncio.TimeoutError``
+    when the service is too slow.
+    """
+    key = None
+    if cache_ttl:
+        key = (method, url, tuple(sorted((params or {}).items())))
+        hit = _cache.get(key)
+        if hit and hit[0] > time.time():
+            _cache.move_to_end(key)
+            return hit[1]
+    host = urlsplit(url).netloc
+    started = time.perf_counter()
+    result = "error"
+    try:
+        async with _host_gate(url):
+            async with session().request(
+                method,
+                url,
+                params=params,
+                data=data,
+                timeout=aiohttp.ClientTimeout(total=timeout or config.HTTP_TIMEOUT),
+            ) as resp:
+                if resp.status >= 400:
+                    result = str(resp.status)
+                    raise HttpError(f"{method} {host}: HTTP {resp.status}")
+                body = await (resp.json(content_type=None) if as_json else resp.text())
+                result = "ok"
+    except asyncio.TimeoutError:
+        result = "timeout"
+        raise
+    finally:
+        metrics.inc("http_requests_total", host=host, result=result)
+        metrics.observe("http_request_ms", (time.perf_counter() - started) * 1000, host=host)
+    if key is not None:
+        _cache[key] = (time.time() + cache_ttl, body)
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return body
+
+
+async def get_json(url: str, **kwargs) -> Any:
+    return await request("GET", url, **kwargs)
+
+
+async def post_json(url: str, **kwargs) -> Any:
+    return await request("POST", url, **kwargs)
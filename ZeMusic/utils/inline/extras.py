@@ -27,6 +27,28 @@ def close_markup(_):
     return upl
 
 
+def playlist_pages_markup(_, token, page, pages):
+    buttons = []
+    if pages > 1:
+        buttons.append(
+            [
+                InlineKeyboardButton(
+                    text="◁", callback_data=f"plist {token}|{(page - 1) % pages}"
+                ),
+                InlineKeyboardButton(
+                    text=f"{page + 1}/{pages}", callback_data=f"plist {token}|{page}"
+                ),
+                InlineKeyboardButton(
+                    text="▷", callback_data=f"plist {token}|{(page + 1) % pages}"
+                ),
+            ]
+        )
+    buttons.append(
+        [InlineKeyboardButton(text=_["CLOSE_BUTTON"], callback_data="close")]
+    )
+    return InlineKeyboardMarkup(buttons)
+
+
 def supp_markup(_):
     upl = InlineKeyboardMarkup(
         [
@@ -0,0 +1,70 @@
+import asyncio
+import os
+from typing import Optional
+
+import config
+
+STORE_DIR = os.path.realpath("downloads")
+PART_SUFFIX = ".part"
+
+_evicting: Optional[asyncio.Task] = None
+
+
+def enabled() -> bool:
+    return config.MEDIA_STORE_MB > 0
+
+
+def managed(path: str) -> bool:
+    """Whether ``path`` is a finished file kept by the store."""
+    return enabled() and os.path.dirname(os.path.realpath(path)) == STORE_DIR
+
+
+def lookup(path: str) -> bool:
+    """True when ``path`` is already stored; marks it as recently used."""
+    if not os.path.isfile(path):
+        return False
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return True
+
+
+def _evict():
+    limit = config.MEDIA_STORE_MB * 1024 * 1024
+    playing = {os.path.realpath(str(f)) for f in config.autoclean}
+    files = []
+    try:
+        entries = list(os.scandir(STORE_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        # Sub-folders belong to other jobs; partial files are still downloading.
+        if not entry.is_file() or entry.name.endswith(PART_SUFFIX):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        if path in playing:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def schedule_evict():
+    """Trim the store to MEDIA_STORE_MB in the background, least recently used first."""
+    global _evicting
+    if not enabled() or (_evicting is not None and not _evicting.done()):
+        return
+    _evicting = asyncio.ensure_future(
+        asyncio.get_running_loop().run_in_executor(None, _evict)
+    )
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+import config
+from ZeMusic.logging import LOGGER
+
+# (title, position in the queue)
+Entry = Tuple[str, int]
+
+WIDTH, HEIGHT = 1280, 720
+CARD_ROWS = 10
+PAGE_SIZE = 8
+MAX_LISTS = 256
+FONT = "ZeMusic/assets/font2.ttf"
+ACCENT = (255, 196, 0)
+
+_pool: Optional[ProcessPoolExecutor] = None
+# token -> queued entries, for the paginated caption
+_lists: "OrderedDict[str, List[Entry]]" = OrderedDict()
+
+# Built once per worker process and copied for every card.
+_template = None
+_fonts = {}
+
+
+def _font(size: int):
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = ImageFont.truetype(FONT, size)
+    return font
+
+
+def _build_template():
+    card = Image.new("RGB", (WIDTH, HEIGHT))
+    draw = ImageDraw.Draw(card)
+    for y in range(HEIGHT):
+        shade = int(18 + 30 * y / HEIGHT)
+        draw.line([(0, y), (WIDTH, y)], fill=(shade, shade // 2, shade + 20))
+    draw.rectangle([(0, 0), (WIDTH, 120)], fill=(10, 6, 24))
+    draw.rectangle([(0, 118), (WIDTH, 124)], fill=ACCENT)
+    draw.text((60, 30), "LOL MUSIC", fill="white", font=_font(56))
+    draw.text((WIDTH - 60, 48), "PLAYLIST QUEUED", fill=ACCENT, font=_font(34), anchor="ra")
+    return card
+
+
+def _draw(path: str, entries: List[Entry]) -> str:
+    global _template
+    if _template is None:
+        _template = _build_template()
+    card = _template.copy()
+    draw = ImageDraw.Draw(card)
+    y = 150
+    for index, (title, position) in enumerate(entries[:CARD_ROWS], start=1):
+        draw.text((60, y), f"{index:02d}", fill=ACCENT, font=_font(32))
+        draw.text((140, y), title[:48], fill="white", font=_font(32))
+        draw.text((WIDTH - 60, y), f"#{position}", fill=(190, 190, 190), font=_font(32), anchor="ra")
+        y += 50
+    if len(entries) > CARD_ROWS:
+        draw.text((140, y + 4), f"+ {len(entries) - CARD_ROWS}", fill=ACCENT, font=_font(30))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    card.save(tmp, "JPEG", quality=85)
+    os.replace(tmp, path)
+    return path
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=config.CARD_WORKERS)
+    return _pool
+
+
+async def render_card(entries: List[Entry]) -> Optional[str]:
+    """Path of a JPEG card listing ``entries``, drawn in a worker process.
+
+    Cards are named after their content, so the same playlist queued again
+    reuses the file. Returns None when drawing fails.
+    """
+    digest = hashlib.sha1(repr(entries[: CARD_ROWS + 1]).encode()).hexdigest()[:16]
+    path = os.path.join("cache", f"plcard_{digest}_{len(entries)}.jpg")
+    if os.path.isfile(path):
+        return path
+    global _pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _executor(), _draw, path, entries
+        )
+    except BrokenProcessPool:
+        _pool = None
+    except Exception as e:
+        LOGGER(__name__).warning(f"Playlist card failed: {e}")
+    return None
+
+
+def remember(entries: List[Entry]) -> str:
+    """Keep ``entries`` for page buttons; returns the token they go by."""
+    token = uuid.uuid4().hex[:12]
+    _lists[token] = entries
+    while len(_lists) > MAX_LISTS:
+        _lists.popitem(last=False)
+    return token
+
+
+def pages(entries: List[Entry]) -> int:
+    return max(1, -(-len(entries) // PAGE_SIZE))
+
+
+def page_text(entries: List[Entry], page: int) -> str:
+    start = page * PAGE_SIZE
+    return "\n".join(
+        f"{number}. {title[:45]} — #{position}"
+        for number, (title, position) in enumerate(
+            entries[start : start + PAGE_SIZE], start=start + 1
+        )
+    )
+
+
+def lookup(token: str) -> Optional[List[Entry]]:
+    return _lists.get(token)
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from hachoir.core import config as hachoir_config
+from hachoir.metadata import extractMetadata
+from hachoir.parser import createParser
+
+hachoir_config.quiet = True
+
+MAX_ENTRIES = 1024
+# Remote streams can change behind the same URL, so their probes expire.
+URL_TTL = 600
+
+_files: "OrderedDict[tuple, Optional[float]]" = OrderedDict()
+_urls: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _remember(cache: OrderedDict, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+def _hachoir_duration(path: str) -> Optional[float]:
+    try:
+        parser = createParser(path)
+    except Exception:
+        return None
+    if not parser:
+        return None
+    try:
+        with parser:
+            metadata = extractMetadata(parser)
+    except Exception:
+        return None
+    if metadata and metadata.has("duration"):
+        seconds = metadata.get("duration").total_seconds()
+        if seconds > 0:
+            return seconds
+    return None
+
+
+async def _ffprobe_duration(source: str) -> Optional[float]:
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe",
+        "-loglevel",
+        "quiet",
+        "-print_format",
+        "json",
+        "-show_entries",
+        "format=duration:stream=duration",
+        source,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    out, _ = await proc.communicate()
+    try:
+        data = json.loads(out or b"{}")
+    except ValueError:
+        return None
+    duration = data.get("format", {}).get("duration")
+    if duration is None:
+        for stream in data.get("streams", []):
+            duration = stream.get("duration")
+            if duration is not None:
+                break
+    try:
+        return float(duration)
+    except (TypeError, ValueError):
+        return None
+
+
+async def media_duration(source: str) -> Optional[float]:
+    """Duration in seconds of a local file or a stream URL, or ``None``.
+
+    Local files are parsed in-process with hachoir and only handed to
+    ffprobe when their headers carry no duration. Results are memoized by
+    (path, size, mtime) for files and for ``URL_TTL`` seconds for URLs.
+    """
+    try:
+        st = os.stat(source)
+    except (OSError, ValueError):
+        st = None
+    if st is None:
+        hit = _urls.get(source)
+        if hit and time.time() - hit[1] < URL_TTL:
+            return hit[0]
+        duration = await _ffprobe_duration(source)
+        _remember(_urls, source, (duration, time.time()))
+        return duration
+    key = (os.path.realpath(source), st.st_size, st.st_mtime_ns)
+    if key in _files:
+        _files.move_to_end(key)
+        return _files[key]
+    duration = await asyncio.get_running_loop().run_in_executor(
+        None, _hachoir_duration, source
+    )
+    if duration is None:
+        duration = await _ffprobe_duration(source)
+    _remember(_files, key, duration)
+    return duration
@@ -0,0 +1,55 @@
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from ZeMusic.core.cache import get_cached_resolution, set_cached_resolution
+
+HOUR = 60 * 60
+
+# Seconds a resolved link is reused, per (platform, kind). Single tracks are
+# stable; playlists and artist charts change; SoundCloud stream URLs expire.
+TTLS = {
+    ("youtube", "track"): 24 * HOUR,
+    ("youtube", "playlist"): HOUR,
+    ("spotify", "track"): 7 * 24 * HOUR,
+    ("spotify", "album"): 7 * 24 * HOUR,
+    ("spotify", "playlist"): HOUR,
+    ("spotify", "artist"): 6 * HOUR,
+    ("apple", "track"): 7 * 24 * HOUR,
+    ("apple", "playlist"): HOUR,
+    ("resso", "track"): 7 * 24 * HOUR,
+    ("soundcloud", "track"): 5 * 60,
+}
+
+
+def _usable(platform: str, result) -> bool:
+    if platform != "soundcloud":
+        return True
+    # SoundCloud results point at a stream URL or a local file that may be gone.
+    details, source = result
+    if "track_id" not in details:
+        return False
+    return source.startswith("http") or os.path.exists(source)
+
+
+async def resolve(
+    platform: str,
+    kind: str,
+    url: str,
+    resolver: Callable[[], Awaitable[Any]],
+    reuse: Optional[Callable[[Any], Any]] = None,
+) -> Any:
+    """Result of ``resolver()`` for ``url``, shared between chats by canonical URL.
+
+    Tuples come back from the cache as lists, which unpack the same way.
+    Falsy results (the resolvers' way of saying "not found") are not stored.
+    ``reuse`` runs on a cache hit, for resolvers that also keep local state.
+    """
+    cached = await get_cached_resolution(f"{platform}:{kind}", url)
+    if cached is not None and _usable(platform, cached):
+        return reuse(cached) if reuse else cached
+    result = await resolver()
+    if result:
+        await set_cached_resolution(
+            f"{platform}:{kind}", url, result, TTLS[(platform, kind)]
+        )
+    return result
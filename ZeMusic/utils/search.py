@@ -0,0 +1,440 @@
+import asyncio
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+from youtube_search import YoutubeSearch
+from youtubesearchpython.__future__ import VideosSearch
+from yt_dlp import YoutubeDL
+
+import config
+from ZeMusic.core.cache import (
+    get_cached_matches,
+    get_cached_search,
+    set_cached_matches,
+    set_cached_search,
+)
+from ZeMusic.core.metrics import metrics
+from ZeMusic.utils.cookiepool import cookie_pool
+from ZeMusic.utils.formatters import seconds_to_min
+from ZeMusic.utils.youtube_api_helper import youtube_api_helper
+
+# A provider that fails this many times in a row is benched for a while.
+MAX_CONSECUTIVE_FAILURES = 3
+BENCH_BASE = 60
+BENCH_MAX = 600
+
+
+class SearchError(Exception):
+    pass
+
+
+def _entry(
+    vidid: str,
+    title: str,
+    duration_min: Optional[str],
+    thumb: Optional[str],
+    views: Optional[str] = None,
+    channel: Optional[str] = None,
+    channel_link: Optional[str] = None,
+    published: Optional[str] = None,
+) -> dict:
+    """One search result in the shape every caller reads."""
+    return {
+        "title": title,
+        "link": f"https://www.youtube.com/watch?v={vidid}",
+        "vidid": vidid,
+        "duration_min": duration_min,
+        "thumb": thumb.split("?")[0] if thumb else thumb,
+        "views": views,
+        "channel": channel,
+        "channel_link": channel_link,
+        "published": published,
+    }
+
+
+class SearchProvider(ABC):
+    """Turns free text into at most ``limit`` YouTube results."""
+
+    name = "provider"
+    # Latency assumed before the first measurement, in ms.
+    expected_ms = 1500
+    # Quota-limited providers are only used as a hedge or fallback.
+    fallback_only = False
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def search(self, query: str, limit: int) -> List[dict]:
+        ...
+
+
+class VideosSearchProvider(SearchProvider):
+    name = "videossearch"
+    expected_ms = 800
+
+    async def search(self, query: str, limit: int) -> List[dict]:
+        search = VideosSearch(query, limit=limit)
+        found = []
+        while len(found) < limit:
+            page = (await search.next()).get("result") or []
+            if not page:
+                break
+            found.extend(page)
+        results = []
+        for r in found[:limit]:
+            channel = r.get("channel") or {}
+            results.append(
+                _entry(
+                    r["id"],
+                    r["title"],
+                    r["duration"],
+                    r["thumbnails"][0]["url"],
+                    (r.get("viewCount") or {}).get("short"),
+                    channel.get("name"),
+                    channel.get("link"),
+                    r.get("publishedTime"),
+                )
+            )
+        return results
+
+
+class YoutubeSearchProvider(SearchProvider):
+    name = "youtube_search"
+    expected_ms = 1200
+
+    async def search(self, query: str, limit: int) -> List[dict]:
+        found = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: YoutubeSearch(query, max_results=limit).to_dict()
+        )
+        results = []
+        for r in found[:limit]:
+            thumbs = r.get("thumbnails") or [None]
+            results.append(
+                _entry(
+                    r["id"],
+                    r["title"],
+                    r.get("duration") or None,
+                    thumbs[0],
+                    r.get("views"),
+                    r.get("channel"),
+                    None,
+                    r.get("publish_time"),
+                )
+            )
+        return results
+
+
+class YtDlpProvider(SearchProvider):
+    name = "ytdlp"
+    expected_ms = 4000
+
+    def _search(self, query: str, limit: int) -> List[dict]:
+        from ZeMusic.platforms.Youtube import _extractor_args_py, _http_headers
+
+        options = {
+            "quiet": True,
+            "noplaylist": True,
+            "extract_flat": "in_playlist",
+            "http_headers": _http_headers(),
+            "extractor_args": _extractor_args_py(),
+        }
+        c = cookie_pool.pick()
+        if c and os.path.exists(c):
+            options["cookiefile"] = c
+        with YoutubeDL(options) as ydl:
+            info = ydl.extract_info(f"ytsearch{limit}:{query}", download=False)
+        results = []
+        for r in info.get("entries") or []:
+            thumbs = r.get("thumbnails") or [{}]
+            views = r.get("view_count")
+            results.append(
+                _entry(
+                    r["id"],
+                    r["title"],
+                    seconds_to_min(r["duration"]) if r.get("duration") else None,
+                    thumbs[0].get("url") or f"https://i.ytimg.com/vi/{r['id']}/hqdefault.jpg",
+                    f"{views:,} views" if views else None,
+                    r.get("channel") or r.get("uploader"),
+                    r.get("channel_url"),
+                )
+            )
+        return results
+
+    async def search(self, query: str, limit: int) -> List[dict]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._search, query, limit
+        )
+
+
+def _iso_duration(value: str) -> Optional[str]:
+    match = re.match(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", value or "")
+    if not match:
+        return None
+    d, h, m, s = (int(g or 0) for g in match.groups())
+    return seconds_to_min(((d * 24 + h) * 60 + m) * 60 + s)
+
+
+class DataApiProvider(SearchProvider):
+    """YouTube Data API v3: fast and reliable, but every search costs quota."""
+
+    name = "data_api"
+    expected_ms = 600
+    fallback_only = True
+
+    def available(self) -> bool:
+        return youtube_api_helper.enabled and bool(youtube_api_helper.get_current_api_key())
+
+    async def _get(self, session, path: str, params: dict) -> dict:
+        params["key"] = youtube_api_helper.get_current_api_key()
+        async with session.get(f"{youtube_api_helper.api_base}/{path}", params=params) as resp:
+            if resp.status == 403:
+                youtube_api_helper.rotate_api_key()
+            if resp.status != 200:
+                raise SearchError(f"Data API {path}: HTTP {resp.status}")
+            return await resp.json()
+
+    async def search(self, query: str, limit: int) -> List[dict]:
+        timeout = aiohttp.ClientTimeout(total=config.SEARCH_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            found = await self._get(
+                session,
+                "search",
+                {"part": "snippet", "q": query, "type": "video", "maxResults": min(limit, 50)},
+            )
+            ids = [item["id"]["videoId"] for item in found.get("items", [])]
+            if not ids:
+                return []
+            details = await self._get(
+                session,
+                "videos",
+                {"part": "snippet,contentDetails,statistics", "id": ",".join(ids)},
+            )
+        by_id = {item["id"]: item for item in details.get("items", [])}
+        results = []
+        for vid in ids:
+            item = by_id.get(vid)
+            if not item:
+                continue
+            snippet = item["snippet"]
+            thumbs = snippet.get("thumbnails") or {}
+            thumb = (thumbs.get("high") or thumbs.get("default") or {}).get("url")
+            views = item.get("statistics", {}).get("viewCount")
+            results.append(
+                _entry(
+                    vid,
+                    snippet["title"],
+                    _iso_duration(item.get("contentDetails", {}).get("duration")),
+                    thumb,
+                    f"{int(views):,} views" if views else None,
+                    snippet.get("channelTitle"),
+                    f"https://www.youtube.com/channel/{snippet['channelId']}",
+                    snippet.get("publishedAt", "")[:10] or None,
+                )
+            )
+        return results
+
+
+class ProviderStats:
+    def __init__(self, provider: SearchProvider):
+        self.latency_ms = float(provider.expected_ms)
+        self.ok = 0
+        self.fail = 0
+        self.wins = 0
+        self.consecutive = 0
+        self.benched_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def record(self, ok: bool, latency_ms: float, error: Optional[str] = None):
+        self.latency_ms = 0.8 * self.latency_ms + 0.2 * latency_ms
+        if ok:
+            self.ok += 1
+            self.consecutive = 0
+            self.benched_until = 0
+            return
+        self.fail += 1
+        self.consecutive += 1
+        self.last_error = error
+        if self.consecutive >= MAX_CONSECUTIVE_FAILURES:
+            bench = min(BENCH_BASE * 2 ** (self.consecutive - MAX_CONSECUTIVE_FAILURES), BENCH_MAX)
+            self.benched_until = time.time() + bench
+
+
+class SearchRouter:
+    """Sends each query to the fastest healthy provider.
+
+    When that provider has not answered after ``hedge_ms``, the next one is
+    started as well and whichever returns results first wins. Failures and
+    empty answers fall through to the next provider. Latency is tracked as
+    an EWMA per provider; repeated failures bench a provider with backoff.
+    """
+
+    def __init__(self, providers: List[SearchProvider], hedge_ms: float):
+        self.providers = providers
+        self.hedge_ms = hedge_ms
+        self._stats: Dict[str, ProviderStats] = {p.name: ProviderStats(p) for p in providers}
+
+    def ranked(self) -> List[SearchProvider]:
+        now = time.time()
+        ready, benched = [], []
+        for p in self.providers:
+            if not p.available():
+                continue
+            stats = self._stats[p.name]
+            if stats.benched_until > now:
+                benched.append((stats.benched_until, p))
+            else:
+                ready.append((p.fallback_only, stats.latency_ms, p))
+        ready.sort(key=lambda row: row[:2])
+        benched.sort(key=lambda row: row[0])
+        return [p for *_, p in ready] + [p for _, p in benched]
+
+    async def _run(self, provider: SearchProvider, query: str, limit: int) -> List[dict]:
+        started = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(
+                provider.search(query, limit), config.SEARCH_TIMEOUT
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            latency = (time.perf_counter() - started) * 1000
+            self._stats[provider.name].record(False, latency, f"{type(e).__name__}: {e}")
+            metrics.inc("search_total", provider=provider.name, result="fail")
+            raise
+        latency = (time.perf_counter() - started) * 1000
+        self._stats[provider.name].record(True, latency)
+        metrics.observe("search_latency_ms", latency, provider=provider.name)
+        metrics.inc(
+            "search_total", provider=provider.name, result="ok" if results else "empty"
+        )
+        return results
+
+    async def search(self, query: str, limit: int = 1) -> List[dict]:
+        queue = iter(self.ranked())
+        pending: Dict[asyncio.Task, SearchProvider] = {}
+        last_error: Optional[Exception] = None
+        answered = False
+
+        def launch() -> bool:
+            provider = next(queue, None)
+            if provider is None:
+                return False
+            pending[asyncio.create_task(self._run(provider, query, limit))] = provider
+            return True
+
+        if not launch():
+            raise SearchError("No search provider available")
+        hedged = False
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else self.hedge_ms / 1000,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedged = True
+                    if launch():
+                        metrics.inc("search_hedges_total")
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        results = task.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if results:
+                        self._stats[provider.name].wins += 1
+                        metrics.inc("search_wins_total", provider=provider.name)
+                        return results
+                    answered = True
+                if not pending:
+                    hedged = False
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        if not answered:
+            raise last_error or SearchError("No search provider answered")
+        return []
+
+    def stats(self) -> List[dict]:
+        now = time.time()
+        rows = []
+        for p in self.providers:
+            s = self._stats[p.name]
+            rows.append(
+                {
+                    "provider": p.name,
+                    "available": p.available(),
+                    "latency_ms": s.latency_ms,
+                    "ok": s.ok,
+                    "fail": s.fail,
+                    "wins": s.wins,
+                    "benched": s.benched_until > now,
+                    "last_error": s.last_error,
+                }
+            )
+        return rows
+
+
+search_router = SearchRouter(
+    [
+        VideosSearchProvider(),
+        YoutubeSearchProvider(),
+        YtDlpProvider(),
+        DataApiProvider(),
+    ],
+    hedge_ms=config.SEARCH_HEDGE_MS,
+)
+
+
+async def search_videos(query: str, limit: int = 1) -> List[dict]:
+    """Top ``limit`` YouTube videos for free text, served from Redis when cached."""
+    cached = await get_cached_search(query, limit)
+    if cached is not None:
+        return cached
+    results = await search_router.search(query, limit)
+    await set_cached_search(query, results, limit)
+    return results
+
+
+async def match_tracks(tracks: List[Tuple[Optional[str], str]]) -> List[dict]:
+    """YouTube details for catalog tracks given as ``(cache key, search text)``.
+
+    Order is kept and misses are dropped. Known matches come from one
+    Redis lookup; the rest are searched concurrently, MATCH_CONCURRENCY at
+    a time, and stored under their key so a track is only matched once.
+    """
+    known = await get_cached_matches([key for key, _ in tracks])
+    fresh = {}
+    semaphore = asyncio.Semaphore(config.MATCH_CONCURRENCY)
+
+    async def match(key: Optional[str], query: str) -> Optional[dict]:
+        if key in known:
+            return known[key]
+        async with semaphore:
+            try:
+                details = (await search_videos(query, 1))[0]
+            except Exception:
+                return None
+        details = {
+            "title": details["title"],
+            "link": details["link"],
+            "vidid": details["vidid"],
+            "duration_min": details["duration_min"],
+            "thumb": details["thumb"],
+        }
+        if key:
+            fresh[key] = details
+        return details
+
+    matched = await asyncio.gather(*(match(key, query) for key, query in tracks))
+    await set_cached_matches(fresh)
+    return [details for details in matched if details]
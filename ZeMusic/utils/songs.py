@@ -0,0 +1,260 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+
+import aiofiles
+import aiohttp
+import yt_dlp
+
+from ZeMusic.core.cache import (
+    acquire_lock,
+    bump_usage,
+    extract_youtube_id,
+    get_cached_by_query,
+    get_cached_by_video_id,
+    normalize_query,
+    release_lock,
+    set_cache_from_message,
+)
+from ZeMusic.logging import LOGGER
+from ZeMusic.platforms.Youtube import _extractor_args_py, _http_headers
+from ZeMusic.utils.cookiepool import cookie_cooldown, cookie_pool, latency_ms_since
+from ZeMusic.utils.formatters import time_to_seconds
+from ZeMusic.utils.search import search_videos
+from ZeMusic.utils.workers import download_executor
+
+SONGS_DIR = os.path.join("downloads", "songs")
+# How long to wait for another process that holds the download lock.
+REMOTE_WAIT = 90
+REMOTE_POLL = 2
+
+NOT_FOUND = "- لم يتم العثـور على نتائج حاول مجددا"
+
+# video id -> upload in progress in this process; resolves to the cache meta.
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+class SongError(Exception):
+    pass
+
+
+def _download(link: str, workdir: str) -> Tuple[dict, str]:
+    """Blocking yt-dlp download into ``workdir``; runs on the song executor."""
+    last_error = None
+    for cookie_path in cookie_pool.candidates() or [None]:
+        ydl_opts = {
+            "format": "bestaudio[ext=m4a]",
+            "keepvideo": False,
+            "geo_bypass": True,
+            "outtmpl": os.path.join(workdir, "%(id)s.%(ext)s"),
+            "quiet": True,
+            "noplaylist": True,
+            "http_headers": _http_headers(),
+            "extractor_args": _extractor_args_py(),
+            "retries": 3,
+            "retry_sleep": {"extractor": [1, 5]},
+            "nocheckcertificate": True,
+        }
+        if cookie_path and os.path.isfile(cookie_path):
+            ydl_opts["cookiefile"] = cookie_path
+        start_ts = time.time()
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(link, download=True)
+                path = ydl.prepare_filename(info)
+            cookie_pool.report(cookie_path, True, latency_ms_since(start_ts))
+            return info, path
+        except Exception as e:
+            last_error = e
+            cool, err_code = cookie_cooldown(str(e))
+            cookie_pool.report(
+                cookie_path, False, latency_ms_since(start_ts), cool, err_code
+            )
+    raise SongError(str(last_error) if last_error else "Unknown error")
+
+
+async def _fetch_thumb(url: str, path: str) -> Optional[str]:
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+                if resp.status != 200:
+                    return None
+                async with aiofiles.open(path, mode="wb") as f:
+                    await f.write(await resp.read())
+        return path
+    except Exception:
+        return None
+
+
+async def _send_cached(message, cached: dict, caption: str, reply_markup):
+    return await message.reply_audio(
+        audio=cached["file_id"],
+        caption=caption,
+        title=cached.get("title") or None,
+        performer=cached.get("performer") or None,
+        duration=int(cached.get("duration") or 0) or None,
+        reply_markup=reply_markup,
+    )
+
+
+async def _wait_remote(video_id: str) -> Optional[dict]:
+    """Wait for another process that is uploading ``video_id``."""
+    deadline = time.time() + REMOTE_WAIT
+    while time.time() < deadline:
+        await asyncio.sleep(REMOTE_POLL)
+        try:
+            cached = await get_cached_by_video_id(video_id)
+        except Exception:
+            cached = None
+        if cached and cached.get("file_id"):
+            return cached
+    return None
+
+
+async def _upload(message, details: dict, caption: str, reply_markup) -> dict:
+    """Download ``details`` in a private temp dir, upload it and cache the file_id."""
+    os.makedirs(SONGS_DIR, exist_ok=True)
+    workdir = tempfile.mkdtemp(dir=SONGS_DIR)
+    try:
+        loop = asyncio.get_running_loop()
+        thumb_task = asyncio.create_task(
+            _fetch_thumb(details["thumb"], os.path.join(workdir, "thumb.jpg"))
+        )
+        info, audio_file = await loop.run_in_executor(
+            download_executor, _download, details["link"], workdir
+        )
+        thumb = await thumb_task
+        title = details["title"][:40]
+        duration = int(info.get("duration") or 0) or time_to_seconds(
+            details["duration_min"] or 0
+        )
+        performer = info.get("uploader", "Unknown")
+        sent = await message.reply_audio(
+            audio=audio_file,
+            caption=caption,
+            title=title,
+            performer=performer,
+            thumb=thumb,
+            duration=duration,
+            reply_markup=reply_markup,
+        )
+        return {
+            "file_id": getattr(getattr(sent, "audio", None), "file_id", None),
+            "title": title,
+            "duration": duration,
+            "performer": performer,
+            "video_id": details["vidid"],
+            "source": "youtube",
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def send_song(message, query: str, caption: str, reply_markup=None):
+    """Reply to ``message`` with the audio of the top result for ``query``.
+
+    Telegram file_ids are reused whenever the query or its video was sent
+    before. Concurrent requests for one video share a single download and
+    upload: in-process through a future, across processes through the Redis
+    lock. yt-dlp runs on a bounded executor, never on the event loop.
+    """
+    qnorm = normalize_query(query)
+    try:
+        vid = extract_youtube_id(query)
+        cached = await get_cached_by_video_id(vid) if vid else None
+        if not cached:
+            cached = await get_cached_by_query(qnorm)
+    except Exception:
+        cached = None
+    if cached and cached.get("file_id"):
+        try:
+            await _send_cached(message, cached, caption, reply_markup)
+            await bump_usage(qnorm, cached.get("video_id"))
+            return
+        except Exception:
+            pass
+
+    m = await message.reply_text("<b>⇜ جـارِ البحث ..</b>")
+    try:
+        results = await search_videos(query, 1)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Song search failed for {query!r}: {e}")
+        results = []
+    if not results:
+        return await m.edit(NOT_FOUND)
+    details = results[0]
+    video_id = details["vidid"]
+
+    try:
+        cached = await get_cached_by_video_id(video_id)
+    except Exception:
+        cached = None
+
+    if not (cached and cached.get("file_id")):
+        await m.edit("<b>جاري التحميل ♪</b>")
+        pending = _inflight.get(video_id)
+        try:
+            if pending is None:
+                pending = _inflight[video_id] = _future()
+                try:
+                    cached = await _lead(message, details, caption, reply_markup, pending)
+                finally:
+                    _inflight.pop(video_id, None)
+                    if not pending.done():
+                        pending.cancel()
+                sent = True
+            else:
+                cached = await asyncio.shield(pending)
+                sent = False
+        except Exception as e:
+            return await m.edit(f"error, wait for bot owner to fix\n\nError: {e}")
+    else:
+        sent = False
+
+    try:
+        if not sent:
+            await _send_cached(message, cached, caption, reply_markup)
+        await m.delete()
+    except Exception as e:
+        return await m.edit(f"error, wait for bot owner to fix\n\nError: {e}")
+    try:
+        await set_cache_from_message(query, cached)
+    except Exception:
+        pass
+
+
+def _future() -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    # Waiters may all be gone; don't log an unretrieved exception.
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    return future
+
+
+async def _lead(message, details: dict, caption: str, reply_markup, pending) -> dict:
+    video_id = details["vidid"]
+    try:
+        locked = await acquire_lock(f"song:{video_id}", ttl=REMOTE_WAIT)
+    except Exception:
+        locked = True
+    try:
+        meta = None
+        if not locked:
+            meta = await _wait_remote(video_id)
+            if meta:
+                await _send_cached(message, meta, caption, reply_markup)
+        if meta is None:
+            meta = await _upload(message, details, caption, reply_markup)
+        pending.set_result(meta)
+        return meta
+    except Exception as e:
+        pending.set_exception(e)
+        raise
+    finally:
+        if locked:
+            try:
+                await release_lock(f"song:{video_id}")
+            except Exception:
+                pass
@@ -1,6 +1,7 @@
 import os
 
 from config import autoclean
+from ZeMusic.utils.mediastore import managed, schedule_evict
 
 
 async def auto_clean(popped):
@@ -8,7 +9,11 @@ async def auto_clean(popped):
         rem = popped["file"]
         autoclean.remove(rem)
         count = autoclean.count(rem)
-        if count == 0:
+        # Stored media stays for other chats until the store evicts it; every
+        # source lands in the store, so trim it here and not only on ingest.
+        if count == 0 and managed(rem):
+            schedule_evict()
+        elif count == 0:
             if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
                 try:
                     os.remove(rem)
@@ -0,0 +1,145 @@
+import asyncio
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Optional
+
+from pyrogram.types import InlineKeyboardMarkup
+
+import config
+from ZeMusic import LOGGER, app
+from ZeMusic.misc import db
+from ZeMusic.utils.database import get_lang
+from ZeMusic.utils.inline.play import stream_markup
+from ZeMusic.utils.thumbnails import get_thumb
+from strings import get_string
+
+MAX_FILE_IDS = 512
+
+# chat_id -> (queue entry the card is for, card)
+_prepared: Dict[int, tuple] = {}
+# chat_id -> (queue entry being prepared, task)
+_preparing: Dict[int, tuple] = {}
+# photo path or URL -> Telegram file_id of an earlier upload
+_file_ids: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _remember(photo: str, message):
+    try:
+        _file_ids[photo] = message.photo.file_id
+    except AttributeError:
+        return
+    _file_ids.move_to_end(photo)
+    while len(_file_ids) > MAX_FILE_IDS:
+        _file_ids.popitem(last=False)
+
+
+async def build(_, entry: dict) -> dict:
+    """Photo, caption and markup kind announcing ``entry`` as now playing."""
+    queued = entry["file"]
+    videoid = entry["vidid"]
+    title = entry["title"].title()[:23]
+    user = entry["by"]
+    info = f"https://t.me/{app.username}?start=info_{videoid}"
+    if "index_" in queued:
+        return {
+            "photo": config.STREAM_IMG_URL,
+            "caption": _["stream_2"].format(user),
+            "markup": "tg",
+        }
+    if "live_" in queued or "vid_" in queued:
+        photo = await get_thumb(videoid)
+        markup = "tg" if "live_" in queued else "stream"
+    elif videoid == "telegram":
+        photo = (
+            config.TELEGRAM_AUDIO_URL
+            if str(entry["streamtype"]) == "audio"
+            else config.TELEGRAM_VIDEO_URL
+        )
+        info, markup = config.SUPPORT_CHAT, "tg"
+    elif videoid == "soundcloud":
+        photo, info, markup = config.SOUNCLOUD_IMG_URL, config.SUPPORT_CHAT, "tg"
+    else:
+        photo, markup = await get_thumb(videoid), "stream"
+    return {
+        "photo": photo,
+        "caption": _["stream_1"].format(info, title, entry["dur"], user),
+        "markup": markup,
+    }
+
+
+async def _prepare(chat_id: int, entry: dict):
+    try:
+        _ = get_string(await get_lang(chat_id))
+        card = await build(_, entry)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Now-playing card for {chat_id} failed: {e}")
+        return
+    photo = card["photo"]
+    if photo not in _file_ids and config.LOGGER_ID:
+        # Upload once to the log group so the announcement only sends a file_id.
+        try:
+            sent = await app.send_photo(
+                config.LOGGER_ID, photo=photo, disable_notification=True
+            )
+            _remember(photo, sent)
+            await sent.delete()
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not pre-upload {photo}: {e}")
+    card["_"] = _
+    _prepared[chat_id] = (entry, card)
+
+
+def prepare_next(chat_id: int):
+    """Render and upload the card of the track after the current one, in the background."""
+    queue = db.get(chat_id)
+    if not queue or len(queue) < 2:
+        return
+    entry = queue[1]
+    ready = _prepared.get(chat_id)
+    if ready and ready[0] is entry:
+        return
+    running = _preparing.get(chat_id)
+    if running:
+        if running[0] is entry:
+            return
+        running[1].cancel()
+    task = asyncio.create_task(_prepare(chat_id, entry))
+    _preparing[chat_id] = (entry, task)
+
+    def done(_t):
+        if _preparing.get(chat_id, (None, None))[1] is task:
+            _preparing.pop(chat_id)
+
+    task.add_done_callback(done)
+
+
+def take(chat_id: int, entry: dict) -> Optional[dict]:
+    """The card prepared for ``entry``, if it is the one that was prepared."""
+    ready = _prepared.pop(chat_id, None)
+    if ready and ready[0] is entry:
+        return ready[1]
+    return None
+
+
+async def announce(chat_id: int, original_chat_id: int, _, entry: dict, card=None):
+    """Send the now-playing card of ``entry``; returns the message and markup kind."""
+    if card is None:
+        card = await build(_, entry)
+    photo = card["photo"]
+    send = partial(
+        app.send_photo,
+        chat_id=original_chat_id,
+        caption=card["caption"],
+        reply_markup=InlineKeyboardMarkup(stream_markup(_, chat_id)),
+    )
+    file_id = _file_ids.get(photo)
+    try:
+        run = await send(photo=file_id or photo)
+    except Exception:
+        if not file_id:
+            raise
+        _file_ids.pop(photo, None)
+        run = await send(photo=photo)
+    if photo not in _file_ids:
+        _remember(photo, run)
+    return run, card["markup"]
@@ -0,0 +1,142 @@
+import errno
+import os
+import threading
+import time
+import uuid
+from typing import List, Tuple
+
+from ZeMusic.utils.mediastore import STORE_DIR
+
+STREAMS_DIR = os.path.join(STORE_DIR, "streams")
+CHUNK = 1024 * 1024
+# Seconds a stream waits for its player to open it.
+OPEN_TIMEOUT = 60
+# The player may probe the stream before playing it; each opener reads it
+# from the start, up to this many times.
+MAX_READERS = 3
+
+
+def streamable(head: bytes) -> bool:
+    """False for MP4/MOV data whose index (moov) follows the media (mdat).
+
+    Such files cannot be decoded from the front, so they are only played
+    once complete. Other containers are read front to back.
+    """
+    if head[4:8] != b"ftyp":
+        return True
+    position = 0
+    while position + 8 <= len(head):
+        size = int.from_bytes(head[position : position + 4], "big")
+        kind = head[position + 4 : position + 8]
+        if kind == b"moov":
+            return True
+        if kind == b"mdat":
+            return False
+        if size == 1 and position + 16 <= len(head):
+            size = int.from_bytes(head[position + 8 : position + 16], "big")
+        if size < 8:
+            return False
+        position += size
+    return False
+
+
+class GrowingFile:
+    """A file written as byte ranges in any order, played from its front.
+
+    Writers report progress per range from the event loop; readers on
+    other threads block until the contiguous prefix grows past them.
+    """
+
+    def __init__(self, path: str, ranges: List[Tuple[int, int]]):
+        self.path = path
+        self.finished = False
+        self._ranges = sorted(ranges)
+        self._filled = [0] * len(self._ranges)
+        self._grown = threading.Condition()
+
+    @property
+    def available(self) -> int:
+        """Bytes from the start of the file that are already written."""
+        end = 0
+        for (start, stop), filled in zip(self._ranges, self._filled):
+            end = start + filled
+            if filled < stop - start:
+                break
+        return end
+
+    def wrote(self, start: int, size: int):
+        index = next(i for i, r in enumerate(self._ranges) if r[0] == start)
+        with self._grown:
+            self._filled[index] += size
+            self._grown.notify_all()
+
+    def finish(self):
+        with self._grown:
+            self.finished = True
+            self._grown.notify_all()
+
+    def _wait_past(self, position: int) -> int:
+        with self._grown:
+            while self.available <= position and not self.finished:
+                self._grown.wait(1)
+            return self.available
+
+    def open_stream(self) -> str:
+        """A new FIFO that replays the file from the start as it grows."""
+        os.makedirs(STREAMS_DIR, exist_ok=True)
+        fifo = os.path.join(STREAMS_DIR, uuid.uuid4().hex)
+        os.mkfifo(fifo)
+        # Opened now, so a rename or removal of the path cannot race the reader.
+        src = os.open(self.path, os.O_RDONLY)
+        threading.Thread(
+            target=self._feed, args=(src, fifo), name="growing-feed", daemon=True
+        ).start()
+        return fifo
+
+    def _feed(self, src: int, fifo: str):
+        try:
+            for _ in range(MAX_READERS):
+                out = _open_reader(fifo)
+                if out is None or self._copy(src, out):
+                    break
+        finally:
+            os.close(src)
+            try:
+                os.remove(fifo)
+            except OSError:
+                pass
+
+    def _copy(self, src: int, out: int) -> bool:
+        """Send the file to one reader; False if it hung up early."""
+        position = 0
+        try:
+            while True:
+                available = self._wait_past(position)
+                if position >= available:
+                    return True
+                data = memoryview(
+                    os.pread(src, min(available - position, CHUNK), position)
+                )
+                if not data:
+                    return True
+                position += len(data)
+                while data:
+                    data = data[os.write(out, data) :]
+        except BrokenPipeError:
+            return False
+        finally:
+            os.close(out)
+
+
+def _open_reader(fifo: str):
+    deadline = time.monotonic() + OPEN_TIMEOUT
+    while True:
+        try:
+            fd = os.open(fifo, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno != errno.ENXIO or time.monotonic() > deadline:
+                return None
+            time.sleep(0.2)
+            continue
+        os.set_blocking(fd, True)
+        return fd
@@ -1,8 +1,9 @@
-import asyncio
 from typing import Union
 
 from ZeMusic.misc import db
-from ZeMusic.utils.formatters import check_duration, seconds_to_min
+from ZeMusic.utils.stream import nowplaying
+from ZeMusic.utils.formatters import seconds_to_min
+from ZeMusic.utils.probe import media_duration
 from config import autoclean, time_to_seconds
 
 
@@ -51,6 +52,7 @@ async def put_queue(
             db[chat_id] = []
         db[chat_id].append(put)
     autoclean.append(file)
+    nowplaying.prepare_next(chat_id)
 
 
 async def put_queue_index(
@@ -66,9 +68,9 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = await media_duration(vidid)
+            if dur is None:
+                raise ValueError(vidid)
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
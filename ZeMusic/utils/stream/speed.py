@@ -0,0 +1,132 @@
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+
+import config
+from ZeMusic.logging import LOGGER
+
+VARIANTS_DIR = os.path.join(os.getcwd(), "playback")
+
+_building: Dict[Tuple[str, str], asyncio.Task] = {}
+# Rendering is CPU bound; one variant at a time keeps playback smooth.
+_render_lock = asyncio.Lock()
+
+
+def speed_filters(speed) -> str:
+    """ffmpeg output options that render a whole file at ``speed``."""
+    speed = float(speed)
+    return f"-filter:a atempo={speed} -filter:v setpts={1 / speed}*PTS"
+
+
+def _piped_filters(speed, video=None) -> str:
+    """Live speed filters, split between the commands py-tgcalls builds.
+
+    Audio and video are piped by two ffmpeg commands built from the same
+    parameters; ``--audio``/``--video`` give each only its own filter. The
+    video chain repeats the ``-vf scale`` py-tgcalls adds, since ffmpeg
+    keeps only the last video filter.
+    """
+    speed = float(speed)
+    params = f"--audio -atend -filter:a atempo={speed}"
+    if video is not None:
+        params += (
+            f" --video -atend -filter:v setpts={1 / speed}*PTS,"
+            f"scale={video.width}:{video.height}"
+        )
+    return params
+
+
+def stream_parameters(position, speed=1.0, variant: bool = False, video=None) -> str:
+    """ffmpeg parameters to start a piped stream.
+
+    ``position`` is in seconds of the played file: the original file for live
+    filtering, or the pre-rendered variant when ``variant`` is true. ``video``
+    is the stream's VideoParameters, or None for audio.
+    """
+    params = f"-ss {int(position)}"
+    if float(speed) != 1.0 and not variant:
+        params += f" {_piped_filters(speed, video)}"
+    return params
+
+
+def variant_path(file_path: str, speed) -> str:
+    return os.path.join(VARIANTS_DIR, str(speed), os.path.basename(file_path))
+
+
+def get_variant(file_path: str, speed) -> Optional[str]:
+    if not config.SPEED_VARIANTS_MB or float(speed) == 1.0:
+        return None
+    path = variant_path(file_path, speed)
+    if not os.path.isfile(path):
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return path
+
+
+def _evict():
+    limit = config.SPEED_VARIANTS_MB * 1024 * 1024
+    files = []
+    for root, _, names in os.walk(VARIANTS_DIR):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+async def _render(file_path: str, speed):
+    out = variant_path(file_path, speed)
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    tmp = f"{out}.part{os.path.splitext(out)[1]}"
+    async with _render_lock:
+        if os.path.isfile(out) or not os.path.isfile(file_path):
+            return
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-y",
+            "-i",
+            file_path,
+            *speed_filters(speed).split(),
+            tmp,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, err = await proc.communicate()
+        if proc.returncode != 0:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            LOGGER(__name__).warning(
+                f"Speed variant {speed}x of {file_path} failed: {err[-200:]}"
+            )
+            return
+        os.replace(tmp, out)
+        await asyncio.get_running_loop().run_in_executor(None, _evict)
+
+
+def schedule_variant(file_path: str, speed):
+    """Pre-render ``file_path`` at ``speed`` in the background, once."""
+    if not config.SPEED_VARIANTS_MB or float(speed) == 1.0:
+        return
+    key = (file_path, str(speed))
+    if key in _building or os.path.isfile(variant_path(file_path, speed)):
+        return
+    task = asyncio.create_task(_render(file_path, speed))
+    _building[key] = task
+    task.add_done_callback(lambda _: _building.pop(key, None))
@@ -12,8 +12,15 @@ from ZeMusic.misc import db
 
 from ZeMusic.utils.database import add_active_video_chat, is_active_chat
 from ZeMusic.utils.exceptions import AssistantErr
-from ZeMusic.utils.inline import aq_markup, close_markup, stream_markup
+from ZeMusic.utils.formatters import time_to_seconds
+from ZeMusic.utils.inline import (
+    aq_markup,
+    close_markup,
+    playlist_pages_markup,
+    stream_markup,
+)
 from ZeMusic.utils.pastebin import ModyBin
+from ZeMusic.utils.playlistcard import page_text, pages, remember, render_card
 from ZeMusic.utils.stream.queue import put_queue, put_queue_index
 from ZeMusic.utils.thumbnails import get_thumb
 
@@ -37,18 +44,27 @@ async def stream(
         await Mody.force_stop_stream(chat_id)
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
+        entries = []
         count = 0
         for search in result:
             if int(count) == config.PLAYLIST_FETCH_LIMIT:
                 continue
             try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
+                if isinstance(search, dict):
+                    # Already matched to YouTube (Spotify and Apple resolvers).
+                    title = search["title"]
+                    duration_min = search["duration_min"]
+                    duration_sec = time_to_seconds(duration_min) if duration_min else 0
+                    thumbnail = search["thumb"]
+                    vidid = search["vidid"]
+                else:
+                    (
+                        title,
+                        duration_min,
+                        duration_sec,
+                        thumbnail,
+                        vidid,
+                    ) = await YouTube.details(search, False if spotify else True)
             except:
                 continue
             if str(duration_min) == "None":
@@ -71,6 +87,7 @@ async def stream(
                 count += 1
                 msg += f"{count}. {title[:70]}\n"
                 msg += f"{_['play_20']} {position}\n\n"
+                entries.append((title, position))
             else:
                 if not forceplay:
                     db[chat_id] = []
@@ -117,6 +134,18 @@ async def stream(
                 db[chat_id][0]["markup"] = "stream"
         if count == 0:
             return
+        if not config.PLAYLIST_EXTERNAL:
+            token = remember(entries)
+            caption = _["play_23"].format(count, page_text(entries, 0))
+            upl = playlist_pages_markup(_, token, 0, pages(entries))
+            card = await render_card(entries)
+            if card is None:
+                return await app.send_message(
+                    original_chat_id, caption, reply_markup=upl
+                )
+            return await app.send_photo(
+                original_chat_id, photo=card, caption=caption, reply_markup=upl
+            )
         else:
             link = await ModyBin(msg)
             lines = msg.count("\n")
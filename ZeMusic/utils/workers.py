@@ -0,0 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+# yt-dlp downloads block for the length of a transfer. They share this
+# bounded pool so they neither stall the event loop nor starve the default
+# executor used by short blocking calls.
+download_executor = ThreadPoolExecutor(
+    max_workers=config.DOWNLOAD_WORKERS, thread_name_prefix="download"
+)
@@ -0,0 +1,11 @@
+"""Offline benchmarks for the playback hot paths.
+
+Run from the repository root, after ``pip install -r benchmarks/requirements.txt``::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare results.json --tolerance 0.2
+    python -m benchmarks.load --chats 200 --users 1000 --rates 10,20,40,80
+
+No network, Telegram account or database is needed: Telegram, voice calls,
+Mongo, Redis, yt-dlp and YouTube search are all replaced by fakes.
+"""
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks import harness
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", nargs="+", metavar="SUITE", help="run only these suites")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="fail when a p50 is this much slower than the baseline (0.2 = 20%%)",
+    )
+    parser.add_argument("--bot-rtt-ms", type=float, default=0.0, help="simulated Bot API round trip")
+    parser.add_argument("--calls-rtt-ms", type=float, default=0.0, help="simulated voice-call round trip")
+    parser.add_argument("--search-rtt-ms", type=float, default=0.0, help="simulated search latency")
+    return parser.parse_args(argv)
+
+
+async def _run(ctx, names, iterations):
+    from benchmarks.suites import SUITES
+
+    results = {}
+    for name in names or SUITES:
+        if name not in SUITES:
+            raise SystemExit(f"unknown suite {name!r}; known: {', '.join(SUITES)}")
+        print(f"{name} ...", file=sys.stderr)
+        results[name] = await SUITES[name](ctx, iterations)
+    return results
+
+
+def _regressions(results, baseline, tolerance):
+    found = []
+    for name, stats in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("p50_ms"):
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"]
+        print(
+            f"{name:<24} p50 {before['p50_ms']:>9.3f} -> {stats['p50_ms']:>9.3f} ms ({ratio - 1:+.0%})",
+            file=sys.stderr,
+        )
+        if ratio > 1 + tolerance:
+            found.append(name)
+    return found
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    ctx = harness.boot(args.bot_rtt_ms, args.calls_rtt_ms, args.search_rtt_ms)
+    results = asyncio.get_event_loop().run_until_complete(
+        _run(ctx, args.only, args.iterations)
+    )
+    report = {
+        "environment": harness.environment(),
+        "settings": {
+            "iterations": args.iterations,
+            "bot_rtt_ms": args.bot_rtt_ms,
+            "calls_rtt_ms": args.calls_rtt_ms,
+            "search_rtt_ms": args.search_rtt_ms,
+        },
+        "requests": dict(ctx.bot.calls),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        slower = _regressions(results, baseline, args.tolerance)
+        if slower:
+            print(f"regressed beyond {args.tolerance:.0%}: {', '.join(slower)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
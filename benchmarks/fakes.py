@@ -0,0 +1,446 @@
+"""Offline stand-ins for Telegram, voice calls, yt-dlp and YouTube search.
+
+Only the surface the playback paths touch is implemented. Every fake
+answers immediately unless given a delay, so timings measure the bot's
+own code rather than the network.
+"""
+import asyncio
+import io
+import itertools
+import json
+import os
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+_message_ids = itertools.count(1000)
+
+
+def recorded_videos() -> Dict[str, dict]:
+    """yt-dlp info dicts recorded from real extractions, keyed by video id."""
+    with open(os.path.join(FIXTURES, "videos.json"), encoding="utf-8") as f:
+        return {info["id"]: info for info in json.load(f)}
+
+
+def _video_id(url: str) -> str:
+    query = parse_qs(urlsplit(url).query)
+    if "v" in query:
+        return query["v"][0]
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def fake_user(user_id: int = 5000, name: str = "bench"):
+    return SimpleNamespace(
+        id=user_id,
+        first_name=name,
+        username=name,
+        mention=f'<a href="tg://user?id={user_id}">{name}</a>',
+        is_bot=False,
+    )
+
+
+def fake_chat(chat_id: int, title: str = "Bench group"):
+    return SimpleNamespace(id=chat_id, title=title, username=None, type="supergroup")
+
+
+class FakeMessage:
+    """A pyrogram Message as the handlers read and answer it."""
+
+    def __init__(self, chat, text: str = "", from_user=None, reply_to_message=None):
+        self.id = next(_message_ids)
+        self.chat = chat
+        self.text = text
+        self.caption = None
+        self.command = text.split() if text else []
+        self.from_user = from_user
+        self.reply_to_message = reply_to_message
+        self.entities = None
+        self.caption_entities = None
+        self.photo = None
+        self.audio = None
+        self.link = f"https://t.me/c/{abs(chat.id)}/{self.id}"
+
+    async def reply_text(self, text, **kwargs):
+        return FakeMessage(self.chat, text)
+
+    async def reply_photo(self, photo, caption: str = "", **kwargs):
+        sent = FakeMessage(self.chat, caption or "")
+        sent.photo = SimpleNamespace(file_id=f"photo-{sent.id}")
+        return sent
+
+    async def edit_text(self, text, **kwargs):
+        self.text = text
+        return self
+
+    async def edit(self, text, **kwargs):
+        return await self.edit_text(text)
+
+    async def delete(self, *args, **kwargs):
+        return True
+
+
+def _user(client, user_id: int):
+    from pyrogram.types import User
+
+    return User(
+        client=client,
+        id=user_id,
+        is_bot=False,
+        first_name=f"user{user_id}",
+        username=f"user{user_id}",
+    )
+
+
+def _group(client, chat_id: int):
+    from pyrogram.enums import ChatType
+    from pyrogram.types import Chat
+
+    return Chat(client=client, id=chat_id, type=ChatType.SUPERGROUP, title=f"Group {abs(chat_id)}")
+
+
+def message_update(client, chat_id: int, user_id: int, text: str):
+    """A pyrogram Message as Telegram would deliver a group command."""
+    from pyrogram.types import Message
+
+    return Message(
+        client=client,
+        id=next(_message_ids),
+        chat=_group(client, chat_id),
+        from_user=_user(client, user_id),
+        text=text,
+    )
+
+
+def callback_update(client, chat_id: int, user_id: int, data: str):
+    """A button press on one of the bot's messages in ``chat_id``."""
+    from pyrogram.types import CallbackQuery, Message
+
+    message = Message(
+        client=client,
+        id=next(_message_ids),
+        chat=_group(client, chat_id),
+        from_user=_user(client, client.id),
+    )
+    return CallbackQuery(
+        client=client,
+        id=str(next(_message_ids)),
+        from_user=_user(client, user_id),
+        chat_instance=str(chat_id),
+        message=message,
+        data=data,
+    )
+
+
+def inline_update(client, user_id: int, query: str):
+    from pyrogram.enums import ChatType
+    from pyrogram.types import InlineQuery
+
+    return InlineQuery(
+        client=client,
+        id=str(next(_message_ids)),
+        from_user=_user(client, user_id),
+        query=query,
+        offset="",
+        chat_type=ChatType.PRIVATE,
+    )
+
+
+class FakeBot:
+    """Replaces the network-facing methods of the bot client and counts calls."""
+
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay = delay_ms / 1000
+        self.calls = Counter()
+        # user ids reported as voice-chat admins of every chat
+        self.admins: List[int] = [5000]
+        # the last text or caption the bot sent or edited in each chat
+        self.replies: Dict[int, str] = {}
+
+    async def _rtt(self, name: str):
+        self.calls[name] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    def install(self, app):
+        app.id = 777000
+        app.name = app.username = "BenchBot"
+        app.mention = "BenchBot"
+        app.me = SimpleNamespace(id=app.id, username=app.username, first_name=app.name)
+        for name in (
+            "send_message",
+            "send_photo",
+            "send_audio",
+            "edit_message_text",
+            "edit_message_reply_markup",
+            "edit_message_caption",
+            "edit_message_media",
+            "delete_messages",
+            "answer_callback_query",
+            "answer_inline_query",
+            "get_chat",
+            "get_chat_member",
+            "get_chat_members",
+        ):
+            setattr(app, name, getattr(self, name))
+
+    async def send_message(self, chat_id, text="", **kwargs):
+        await self._rtt("send_message")
+        self.replies[chat_id] = text
+        return FakeMessage(fake_chat(chat_id), text)
+
+    async def send_photo(self, chat_id, photo=None, caption="", **kwargs):
+        await self._rtt("send_photo")
+        self.replies[chat_id] = caption or ""
+        sent = FakeMessage(fake_chat(chat_id), caption or "")
+        sent.photo = SimpleNamespace(file_id=f"photo-{sent.id}")
+        return sent
+
+    async def send_audio(self, chat_id, audio=None, caption="", **kwargs):
+        await self._rtt("send_audio")
+        sent = FakeMessage(fake_chat(chat_id), caption or "")
+        sent.audio = SimpleNamespace(file_id=f"audio-{sent.id}", file_unique_id=f"u-{sent.id}")
+        return sent
+
+    async def edit_message_text(self, chat_id, message_id, text="", **kwargs):
+        await self._rtt("edit_message_text")
+        self.replies[chat_id] = text
+        return FakeMessage(fake_chat(chat_id), text)
+
+    async def edit_message_reply_markup(self, chat_id, message_id, reply_markup=None):
+        await self._rtt("edit_message_reply_markup")
+
+    async def edit_message_caption(self, chat_id, message_id, caption="", **kwargs):
+        await self._rtt("edit_message_caption")
+        self.replies[chat_id] = caption or ""
+
+    async def edit_message_media(self, chat_id, message_id, media=None, **kwargs):
+        await self._rtt("edit_message_media")
+        return FakeMessage(fake_chat(chat_id))
+
+    async def delete_messages(self, chat_id, message_ids, **kwargs):
+        await self._rtt("delete_messages")
+        return True
+
+    async def answer_callback_query(self, callback_query_id, text=None, **kwargs):
+        await self._rtt("answer_callback_query")
+        return True
+
+    async def answer_inline_query(self, inline_query_id, results=None, **kwargs):
+        await self._rtt("answer_inline_query")
+        return True
+
+    async def get_chat(self, chat_id):
+        await self._rtt("get_chat")
+        return fake_chat(chat_id)
+
+    async def get_chat_member(self, chat_id, user_id):
+        from pyrogram.enums import ChatMemberStatus
+
+        await self._rtt("get_chat_member")
+        return SimpleNamespace(status=ChatMemberStatus.MEMBER)
+
+    async def get_chat_members(self, chat_id, filter=None, **kwargs):
+        await self._rtt("get_chat_members")
+        for user_id in self.admins:
+            yield SimpleNamespace(
+                user=fake_user(user_id),
+                status=None,
+                privileges=SimpleNamespace(can_manage_video_chats=True),
+            )
+
+
+class FakeCalls:
+    """A py-tgcalls client whose calls only record the requested stream."""
+
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay = delay_ms / 1000
+        self.streams: Dict[int, object] = {}
+        self.calls = Counter()
+
+    async def _rtt(self, name: str):
+        self.calls[name] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    async def join_group_call(self, chat_id, stream, stream_type=None):
+        await self._rtt("join_group_call")
+        self.streams[chat_id] = stream
+
+    async def change_stream(self, chat_id, stream):
+        await self._rtt("change_stream")
+        self.streams[chat_id] = stream
+
+    async def leave_group_call(self, chat_id):
+        await self._rtt("leave_group_call")
+        self.streams.pop(chat_id, None)
+
+    async def get_participants(self, chat_id):
+        return [SimpleNamespace(user_id=1), SimpleNamespace(user_id=2)]
+
+    async def pause_stream(self, chat_id):
+        await self._rtt("pause_stream")
+
+    async def resume_stream(self, chat_id):
+        await self._rtt("resume_stream")
+
+
+class ReplayYoutubeDL:
+    """yt_dlp.YoutubeDL answering from recorded info dicts.
+
+    Downloads write a small placeholder file where yt-dlp would have put
+    the media, so callers find the path they expect.
+    """
+
+    videos: Dict[str, dict] = {}
+    payload = b"\0" * 64 * 1024
+
+    def __init__(self, params: Optional[dict] = None):
+        self.params = params or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _info(self, url: str) -> dict:
+        if url.startswith("ytsearch"):
+            return {"entries": [self._flat(info) for info in self.videos.values()]}
+        try:
+            return dict(self.videos[_video_id(url)])
+        except KeyError:
+            raise Exception(f"ERROR: [youtube] {_video_id(url)}: Video unavailable")
+
+    @staticmethod
+    def _flat(info: dict) -> dict:
+        return {**info, "url": info["webpage_url"]}
+
+    def extract_info(self, url: str, download: bool = True, **kwargs) -> dict:
+        info = self._info(url)
+        if download and "entries" not in info:
+            self._write(info)
+        return info
+
+    def prepare_filename(self, info: dict) -> str:
+        return self.params.get("outtmpl", "%(id)s.%(ext)s") % info
+
+    def download(self, urls: List[str]) -> int:
+        for url in urls:
+            self._write(self._info(url))
+        return 0
+
+    def _write(self, info: dict):
+        path = self.prepare_filename(info)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(self.payload)
+
+
+class ReplayVideosSearch:
+    """youtubesearchpython's VideosSearch answering from recorded videos."""
+
+    videos: Dict[str, dict] = {}
+
+    def __init__(self, query: str, limit: int = 1, **kwargs):
+        self.query = query
+        self.limit = limit
+
+    async def next(self) -> dict:
+        wanted = _video_id(self.query)
+        infos = [self.videos[wanted]] if wanted in self.videos else list(self.videos.values())
+        return {"result": [_search_result(info) for info in infos[: self.limit]]}
+
+
+def _search_result(info: dict) -> dict:
+    minutes, seconds = divmod(int(info["duration"]), 60)
+    return {
+        "id": info["id"],
+        "title": info["title"],
+        "link": info["webpage_url"],
+        "duration": f"{minutes}:{seconds:02d}",
+        "thumbnails": info["thumbnails"],
+        "viewCount": {"short": f"{info['view_count']} views"},
+        "channel": {"name": info["channel"], "link": info["channel_url"]},
+        "publishedTime": info["upload_date"],
+    }
+
+
+def replay_provider(videos: Dict[str, dict], delay_ms: float = 0.0):
+    """A search provider for the router that answers from recorded videos."""
+    from ZeMusic.utils.formatters import seconds_to_min
+    from ZeMusic.utils.search import SearchProvider, _entry
+
+    class ReplayProvider(SearchProvider):
+        name = "replay"
+        expected_ms = delay_ms
+
+        async def search(self, query: str, limit: int) -> List[dict]:
+            if delay_ms:
+                await asyncio.sleep(delay_ms / 1000)
+            infos = list(videos.values())
+            start = sum(map(ord, query)) % len(infos)
+            ordered = infos[start:] + infos[:start]
+            return [
+                _entry(
+                    info["id"],
+                    info["title"],
+                    seconds_to_min(info["duration"]),
+                    info["thumbnails"][0]["url"],
+                    views=str(info["view_count"]),
+                    channel=info["channel"],
+                    channel_link=info["channel_url"],
+                    published=info["upload_date"],
+                )
+                for info in ordered[:limit]
+            ]
+
+    return ReplayProvider()
+
+
+def _thumbnail_bytes() -> bytes:
+    from PIL import Image
+
+    image = Image.new("RGB", (1280, 720))
+    for x in range(0, 1280, 8):
+        image.paste((x % 256, 64, 255 - x % 256), (x, 0, x + 8, 720))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=80)
+    return out.getvalue()
+
+
+class _FakeResponse:
+    def __init__(self, body: bytes):
+        self.status = 200
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeClientSession:
+    """aiohttp.ClientSession serving one generated thumbnail for every URL."""
+
+    body: Optional[bytes] = None
+
+    def __init__(self, *args, **kwargs):
+        if FakeClientSession.body is None:
+            FakeClientSession.body = _thumbnail_bytes()
+
+    def get(self, url, **kwargs):
+        return _FakeResponse(self.body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
@@ -0,0 +1,178 @@
+"""Boots the bot against offline fakes and times coroutines."""
+import asyncio
+import atexit
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks import fakes
+
+# Written by the bot into its working directory; never shared with the checkout.
+SCRATCH = {"log.txt", "cache", "downloads"}
+
+# Keep the process quiet and local: no exporter, no watchdog, no hedging delays.
+ENVIRONMENT = {
+    "MONGO_DB_URI": "mongodb://localhost:27017",
+    "METRICS_PORT": "0",
+    "BLOCKING_THRESHOLD_MS": "0",
+    "LOGGER_ID": "-1001000000000",
+    "MEDIA_STORE_MB": "0",
+}
+
+
+def _scratch_workdir() -> str:
+    """A temporary copy of the repository root made of symlinks.
+
+    The bot writes log.txt, cache/ and downloads/ relative to its working
+    directory; running from here keeps them out of the checkout.
+    """
+    root = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="zemusic-bench-")
+    atexit.register(shutil.rmtree, workdir, True)
+    for name in os.listdir(root):
+        if name not in SCRATCH:
+            os.symlink(os.path.join(root, name), os.path.join(workdir, name))
+    os.chdir(workdir)
+    return workdir
+
+
+def boot(bot_delay_ms: float = 0.0, calls_delay_ms: float = 0.0, search_delay_ms: float = 0.0):
+    """Import the bot with every outside service replaced by a fake.
+
+    Mongo is mongomock, Redis is fakeredis, yt-dlp and YouTube search replay
+    recorded info dicts, and the bot and voice-call clients are in-process
+    fakes. Must start from the repository root, like the bot itself; the
+    bot then runs in a scratch directory.
+    """
+    os.environ.update(ENVIRONMENT)
+    _scratch_workdir()
+
+    import motor.motor_asyncio
+    import youtubesearchpython.__future__ as ytsearch
+    import yt_dlp
+    from fakeredis import aioredis
+    from mongomock_motor import AsyncMongoMockClient
+
+    videos = fakes.recorded_videos()
+    fakes.ReplayYoutubeDL.videos = videos
+    fakes.ReplayVideosSearch.videos = videos
+    # Patched before the bot imports them by name.
+    motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+    yt_dlp.YoutubeDL = fakes.ReplayYoutubeDL
+    ytsearch.VideosSearch = fakes.ReplayVideosSearch
+
+    import ZeMusic
+    from ZeMusic.core import cache
+    from ZeMusic.core import call as core_call
+    from ZeMusic.utils import search, thumbnails
+    from ZeMusic.utils.decorators import play as play_decorator
+
+    cache._redis_instance = aioredis.FakeRedis(decode_responses=True)
+    bot = fakes.FakeBot(bot_delay_ms)
+    bot.install(ZeMusic.app)
+    calls = fakes.FakeCalls(calls_delay_ms)
+    assistant = SimpleNamespace(id=42, name="Bench assistant", username="bench_assistant")
+
+    async def group_assistant(_self, chat_id):
+        return calls
+
+    async def get_assistant(chat_id):
+        return assistant
+
+    core_call.group_assistant = group_assistant
+    play_decorator.get_assistant = get_assistant
+    search.search_router = search.SearchRouter(
+        [fakes.replay_provider(videos, search_delay_ms)], hedge_ms=0
+    )
+    thumbnails.aiohttp = SimpleNamespace(ClientSession=fakes.FakeClientSession)
+
+    from ZeMusic.plugins.play import play as play_plugin
+
+    return SimpleNamespace(
+        app=ZeMusic.app,
+        bot=bot,
+        calls=calls,
+        videos=videos,
+        play=play_plugin.play_commnd,
+        mody=core_call.Mody,
+    )
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+class LagProbe:
+    """Measures how late the event loop wakes a task that sleeps ``interval``."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append((time.perf_counter() - started - self.interval) * 1000)
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        lag = summarize(self.samples)
+        return {"loop_lag_p99_ms": lag["p99_ms"], "loop_lag_max_ms": lag["max_ms"]}
+
+
+async def measure(
+    iterations: int,
+    run: Callable[[int], Awaitable[None]],
+    setup: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> Dict[str, float]:
+    """Time ``run(i)`` for each iteration; ``setup(i)`` runs untimed before it."""
+    probe = LagProbe()
+    samples = []
+    probe.start()
+    for i in range(iterations):
+        if setup is not None:
+            await setup(i)
+        started = time.perf_counter()
+        await run(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    result = summarize(samples)
+    result.update(await probe.stop())
+    return result
+
+
+def environment() -> Dict[str, str]:
+    import platform
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": str(os.cpu_count()),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
@@ -0,0 +1,376 @@
+"""Load test: synthetic updates from many chats through the real handlers.
+
+Run from the repository root::
+
+    python -m benchmarks.load --chats 200 --users 1000 --rates 10,20,40,80 --duration 20
+
+Updates arrive at each rate in turn, open-loop (Poisson), and go through the
+bot's registered handlers the way pyrogram's dispatcher runs them: a queue
+drained by ``app.workers`` workers, filters checked group by group. Stream
+ends are raised like py-tgcalls raises them, outside that queue. Every
+step reports throughput, latency per kind of update, event-loop lag and
+memory, and the first step that cannot keep up is reported as saturated.
+"""
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from benchmarks import fakes, harness
+from benchmarks.suites import warm_thumbnails
+
+# Relative share of each kind of update.
+DEFAULT_MIX = {
+    "play": 25,
+    "stream_end": 15,
+    "queue": 15,
+    "skip": 10,
+    "seek": 5,
+    "button": 15,
+    "inline": 10,
+    "song": 5,
+}
+# Kinds that need an admin to do anything beyond answering "not allowed".
+ADMIN_KINDS = {"skip", "seek", "button"}
+BUTTONS = ("Pause", "Resume", "Skip")
+
+# A step is saturated when it completes less than this share of the offered rate.
+KEEP_UP = 0.95
+
+
+def _parse_mix(text: Optional[str]) -> Dict[str, int]:
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise SystemExit(f"unknown update kind {kind!r}; known: {', '.join(DEFAULT_MIX)}")
+        mix[kind] = int(weight)
+    return mix
+
+
+async def load_plugins() -> List[str]:
+    """Import every plugin inside the running loop, as the bot's init() does."""
+    from ZeMusic.plugins import ALL_MODULES
+
+    failed = []
+    for module in ALL_MODULES:
+        try:
+            importlib.import_module("ZeMusic.plugins" + module)
+        except Exception as e:
+            failed.append(f"{module}: {e}")
+    # pyrogram registers handlers from tasks; let them run.
+    for _ in range(3):
+        await asyncio.sleep(0)
+    return failed
+
+
+class Dispatcher:
+    """pyrogram's update workers, fed directly instead of from MTProto."""
+
+    def __init__(self, client, workers: int):
+        from pyrogram.handlers import (
+            CallbackQueryHandler,
+            InlineQueryHandler,
+            MessageHandler,
+        )
+        from pyrogram.types import CallbackQuery, InlineQuery, Message
+
+        self.client = client
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.handler_types = {
+            Message: MessageHandler,
+            CallbackQuery: CallbackQueryHandler,
+            InlineQuery: InlineQueryHandler,
+        }
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, done):
+        self._tasks = [
+            asyncio.ensure_future(self._worker(done)) for _ in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _worker(self, done):
+        while True:
+            kind, update, arrived = await self.queue.get()
+            try:
+                error = await self.handle(update)
+            finally:
+                self.queue.task_done()
+            done(kind, update, arrived, error)
+
+    async def handle(self, update) -> Optional[str]:
+        """Run ``update`` through the handlers; returns the first error, if any."""
+        from pyrogram import ContinuePropagation, StopPropagation
+
+        handler_type = self.handler_types[type(update)]
+        error = None
+        try:
+            for group in list(self.client.dispatcher.groups.values()):
+                for handler in group:
+                    if not isinstance(handler, handler_type):
+                        continue
+                    try:
+                        if not await handler.check(self.client, update):
+                            continue
+                    except Exception as e:
+                        error = error or f"filter: {type(e).__name__}"
+                        continue
+                    try:
+                        if inspect.iscoroutinefunction(handler.callback):
+                            await handler.callback(self.client, update)
+                        else:
+                            await asyncio.get_running_loop().run_in_executor(
+                                None, handler.callback, self.client, update
+                            )
+                    except StopPropagation:
+                        raise
+                    except ContinuePropagation:
+                        continue
+                    except Exception as e:
+                        error = error or f"{type(e).__name__}: {e}"[:120]
+                    break
+        except StopPropagation:
+            pass
+        return error
+
+
+class Workload:
+    """Picks the chat, user and content of each synthetic update."""
+
+    def __init__(self, ctx, chats: int, users: int, queries: int, mix: Dict[str, int], seed: int):
+        self.ctx = ctx
+        self.rng = random.Random(seed)
+        self.chats = [-1004000000000 - n for n in range(chats)]
+        self.users = [6000 + n for n in range(users)]
+        self.admins = self.users[: max(1, users // 10)]
+        titles = [info["title"] for info in ctx.videos.values()]
+        self.queries = [f"{titles[n % len(titles)]} {n}" for n in range(queries)]
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        ctx.bot.admins = self.admins
+
+    def next(self):
+        rng = self.rng
+        kind = rng.choices(self.kinds, self.weights)[0]
+        chat_id = rng.choice(self.chats)
+        user_id = rng.choice(self.admins if kind in ADMIN_KINDS else self.users)
+        app = self.ctx.app
+        if kind == "play":
+            update = fakes.message_update(app, chat_id, user_id, f"play {rng.choice(self.queries)}")
+        elif kind == "song":
+            update = fakes.message_update(app, chat_id, user_id, f"song {rng.choice(self.queries)}")
+        elif kind == "queue":
+            update = fakes.message_update(app, chat_id, user_id, "queue")
+        elif kind == "skip":
+            update = fakes.message_update(app, chat_id, user_id, "skip")
+        elif kind == "seek":
+            update = fakes.message_update(app, chat_id, user_id, f"seek {rng.randint(5, 60)}")
+        elif kind == "button":
+            data = f"ADMIN {rng.choice(BUTTONS)}|{chat_id}"
+            update = fakes.callback_update(app, chat_id, user_id, data)
+        elif kind == "inline":
+            update = fakes.inline_update(app, user_id, rng.choice(self.queries))
+        else:
+            update = chat_id
+        return kind, update
+
+
+def _rss_mb() -> float:
+    import psutil
+
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+async def _stream_end(ctx, chat_id: int) -> Optional[str]:
+    """What the stream-end handler in core/call.py does for an active chat."""
+    from ZeMusic.utils.database import is_active_chat
+
+    if not await is_active_chat(chat_id):
+        return None
+    try:
+        await ctx.mody.change_stream(ctx.calls, chat_id)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"[:120]
+    return None
+
+
+def _play_failure(ctx, chat_id: int) -> Optional[str]:
+    """Why a /play that raised nothing still failed, if it did.
+
+    The play handlers catch their own errors and answer with general_2
+    instead, so a broken path would otherwise count as a fast success.
+    """
+    from strings import get_string
+
+    prefix, _, suffix = get_string("en")["general_2"].partition("{0}")
+    reply = ctx.bot.replies.get(chat_id, "")
+    if reply.startswith(prefix):
+        return f"answered {reply[len(prefix):].removesuffix(suffix)}"
+    if chat_id not in ctx.calls.streams:
+        return "no stream started"
+    return None
+
+
+async def run_step(ctx, dispatcher: Dispatcher, workload: Workload, rate: float, duration: float, drain: float):
+    latencies = defaultdict(list)
+    errors = Counter()
+    completed_in_window = 0
+    window_end = None
+
+    def done(kind, update, arrived, error):
+        nonlocal completed_in_window
+        finished = time.perf_counter()
+        latencies[kind].append((finished - arrived) * 1000)
+        if not error and kind == "play":
+            error = _play_failure(ctx, update.chat.id)
+        if error:
+            errors[f"{kind}: {error}"] += 1
+        if finished <= window_end:
+            completed_in_window += 1
+
+    async def stream_end(chat_id, arrived):
+        done("stream_end", chat_id, arrived, await _stream_end(ctx, chat_id))
+
+    rss_before = _rss_mb()
+    tasks_before = len(asyncio.all_tasks())
+    probe = harness.LagProbe()
+    probe.start()
+    dispatcher.start(done)
+    side_tasks = []
+    offered = 0
+    started = time.perf_counter()
+    window_end = started + duration
+    next_arrival = started
+    while True:
+        next_arrival += workload.rng.expovariate(rate)
+        if next_arrival >= window_end:
+            break
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind, update = workload.next()
+        offered += 1
+        if kind == "stream_end":
+            side_tasks.append(asyncio.ensure_future(stream_end(update, next_arrival)))
+        else:
+            dispatcher.queue.put_nowait((kind, update, next_arrival))
+    delay = window_end - time.perf_counter()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    backlog = dispatcher.queue.qsize()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(dispatcher.queue.join(), *side_tasks), timeout=drain
+        )
+        drained = True
+    except asyncio.TimeoutError:
+        drained = False
+    drain_s = time.perf_counter() - window_end
+    await dispatcher.stop()
+    # Anything the drain timed out on is dropped so the next step starts empty.
+    while not dispatcher.queue.empty():
+        dispatcher.queue.get_nowait()
+        dispatcher.queue.task_done()
+    lag = await probe.stop()
+
+    everything = [ms for samples in latencies.values() for ms in samples]
+    throughput = completed_in_window / duration
+    return {
+        "offered_per_s": rate,
+        "arrivals": offered,
+        "throughput_per_s": round(throughput, 2),
+        "backlog_at_end": backlog,
+        "drained": drained,
+        "drain_s": round(drain_s, 3),
+        "saturated": throughput < KEEP_UP * offered / duration or not drained,
+        "latency": harness.summarize(everything),
+        "latency_by_kind": {kind: harness.summarize(samples) for kind, samples in sorted(latencies.items())},
+        "errors": dict(errors.most_common(10)),
+        **lag,
+        "rss_mb_before": round(rss_before, 1),
+        "rss_mb_after": round(_rss_mb(), 1),
+        "tasks_before": tasks_before,
+        "tasks_after": len(asyncio.all_tasks()),
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200, help="distinct search queries in use")
+    parser.add_argument("--rates", default="5,10,20,40,80", help="updates per second, one step each")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per step")
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds to wait for a step's backlog")
+    parser.add_argument("--workers", type=int, help="handler workers (default: app.workers)")
+    parser.add_argument("--mix", help="e.g. play=25,queue=15,skip=10 (default: a typical group mix)")
+    parser.add_argument("--keep-going", action="store_true", help="run every rate even after saturation")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--bot-rtt-ms", type=float, default=0.0, help="simulated Bot API round trip")
+    parser.add_argument("--calls-rtt-ms", type=float, default=0.0, help="simulated voice-call round trip")
+    parser.add_argument("--search-rtt-ms", type=float, default=0.0, help="simulated search latency")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+async def _main(ctx, args):
+    failed = await load_plugins()
+    for failure in failed:
+        print(f"plugin not loaded: {failure}", file=sys.stderr)
+    await warm_thumbnails(ctx)
+    dispatcher = Dispatcher(ctx.app, args.workers or ctx.app.workers)
+    workload = Workload(ctx, args.chats, args.users, args.queries, _parse_mix(args.mix), args.seed)
+    steps = []
+    saturation = None
+    for rate in [float(r) for r in args.rates.split(",")]:
+        print(f"{rate:g} updates/s for {args.duration:g}s ...", file=sys.stderr)
+        step = await run_step(ctx, dispatcher, workload, rate, args.duration, args.drain)
+        steps.append(step)
+        print(
+            f"  {step['throughput_per_s']:.1f}/s, p99 {step['latency']['p99_ms']:.0f} ms, "
+            f"loop lag p99 {step['loop_lag_p99_ms']:.0f} ms, rss {step['rss_mb_after']:.0f} MB",
+            file=sys.stderr,
+        )
+        if step["saturated"] and saturation is None:
+            saturation = rate
+            if not args.keep_going:
+                break
+    return {
+        "environment": harness.environment(),
+        "settings": {**vars(args), "workers": dispatcher.workers},
+        "plugins_not_loaded": failed,
+        "saturated_at_per_s": saturation,
+        "requests": dict(ctx.bot.calls),
+        "steps": steps,
+    }
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    ctx = harness.boot(args.bot_rtt_ms, args.calls_rtt_ms, args.search_rtt_ms)
+    report = asyncio.get_event_loop().run_until_complete(_main(ctx, args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""The benchmarks, each timing one playback hot path against the fakes."""
+import os
+from typing import Awaitable, Callable, Dict
+
+from benchmarks.fakes import FakeMessage, fake_chat, fake_user
+from benchmarks.harness import measure
+
+Suite = Callable[[object, int], Awaitable[Dict[str, float]]]
+SUITES: Dict[str, Suite] = {}
+
+_chat_ids = iter(range(-1002000000000, -1003000000000, -1))
+
+
+def suite(name: str):
+    def register(fn: Suite) -> Suite:
+        SUITES[name] = fn
+        return fn
+
+    return register
+
+
+def _new_chat() -> int:
+    return next(_chat_ids)
+
+
+def _entry(info: dict, chat_id: int) -> dict:
+    """A queue entry as put_queue stores a YouTube track."""
+    minutes, seconds = divmod(int(info["duration"]), 60)
+    return {
+        "title": info["title"],
+        "dur": f"{minutes}:{seconds:02d}",
+        "streamtype": "audio",
+        "by": "bench",
+        "user_id": 5000,
+        "chat_id": chat_id,
+        "file": f"vid_{info['id']}",
+        "vidid": info["id"],
+        "seconds": int(info["duration"]) - 3,
+        "played": 0,
+    }
+
+
+def _drop_thumbnails(video_id: str):
+    for path in (f"cache/{video_id}.jpg", f"cache/thumb{video_id}.jpg"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def warm_thumbnails(ctx):
+    from ZeMusic.utils.thumbnails import get_thumb
+
+    for video_id in ctx.videos:
+        await get_thumb(video_id)
+
+
+async def _play(ctx, chat_id: int, text: str):
+    message = FakeMessage(fake_chat(chat_id), text, from_user=fake_user())
+    await ctx.play(ctx.app, message)
+    # The play plugin swallows its own errors and answers in the chat, so a
+    # broken path would otherwise be timed as a fast success.
+    if chat_id not in ctx.calls.streams:
+        raise RuntimeError(f"{text!r} started no stream in {chat_id}")
+
+
+@suite("play_search_miss")
+async def play_search_miss(ctx, iterations):
+    """/play <text> in an idle chat; the search cache misses every time."""
+    await warm_thumbnails(ctx)
+    return await measure(
+        iterations, lambda i: _play(ctx, _new_chat(), f"play bench miss {i}")
+    )
+
+
+@suite("play_search_hit")
+async def play_search_hit(ctx, iterations):
+    """/play <text> in an idle chat with the search already cached."""
+    await warm_thumbnails(ctx)
+    await _play(ctx, _new_chat(), "play bench hit")
+    return await measure(iterations, lambda i: _play(ctx, _new_chat(), "play bench hit"))
+
+
+@suite("play_enqueue")
+async def play_enqueue(ctx, iterations):
+    """/play <text> in a chat that is already playing: the track is queued."""
+    await warm_thumbnails(ctx)
+    chat_id = _new_chat()
+    await _play(ctx, chat_id, "play bench queue")
+    return await measure(iterations, lambda i: _play(ctx, chat_id, "play bench queue"))
+
+
+async def _transition(ctx, iterations: int, prepared: bool):
+    from ZeMusic.misc import db
+    from ZeMusic.utils.database import add_active_chat
+    from ZeMusic.utils.stream import nowplaying
+
+    infos = list(ctx.videos.values())
+    chats = {}
+
+    async def setup(i):
+        chat_id = chats[i] = _new_chat()
+        current, following = infos[i % len(infos)], infos[(i + 1) % len(infos)]
+        db[chat_id] = [_entry(current, chat_id), _entry(following, chat_id)]
+        await add_active_chat(chat_id)
+        _drop_thumbnails(following["id"])
+        if prepared:
+            nowplaying.prepare_next(chat_id)
+            await nowplaying._preparing[chat_id][1]
+
+    async def run(i):
+        await ctx.mody.change_stream(ctx.calls, chats[i])
+        if chats[i] not in ctx.calls.streams:
+            raise RuntimeError(f"change_stream started no stream in {chats[i]}")
+
+    return await measure(iterations, run, setup)
+
+
+@suite("change_stream")
+async def change_stream(ctx, iterations):
+    """Stream end to next track announced, rendering the card on the spot."""
+    return await _transition(ctx, iterations, prepared=False)
+
+
+@suite("change_stream_prepared")
+async def change_stream_prepared(ctx, iterations):
+    """Stream end to next track announced, with the card prepared beforehand."""
+    return await _transition(ctx, iterations, prepared=True)
+
+
+@suite("queue_put")
+async def queue_put(ctx, iterations):
+    from ZeMusic.utils.stream.queue import put_queue
+
+    chat_id = _new_chat()
+    info = next(iter(ctx.videos.values()))
+
+    async def run(i):
+        await put_queue(
+            chat_id, chat_id, f"vid_{info['id']}", info["title"], "3:35",
+            "bench", info["id"], 5000, "audio",
+        )
+
+    return await measure(iterations, run)
+
+
+@suite("queue_pop")
+async def queue_pop(ctx, iterations):
+    from ZeMusic.misc import db
+    from ZeMusic.utils.stream.autoclear import auto_clean
+    from config import autoclean
+
+    chat_id = _new_chat()
+    info = next(iter(ctx.videos.values()))
+    db[chat_id] = [_entry(info, chat_id) for _ in range(iterations)]
+    autoclean.extend(entry["file"] for entry in db[chat_id])
+
+    async def run(i):
+        await auto_clean(db[chat_id].pop(0))
+
+    return await measure(iterations, run)
+
+
+@suite("cache_search")
+async def cache_search(ctx, iterations):
+    """Search cache lookups, alternating hits and misses."""
+    from ZeMusic.core.cache import get_cached_search, set_cached_search
+    from ZeMusic.utils.search import search_videos
+
+    results = await search_videos("bench cached query", 5)
+    await set_cached_search("bench cached query", results, 5)
+
+    async def run(i):
+        await get_cached_search("bench cached query" if i % 2 else f"bench absent {i}", 5)
+
+    return await measure(iterations, run)
+
+
+@suite("cache_resolution")
+async def cache_resolution(ctx, iterations):
+    """Resolved /play link lookups by canonical URL."""
+    from ZeMusic.core.cache import get_cached_resolution, set_cached_resolution
+
+    url = "https://youtu.be/BenchTrk001?si=tracking"
+    await set_cached_resolution("youtube:track", url, [{"vidid": "BenchTrk001"}, "BenchTrk001"], 3600)
+    return await measure(iterations, lambda i: get_cached_resolution("youtube:track", url))
+
+
+@suite("cache_matches")
+async def cache_matches(ctx, iterations):
+    """Catalog track matches for a 25-track playlist in one round trip."""
+    from ZeMusic.core.cache import get_cached_matches, set_cached_matches
+
+    info = next(iter(ctx.videos.values()))
+    keys = [f"isrc:BENCH{n:07d}" for n in range(25)]
+    await set_cached_matches({key: {"vidid": info["id"], "title": info["title"]} for key in keys})
+    return await measure(iterations, lambda i: get_cached_matches(keys))
+
+
+@suite("thumbnail_render")
+async def thumbnail_render(ctx, iterations):
+    """get_thumb with nothing cached: search, download and PIL render."""
+    from ZeMusic.utils.thumbnails import get_thumb
+
+    ids = list(ctx.videos)
+
+    async def setup(i):
+        _drop_thumbnails(ids[i % len(ids)])
+
+    return await measure(iterations, lambda i: get_thumb(ids[i % len(ids)]), setup)
+
+
+@suite("loop_idle")
+async def loop_idle(ctx, iterations):
+    """Event-loop lag with nothing else running, as a baseline for the others."""
+    import asyncio
+
+    return await measure(iterations, lambda i: asyncio.sleep(0.01))
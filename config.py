@@ -57,6 +57,8 @@ AUTO_LEAVING_ASSISTANT = bool(getenv("AUTO_LEAVING_ASSISTANT", True))
 # Get this credentials from https://developer.spotify.com/dashboard
 SPOTIFY_CLIENT_ID = getenv("SPOTIFY_CLIENT_ID", None)
 SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", None)
+# How many Spotify/Apple playlist tracks are matched to YouTube at the same time.
+MATCH_CONCURRENCY = int(getenv("MATCH_CONCURRENCY", 5))
 
 
 # Maximum limit for fetching playlist s track from youtube, spotify, apple links.
@@ -119,6 +121,72 @@ REDIS_URL = getenv("REDIS_URL", "redis://localhost:6379/0")
 REDIS_PASSWORD = getenv("REDIS_PASSWORD", None)
 CACHE_TTL_SECONDS = int(getenv("CACHE_TTL_SECONDS", 60 * 60 * 24 * 30))  # 30 days
 CACHE_SCHEMA_VERSION = int(getenv("CACHE_SCHEMA_VERSION", 1))
+# Free-text search results (query -> top YouTube videos) shared by play,
+# inline and song commands. Rankings drift, so these expire sooner.
+SEARCH_CACHE_TTL = int(getenv("SEARCH_CACHE_TTL", 60 * 60 * 6))
+# Search providers: per-provider timeout (seconds), and how long (ms) the
+# fastest provider gets before the next one is raced against it.
+SEARCH_TIMEOUT = float(getenv("SEARCH_TIMEOUT", 10))
+SEARCH_HEDGE_MS = float(getenv("SEARCH_HEDGE_MS", 1500))
+
+# Global ban fan-out: parallel workers per job, and how long a chat where the
+# bot lacks ban rights is skipped before being retried.
+GBAN_WORKERS = int(getenv("GBAN_WORKERS", 8))
+NOADMIN_TTL_SECONDS = int(getenv("NOADMIN_TTL_SECONDS", 60 * 60 * 6))
+
+# Admin rights cache: kept current from chat_member updates, fully re-fetched
+# from Telegram once the shared Redis copy is older than this.
+ADMIN_CACHE_TTL = int(getenv("ADMIN_CACHE_TTL", 60 * 60))
+
+# Live progress edits: minimum seconds between edits in one chat, and the
+# bot-wide number of edits per second shared by every chat.
+EDIT_CHAT_INTERVAL = float(getenv("EDIT_CHAT_INTERVAL", 3))
+EDIT_GLOBAL_RATE = float(getenv("EDIT_GLOBAL_RATE", 20))
+
+# Speed changes are applied live through ffmpeg filters. When set, variants are
+# also pre-rendered in the background and kept under playback/ within this many MB.
+SPEED_VARIANTS_MB = int(getenv("SPEED_VARIANTS_MB", 0))
+
+# Song command and SoundCloud downloads (yt-dlp) run on this many worker
+# threads, off the event loop.
+DOWNLOAD_WORKERS = int(getenv("DOWNLOAD_WORKERS", 2))
+
+# Played media is kept under downloads/ and reused across chats, within this many
+# MB (least recently used files go first); 0 deletes each file after playback.
+MEDIA_STORE_MB = int(getenv("MEDIA_STORE_MB", 2048))
+
+# Telegram files of at least TG_PARALLEL_MIN_MB are fetched over this many
+# concurrent ranged streams.
+TG_DOWNLOAD_CONNECTIONS = int(getenv("TG_DOWNLOAD_CONNECTIONS", 4))
+TG_PARALLEL_MIN_MB = int(getenv("TG_PARALLEL_MIN_MB", 20))
+
+# Telegram files larger than this many MB start playing once their first
+# TG_PROGRESSIVE_MB are downloaded, while the rest streams in; 0 waits for the whole file.
+TG_PROGRESSIVE_MB = int(getenv("TG_PROGRESSIVE_MB", 5))
+
+# Queued playlists are summarised by a card drawn locally on this many worker
+# processes. Set PLAYLIST_EXTERNAL to use the old Carbon image and batbin paste instead.
+CARD_WORKERS = int(getenv("CARD_WORKERS", 1))
+PLAYLIST_EXTERNAL = bool(getenv("PLAYLIST_EXTERNAL", ""))
+
+# Shared outbound HTTP client (GPT, Telegraph, ...): per-request timeout in
+# seconds and the number of requests allowed in flight to one host.
+HTTP_TIMEOUT = float(getenv("HTTP_TIMEOUT", 20))
+HTTP_HOST_CONCURRENCY = int(getenv("HTTP_HOST_CONCURRENCY", 4))
+
+# Log the stack of any code holding the event loop longer than this (ms); 0 disables it.
+BLOCKING_THRESHOLD_MS = int(getenv("BLOCKING_THRESHOLD_MS", 500))
+
+# Prometheus/OpenMetrics endpoint (http://METRICS_HOST:METRICS_PORT/metrics); 0 disables it.
+METRICS_HOST = getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(getenv("METRICS_PORT", 0))
+
+# Sharded mode: chats are hash-partitioned across SHARDS processes, each running
+# its share of the assistants. Process 0 receives every update, starts the others
+# and forwards each chat's updates to the shard that owns it through Redis.
+# Each shard serves metrics on METRICS_PORT + SHARD_ID.
+SHARDS = int(getenv("SHARDS", 1))
+SHARD_ID = int(getenv("SHARD_ID", 0))
 
 # YouTube cookies configuration - Force use of strings/cookies.txt
 YT_COOKIES_FILE = getenv("YT_COOKIES_FILE", "strings/cookies.txt")